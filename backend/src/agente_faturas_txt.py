@@ -16,6 +16,13 @@ except ImportError:
     HAS_MODELS = False
     print("Aviso: Módulos do projeto não carregados perfeitamente. Tentando workaround interno.")
 
+# Colunas de deduplicação indexadas (sem elas, a checagem volta à comparação direta)
+try:
+    from database.dedup_keys import ensure_dedup_columns, cents_sql, source_norm_sql, description_norm_sql
+    HAS_DEDUP_KEYS = True
+except ImportError:
+    HAS_DEDUP_KEYS = False
+
 BASE_DIR = Path(__file__).parent.parent.parent
 DB_PATH = BASE_DIR / 'dados' / 'db' / 'financeiro.db'
 TXT_DIR = BASE_DIR / 'dados' / 'faturas_txt'
@@ -89,6 +96,9 @@ def criar_tabela():
             created_at DATETIME DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    # Colunas normalizadas + índice composto usados na checagem de duplicatas
+    if HAS_DEDUP_KEYS:
+        ensure_dedup_columns(c)
     conn.commit()
     conn.close()
 
@@ -375,10 +385,22 @@ def processar_faturas():
                 print(f"  ⏭️ Ignorando duplicata (na própria leitura atual): {tx['descricao']} | R$ {tx['valor']:>8.2f}")
                 continue
                 
-            c.execute('''
-                SELECT 1 FROM lancamentos
-                WHERE Data = ? AND ABS(Valor - ?) < 0.01 AND (Fonte = ? OR Fonte = ?) AND Descricao = ? AND (MesComp = ? OR MesComp IS NULL)
-            ''', (tx['data_obj'].isoformat(), tx['valor'], cartao_nome, tx['tipo_cartao'], tx['descricao'], tx['mes_comp']))
+            if HAS_DEDUP_KEYS:
+                # Seek em idx_lancamentos_dedup (colunas normalizadas); Fonte/Descricao
+                # exatas continuam como filtro residual
+                c.execute(f'''
+                    SELECT 1 FROM lancamentos
+                    WHERE Data = ? AND valor_centavos = {cents_sql('?')}
+                      AND fonte_norm IN ({source_norm_sql('?')}, {source_norm_sql('?')})
+                      AND desc_norm = {description_norm_sql('?')}
+                      AND (Fonte = ? OR Fonte = ?) AND Descricao = ? AND (MesComp = ? OR MesComp IS NULL)
+                ''', (tx['data_obj'].isoformat(), tx['valor'], cartao_nome, tx['tipo_cartao'], tx['descricao'],
+                      cartao_nome, tx['tipo_cartao'], tx['descricao'], tx['mes_comp']))
+            else:
+                c.execute('''
+                    SELECT 1 FROM lancamentos
+                    WHERE Data = ? AND ABS(Valor - ?) < 0.01 AND (Fonte = ? OR Fonte = ?) AND Descricao = ? AND (MesComp = ? OR MesComp IS NULL)
+                ''', (tx['data_obj'].isoformat(), tx['valor'], cartao_nome, tx['tipo_cartao'], tx['descricao'], tx['mes_comp']))
             
             if c.fetchone():
                 # Ignora duplicada exata que já está no banco atual 
@@ -93,7 +93,7 @@ DEFAULT_PERSON_MAPPINGS = [
 ]
 
 
-@dataclass
+@dataclass(slots=True)
 class RecurringTransaction:
     """
     Transação recorrente identificada através de análise histórica.
@@ -145,7 +145,7 @@ class RecurringTransaction:
         return self.occurrences / self.months_analyzed if self.months_analyzed > 0 else 0
 
 
-@dataclass
+@dataclass(slots=True)
 class WeeklyBudget:
     """
     Orçamento semanal por categoria, pessoa e fonte.
@@ -1,7 +1,7 @@
 """
 Buscar transações do Itaú e salvar em JSON (sem output de console)
 """
-import requests
+from integrations.pluggy_auth import get_pluggy_fetcher
 from datetime import datetime, timedelta
 import json
 
@@ -11,16 +11,10 @@ ITEM_ID = '60cbf151-aaed-45c7-afac-f2aab15e6299'  # Itaú REAL
 BASE_URL = 'https://api.pluggy.ai'
 
 # Autenticar
-auth_response = requests.post(f'{BASE_URL}/auth', json={
-    'clientId': CLIENT_ID,
-    'clientSecret': CLIENT_SECRET
-})
-api_key = auth_response.json()['apiKey']
-headers = {'X-API-KEY': api_key}
+fetcher = get_pluggy_fetcher(CLIENT_ID, CLIENT_SECRET, BASE_URL)
 
 # Buscar contas
-accounts_response = requests.get(f'{BASE_URL}/accounts?itemId={ITEM_ID}', headers=headers)
-accounts = accounts_response.json().get('results', [])
+accounts = fetcher.buscar_contas(ITEM_ID)
 
 # Período: últimos 3 meses
 date_to = datetime.now()
@@ -55,8 +49,7 @@ for acc in accounts:
             'pageSize': 500
         }
         
-        trans_response = requests.get(f'{BASE_URL}/transactions', headers=headers, params=params)
-        trans_data = trans_response.json()
+        trans_data = fetcher.request('GET', '/transactions', params=params)
         transactions = trans_data.get('results', [])
         
         if not transactions:
@@ -18,6 +18,7 @@ from dashboard_v2.utils.database import (
     obter_meses_disponiveis_para_comparacao,
     carregar_transacoes
 )
+from database.month_key import month_key
 import pandas as pd
 
 
@@ -209,25 +210,8 @@ def register_budget_callbacks(app):
             else:
                 # Filtra transações do mês de comparação usando MesComp
                 df_trans['data'] = pd.to_datetime(df_trans['data'])
-                # Converte mes_comp para formato YYYY-MM para comparação
-                meses_map = {
-                    'Janeiro': '01', 'Fevereiro': '02', 'Março': '03', 'Abril': '04',
-                    'Maio': '05', 'Junho': '06', 'Julho': '07', 'Agosto': '08',
-                    'Setembro': '09', 'Outubro': '10', 'Novembro': '11', 'Dezembro': '12'
-                }
-                
-                def mescomp_to_yearmonth(mescomp):
-                    if pd.isna(mescomp):
-                        return None
-                    parts = mescomp.split()
-                    if len(parts) == 2:
-                        mes_nome, ano = parts
-                        mes_num = meses_map.get(mes_nome, '00')
-                        return f"{ano}-{mes_num}"
-                    return None
-                
-                df_trans['year_month'] = df_trans['mes_comp'].apply(mescomp_to_yearmonth)
-                df_month = df_trans[df_trans['year_month'] == comparison_month]
+                # Mês de comparação (YYYY-MM) pela chave canônica mes_key (AAAAMM)
+                df_month = df_trans[df_trans['mes_key'] == month_key(comparison_month)]
                 
                 if df_month.empty:
                     actual_totals = [0] * len(weeks)
@@ -331,25 +315,8 @@ def register_budget_callbacks(app):
             df_trans = carregar_transacoes('TODOS')
             real_categories = {}
             if not df_trans.empty:
-                # Converte mes_comp para formato YYYY-MM
-                meses_map = {
-                    'Janeiro': '01', 'Fevereiro': '02', 'Março': '03', 'Abril': '04',
-                    'Maio': '05', 'Junho': '06', 'Julho': '07', 'Agosto': '08',
-                    'Setembro': '09', 'Outubro': '10', 'Novembro': '11', 'Dezembro': '12'
-                }
-                
-                def mescomp_to_yearmonth(mescomp):
-                    if pd.isna(mescomp):
-                        return None
-                    parts = mescomp.split()
-                    if len(parts) == 2:
-                        mes_nome, ano = parts
-                        mes_num = meses_map.get(mes_nome, '00')
-                        return f"{ano}-{mes_num}"
-                    return None
-                
-                df_trans['year_month'] = df_trans['mes_comp'].apply(mescomp_to_yearmonth)
-                df_month = df_trans[df_trans['year_month'] == comparison_month]
+                # Mês de comparação (YYYY-MM) pela chave canônica mes_key (AAAAMM)
+                df_month = df_trans[df_trans['mes_key'] == month_key(comparison_month)]
                 
                 # Soma por categoria (apenas débitos = valores positivos)
                 df_debitos = df_month[df_month['valor'] > 0]
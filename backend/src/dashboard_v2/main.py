@@ -11,7 +11,7 @@ import pandas as pd
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
-from dash import Dash, html, dcc, Input, Output, State, callback, ALL
+from dash import Dash, html, dcc, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 
 # Imports locais
@@ -20,10 +20,11 @@ from dashboard_v2.components.sidebar import create_sidebar
 from dashboard_v2.assets.custom_styles import get_custom_css
 from dashboard_v2.pages.dashboard import create_dashboard_page
 from dashboard_v2.pages.analytics import create_analytics_page
-from dashboard_v2.pages.transacoes import create_transacoes_page
+from dashboard_v2.pages.transacoes import create_transacoes_page, TAMANHO_PAGINA_TRANSACOES
 from dashboard_v2.pages.ideals import create_ideals_page
 from dashboard_v2.pages.budget import create_budget_page
 from dashboard_v2.utils.database import (
+    DB_PATH,
     carregar_transacoes, 
     obter_meses_disponiveis, 
     calcular_estatisticas,
@@ -34,7 +35,13 @@ from dashboard_v2.utils.database import (
     obter_resumo_orcamento_semanal,
     obter_meses_orcamento_disponiveis,
     obter_resumo_orcamento_por_data,
-    obter_meses_disponiveis_para_comparacao
+    obter_meses_disponiveis_para_comparacao,
+    montar_filtros_transacoes,
+    consultar_pagina_transacoes,
+    resumir_transacoes,
+    obter_categorias_transacoes,
+    obter_transacao,
+    traduzir_ordem_tabela
 )
 from dashboard_v2.utils.graficos import (
     criar_grafico_evolucao,
@@ -47,6 +54,7 @@ from dashboard_v2.utils.graficos import (
     criar_grafico_ideals_comparison
 )
 from dashboard_v2.callbacks.budget_callbacks import register_budget_callbacks
+from database.connection import get_connection
 
 # Sentinela usado no filtro de Titular para representar transações sem
 # titular identificado (PIX e transações do formato antigo de fatura, que
@@ -287,9 +295,20 @@ def atualizar_grafico_gasto_pais(mes_selecionado, pathname):
     """Atualiza gráfico de gasto por país"""
     return criar_grafico_gasto_por_pais(mes_selecionado)
 
-# Callback para tabela de transações
+# Disparos que mantêm a página atual (qualquer outro é filtro/ordenação nova)
+_GATILHOS_MANTEM_PAGINA = {
+    'tabela-transacoes.page_current',
+    'tabela-transacoes.page_size',
+    'store-versao-transacoes.data',
+}
+
+# Callback para tabela de transações (uma página por requisição)
 @callback(
-    Output('tabela-transacoes-container', 'children'),
+    [Output('tabela-transacoes', 'data'),
+     Output('tabela-transacoes', 'page_count'),
+     Output('resumo-tabela-transacoes', 'children'),
+     Output('tabela-transacoes', 'selected_rows'),
+     Output('tabela-transacoes', 'page_current')],
     [Input('store-mes-global', 'data'),
      Input('filtro-categoria-transacoes', 'value'),
      Input('filtro-fonte-transacoes', 'value'),
@@ -298,314 +317,176 @@ def atualizar_grafico_gasto_pais(mes_selecionado, pathname):
      Input('filtro-data-transacoes', 'start_date'),
      Input('filtro-data-transacoes', 'end_date'),
      Input('filtro-titular-transacoes', 'value'),
-     Input('filtro-parcelado-transacoes', 'value')]
+     Input('filtro-parcelado-transacoes', 'value'),
+     Input('tabela-transacoes', 'page_current'),
+     Input('tabela-transacoes', 'page_size'),
+     Input('tabela-transacoes', 'sort_by'),
+     Input('tabela-transacoes', 'filter_query'),
+     Input('store-versao-transacoes', 'data'),
+     Input('busca-descricao-transacoes', 'value')]
 )
 def atualizar_tabela_transacoes(mes_selecionado, categoria_filtro, fonte_filtro, status_filtro, 
                                 mes_comp_filtro, data_inicio, data_fim,
-                                titular_filtro=None, parcelado_filtro='TODOS'):
-    """Atualiza tabela de transações com filtros"""
-    from dash import dash_table
-    
-    df = carregar_transacoes(mes_selecionado)
-    
-    if len(df) == 0:
-        return html.P(
-            "Nenhuma transação encontrada",
-            style={'color': COLORS['text_secondary'], 'textAlign': 'center', 'padding': '20px'}
-        )
-    
-    # Aplicar filtros
-    df_filtrado = df[df['valor'] > 0].copy()  # Apenas débitos
-    
-    # Filtros multi-select (listas)
-    if categoria_filtro and len(categoria_filtro) > 0:
-        df_filtrado = df_filtrado[df_filtrado['categoria'].isin(categoria_filtro)]
-    
-    if fonte_filtro and len(fonte_filtro) > 0:
-        df_filtrado = df_filtrado[df_filtrado['fonte'].isin(fonte_filtro)]
+                                titular_filtro=None, parcelado_filtro='TODOS',
+                                page_current=0, page_size=TAMANHO_PAGINA_TRANSACOES,
+                                sort_by=None, filter_query='', versao=None, busca=''):
+    """Atualiza a página atual da grade de transações com filtros"""
+    from dash import ctx
     
-    if status_filtro == 'CATEGORIZADAS':
-        df_filtrado = df_filtrado[df_filtrado['categoria'] != 'A definir']
-    elif status_filtro == 'PENDENTES':
-        df_filtrado = df_filtrado[df_filtrado['categoria'] == 'A definir']
+    # Filtro ou ordenação nova sempre começa da primeira página
+    if ctx.triggered_id is not None and not set(ctx.triggered_prop_ids) <= _GATILHOS_MANTEM_PAGINA:
+        page_current = 0
+    
+    # Filtros viram SQL: só a página exibida sai do banco
+    titular_filtro = titular_filtro or []
+    filtros = montar_filtros_transacoes(
+        mes_selecionado,
+        categorias=categoria_filtro,
+        fontes=fonte_filtro,
+        status=status_filtro,
+        meses_comp=mes_comp_filtro,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        titulares=[t for t in titular_filtro if t != SEM_TITULAR],
+        incluir_sem_titular=SEM_TITULAR in titular_filtro,
+        parcelado=parcelado_filtro,
+        filtro_tabela=filter_query,
+        busca=busca
+    )
     
-    # Filtro de mês de compensação (multi-select)
-    if mes_comp_filtro and len(mes_comp_filtro) > 0:
-        df_filtrado = df_filtrado[df_filtrado['mes_comp'].isin(mes_comp_filtro)]
+    # Subtotal e quantidade de TODAS as transações filtradas (uma consulta agregada)
+    total_transacoes, subtotal = resumir_transacoes(filtros)
     
-    # Filtro de titular (multi-select; inclui sentinela "sem titular" para
-    # PIX e transações do formato antigo, que não têm nome_titular)
-    if titular_filtro and len(titular_filtro) > 0:
-        nomes_reais = [t for t in titular_filtro if t != SEM_TITULAR]
-        incluir_sem_titular = SEM_TITULAR in titular_filtro
-        
-        if incluir_sem_titular and nomes_reais:
-            df_filtrado = df_filtrado[
-                df_filtrado['nome_titular'].isin(nomes_reais) | df_filtrado['nome_titular'].isna()
-            ]
-        elif incluir_sem_titular:
-            df_filtrado = df_filtrado[df_filtrado['nome_titular'].isna()]
+    if total_transacoes == 0:
+        sem_filtros = montar_filtros_transacoes(mes_selecionado, apenas_debitos=False)
+        if resumir_transacoes(sem_filtros)[0] == 0:
+            mensagem = "Nenhuma transação encontrada"
         else:
-            df_filtrado = df_filtrado[df_filtrado['nome_titular'].isin(nomes_reais)]
-    
-    # Filtro de parcelado (Sim/Não/Todas)
-    if parcelado_filtro == 'SIM':
-        df_filtrado = df_filtrado[df_filtrado['qtd_parcelas'].notna()]
-    elif parcelado_filtro == 'NAO':
-        df_filtrado = df_filtrado[df_filtrado['qtd_parcelas'].isna()]
-    
-    # Filtro de data
-    if data_inicio:
-        try:
-            df_filtrado = df_filtrado[df_filtrado['data'] >= pd.to_datetime(data_inicio)]
-        except:
-            pass
-    if data_fim:
-        try:
-            df_filtrado = df_filtrado[df_filtrado['data'] <= pd.to_datetime(data_fim)]
-        except:
-            pass
-    
-    if len(df_filtrado) == 0:
-        return html.P(
-            "Nenhuma transação encontrada com os filtros aplicados",
-            style={'color': COLORS['text_secondary'], 'textAlign': 'center', 'padding': '20px'}
-        )
-    
-    # Calcular subtotal ANTES de limitar as linhas (usar todas as transações filtradas)
-    total_transacoes = len(df_filtrado)
-    subtotal = df_filtrado['valor_normalizado'].sum()
-    
-    # Preparar dados para tabela
-    df_tabela = df_filtrado[['id', 'data', 'descricao', 'valor_normalizado', 'categoria', 'fonte', 'mes_comp',
-                              'nome_titular', 'parcela_atual', 'qtd_parcelas']].copy()
-    df_tabela = df_tabela.sort_values(['mes_comp', 'fonte', 'data'], ascending=[True, False, True]).head(100)  # Limitar a 100
+            mensagem = "Nenhuma transação encontrada com os filtros aplicados"
+        return [], 1, html.Span(
+            mensagem,
+            style={'color': COLORS['text_secondary'], 'fontSize': FONTS['size']['sm']}
+        ), [], 0
+    
+    page_size = page_size or TAMANHO_PAGINA_TRANSACOES
+    total_paginas = -(-total_transacoes // page_size)
+    pagina = min(page_current or 0, total_paginas - 1)
+    
+    # Só a página pedida, já ordenada pelo banco
+    df_tabela, _ = consultar_pagina_transacoes(
+        filtros,
+        limite=page_size,
+        ordem=traduzir_ordem_tabela(sort_by),
+        deslocamento=pagina * page_size
+    )
     
     df_tabela['data'] = pd.to_datetime(df_tabela['data']).dt.strftime('%d/%m/%Y')
-    df_tabela['valor'] = df_tabela['valor_normalizado'].apply(lambda x: f"R$ {x:,.2f}")
-    
-    # Obter listas de categorias disponíveis
-    categorias_disponiveis = sorted(df['categoria'].unique().tolist())
-    
-    # Criar tabela simples com checkboxes e botões de edição
-    rows = []
-    for idx, row in df_tabela.iterrows():
-        categoria_style = {
-            'backgroundColor': COLORS['warning'], 
-            'color': COLORS['bg_primary'],
-            'padding': '4px 8px',
-            'borderRadius': '4px',
-            'fontWeight': 'bold',
-            'display': 'inline-block'
-        } if row['categoria'] == 'A definir' else {'display': 'inline-block'}
-        
-        # Checkbox de seleção em bloco (disponível para qualquer status, não só "A definir")
-        checkbox = dcc.Checklist(
-            id={'type': 'checkbox-transacao', 'index': row['id']},
-            options=[{'label': '', 'value': row['id']}],
-            value=[],
-            style={'margin': '0'}
-        )
-        
-        # Botão de edição de categoria (disponível para qualquer status)
-        edit_button = html.Button(
-            '✏️',
-            id={'type': 'btn-edit-transacao', 'index': row['id']},
-            n_clicks=0,
-            style={
-                'backgroundColor': COLORS['primary'],
-                'color': 'white',
-                'border': 'none',
-                'padding': '6px 12px',
-                'borderRadius': '6px',
-                'cursor': 'pointer',
-                'fontSize': '14px'
-            }
+    df_tabela['nome_titular'] = df_tabela['nome_titular'].fillna('—')
+    # Badge de parcela (ex.: "3/6"), quando disponível
+    df_tabela['parcela'] = [
+        f"{int(atual)}/{int(qtd)}" if pd.notna(qtd) else '—'
+        for atual, qtd in zip(df_tabela['parcela_atual'], df_tabela['qtd_parcelas'])
+    ]
+    # Célula de edição de categoria (disponível para qualquer status)
+    df_tabela['acoes'] = '✏️'
+    
+    colunas = ['id', 'data', 'descricao', 'valor_normalizado', 'categoria', 'fonte',
+               'mes_comp', 'nome_titular', 'parcela', 'acoes']
+    
+    inicio = pagina * page_size
+    resumo = [
+        html.Span(
+            f"Mostrando {inicio + 1}–{inicio + len(df_tabela)} de {total_transacoes} transações",
+            style={'color': COLORS['text_secondary'], 'fontSize': FONTS['size']['sm']}
+        ),
+        html.Span(
+            f" • Total: R$ {subtotal:,.2f} ({total_transacoes} transações)",
+            style={'color': COLORS['primary'], 'fontSize': FONTS['size']['base'], 'fontWeight': FONTS['weight']['bold'], 'marginLeft': '16px'}
         )
-        
-        # Badge de parcela (ex.: "3/6"), quando disponível
-        if pd.notna(row.get('qtd_parcelas')):
-            parcela_texto = f"{int(row['parcela_atual'])}/{int(row['qtd_parcelas'])}"
-        else:
-            parcela_texto = '—'
-        
-        rows.append(html.Tr([
-            html.Td(checkbox, style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}", 'textAlign': 'center'}),
-            html.Td(row['data'], style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}"}),
-            html.Td(row['descricao'], style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}"}),
-            html.Td(f"R$ {row['valor_normalizado']:,.2f}", style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}"}),
-            html.Td(html.Span(row['categoria'], style=categoria_style), style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}"}),
-            html.Td(row['fonte'], style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}"}),
-            html.Td(row['mes_comp'], style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}"}),
-            html.Td(row.get('nome_titular') or '—', style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}"}),
-            html.Td(parcela_texto, style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}", 'textAlign': 'center'}),
-            html.Td(edit_button, style={'padding': '12px', 'borderBottom': f"1px solid {COLORS['border']}", 'textAlign': 'center'}),
-        ]))
+    ]
     
-    return html.Div([
-        # Modal de edição
-        dbc.Modal([
-            dbc.ModalHeader(dbc.ModalTitle("Editar Categoria")),
-            dbc.ModalBody([
-                html.Div([
-                    html.Label("Transação:", style={'fontWeight': 'bold', 'color': COLORS['text_primary'], 'marginBottom': '8px'}),
-                    html.P(id='modal-transacao-descricao', style={'color': COLORS['text_secondary'], 'marginBottom': '16px'}),
-                    html.Label("Nova Categoria:", style={'fontWeight': 'bold', 'color': COLORS['text_primary'], 'marginBottom': '8px'}),
-                    dcc.Dropdown(
-                        id='modal-dropdown-categoria',
-                        options=[{'label': cat, 'value': cat} for cat in categorias_disponiveis],
-                        value=None,
-                        clearable=False,
-                        className='dropdown-white-text',
-                        style={
-                            'marginBottom': '16px',
-                        }
-                    )
-                ])
-            ]),
-            dbc.ModalFooter([
-                dbc.Button("Cancelar", id="modal-btn-cancelar", color="secondary", className="me-2"),
-                dbc.Button("Salvar", id="modal-btn-salvar", color="primary")
-            ])
-        ], id="modal-edit-transacao", is_open=False, backdrop=True),
-        
-        # Store para guardar ID da transação sendo editada
-        dcc.Store(id='store-transacao-id'),
-        
-        # Estatísticas
-        html.Div([
-            html.Span(
-                f"Mostrando {len(df_tabela)} de {total_transacoes} transações",
-                style={'color': COLORS['text_secondary'], 'fontSize': FONTS['size']['sm']}
-            ),
-            html.Span(
-                f" • Total: R$ {subtotal:,.2f} ({total_transacoes} transações)",
-                style={'color': COLORS['primary'], 'fontSize': FONTS['size']['base'], 'fontWeight': FONTS['weight']['bold'], 'marginLeft': '16px'}
-            )
-        ], style={'marginBottom': '16px'}),
-        
-        # Tabela
-        html.Div([
-            html.Table([
-                html.Thead(html.Tr([
-                    html.Th('☑', style={'padding': '12px', 'textAlign': 'center', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold', 'width': '50px'}),
-                    html.Th('Data', style={'padding': '12px', 'textAlign': 'left', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold'}),
-                    html.Th('Descrição', style={'padding': '12px', 'textAlign': 'left', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold'}),
-                    html.Th('Valor', style={'padding': '12px', 'textAlign': 'left', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold'}),
-                    html.Th('Categoria', style={'padding': '12px', 'textAlign': 'left', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold'}),
-                    html.Th('Fonte', style={'padding': '12px', 'textAlign': 'left', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold'}),
-                    html.Th('Mês', style={'padding': '12px', 'textAlign': 'left', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold'}),
-                    html.Th('Titular', style={'padding': '12px', 'textAlign': 'left', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold'}),
-                    html.Th('Parcela', style={'padding': '12px', 'textAlign': 'center', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold'}),
-                    html.Th('Ações', style={'padding': '12px', 'textAlign': 'center', 'borderBottom': f"2px solid {COLORS['border']}", 'color': COLORS['text_primary'], 'fontWeight': 'bold'}),
-                ])),
-                html.Tbody(rows, style={'color': COLORS['text_primary']})
-            ], style={'width': '100%', 'borderCollapse': 'collapse', 'fontSize': FONTS['size']['sm']})
-        ], style={'overflowX': 'auto'}),
-        
-        # Container para armazenar dados da tabela (para atualização após salvar)
-        html.Div(id='dummy-output-transacoes', style={'display': 'none'})
-    ])
+    return df_tabela[colunas].to_dict('records'), total_paginas, resumo, [], pagina
 
 
 # Callback para abrir modal de edição
 @callback(
     [Output('modal-edit-transacao', 'is_open'),
      Output('store-transacao-id', 'data'),
-     Output('modal-transacao-descricao', 'children')],
-    [Input({'type': 'btn-edit-transacao', 'index': ALL}, 'n_clicks'),
+     Output('modal-transacao-descricao', 'children'),
+     Output('modal-dropdown-categoria', 'options'),
+     Output('tabela-transacoes', 'active_cell')],
+    [Input('tabela-transacoes', 'active_cell'),
      Input('modal-btn-cancelar', 'n_clicks'),
      Input('modal-btn-salvar', 'n_clicks')],
-    [State('modal-edit-transacao', 'is_open'),
-     State('store-transacao-id', 'data'),
-     State('store-mes-global', 'data')],
+    [State('store-mes-global', 'data')],
     prevent_initial_call=True
 )
-def toggle_modal_edit(edit_clicks, cancel_clicks, save_clicks, is_open, transacao_id, mes_selecionado):
+def toggle_modal_edit(active_cell, cancel_clicks, save_clicks, mes_selecionado):
     """Abre/fecha modal de edição"""
-    from dash import ctx
+    from dash import ctx, no_update
     
     if not ctx.triggered:
-        return False, None, ""
+        return False, None, "", no_update, no_update
     
     trigger_id = ctx.triggered[0]['prop_id']
     
-    # Clicou no botão de editar
-    if 'btn-edit-transacao' in trigger_id:
-        # Pegar ID da transação do botão clicado
-        import json
-        button_id = json.loads(trigger_id.split('.')[0])
-        transacao_id = button_id['index']
+    # Clicou em uma célula da grade: só a coluna ✏️ abre o modal
+    if trigger_id.startswith('tabela-transacoes.'):
+        if not active_cell or active_cell.get('column_id') != 'acoes':
+            return no_update, no_update, no_update, no_update, no_update
         
-        # Buscar descrição da transação
-        df = carregar_transacoes(mes_selecionado)
-        transacao = df[df['id'] == transacao_id].iloc[0]
+        transacao_id = active_cell.get('row_id')
+        transacao = obter_transacao(transacao_id)
+        if transacao is None:
+            return no_update, no_update, no_update, no_update, None
         descricao = f"{transacao['descricao']} - R$ {transacao['valor_normalizado']:,.2f}"
+        opcoes = [{'label': cat, 'value': cat} for cat in obter_categorias_transacoes(mes_selecionado)]
         
-        return True, transacao_id, descricao
+        # Limpa a célula ativa para o mesmo ✏️ poder ser clicado de novo
+        return True, transacao_id, descricao, opcoes, None
     
     # Clicou em cancelar ou salvar - fechar modal
-    return False, None, ""
+    return False, None, "", no_update, no_update
 
 # Callback para salvar alteração de categoria
 @callback(
-    Output('tabela-transacoes-container', 'children', allow_duplicate=True),
+    [Output('store-versao-transacoes', 'data', allow_duplicate=True),
+     Output('resumo-tabela-transacoes', 'children', allow_duplicate=True)],
     Input('modal-btn-salvar', 'n_clicks'),
     [State('store-transacao-id', 'data'),
      State('modal-dropdown-categoria', 'value'),
-     State('store-mes-global', 'data'),
-     State('filtro-categoria-transacoes', 'value'),
-     State('filtro-fonte-transacoes', 'value'),
-     State('filtro-status-transacoes', 'value'),
-     State('filtro-mes-comp-transacoes', 'value'),
-     State('filtro-data-transacoes', 'start_date'),
-     State('filtro-data-transacoes', 'end_date'),
-     State('filtro-titular-transacoes', 'value'),
-     State('filtro-parcelado-transacoes', 'value')],
+     State('store-versao-transacoes', 'data')],
     prevent_initial_call=True
 )
-def salvar_categoria(n_clicks, transacao_id, nova_categoria, mes_selecionado, categoria_filtro, 
-                    fonte_filtro, status_filtro, mes_comp_filtro, data_inicio, data_fim,
-                    titular_filtro=None, parcelado_filtro='TODOS'):
-    """Salva nova categoria no banco e recarrega tabela"""
+def salvar_categoria(n_clicks, transacao_id, nova_categoria, versao):
+    """Salva nova categoria no banco e recarrega a página atual da grade"""
     from dash import no_update
     
     # Se não houver clique válido, não fazer nada
     if not n_clicks:
-        return no_update
+        return no_update, no_update
         
     # Se não houver dados válidos, não fazer nada
     if not transacao_id or not nova_categoria:
-        return no_update
-    
-    import sqlite3
+        return no_update, no_update
     
     # Caminho correto do banco (raiz do projeto: dados/db/financeiro.db)
-    db_path = BASE_DIR.parent.parent / 'dados' / 'db' / 'financeiro.db'
+    db_path = DB_PATH
     
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            'UPDATE lancamentos SET Categoria = ? WHERE rowid = ?',
-            (nova_categoria, transacao_id)
-        )
-        
-        conn.commit()
-        conn.close()
+        with get_connection(db_path) as conn:
+            conn.execute(
+                'UPDATE lancamentos SET Categoria = ? WHERE rowid = ?',
+                (nova_categoria, transacao_id)
+            )
         
-        # Recarregar tabela com filtros atuais
-        return atualizar_tabela_transacoes(
-            mes_selecionado, categoria_filtro, fonte_filtro, status_filtro,
-            mes_comp_filtro, data_inicio, data_fim,
-            titular_filtro, parcelado_filtro
-        )
+        # Nova versão -> atualizar_tabela_transacoes recarrega com filtros atuais
+        return (versao or 0) + 1, no_update
         
     except Exception as e:
         print(f"Erro ao salvar categoria: {e}")
         print(f"DB Path: {db_path}")
-        return html.P(
+        return no_update, html.P(
             f"Erro ao salvar: {str(e)}",
             style={'color': COLORS['danger'], 'textAlign': 'center', 'padding': '20px'}
         )
@@ -766,14 +647,10 @@ def atualizar_metricas_ideals(mes_selecionado, view_by, categoria_filtro, fonte_
 )
 def popular_dropdown_categoria_bloco(pathname, status_filtro):
     """Popula dropdown de categoria para categorização em bloco"""
-    import sqlite3
-    
-    db_path = BASE_DIR.parent.parent / 'dados' / 'db' / 'financeiro.db'
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(DB_PATH)
     
     query = "SELECT DISTINCT Categoria FROM lancamentos WHERE Categoria != 'A definir' ORDER BY Categoria"
     categorias = pd.read_sql_query(query, conn)['Categoria'].tolist()
-    conn.close()
     
     return [{'label': cat, 'value': cat} for cat in categorias]
 
@@ -791,64 +668,53 @@ def toggle_controles_categorizacao(status_filtro):
     """
     return {'marginBottom': f"{SPACING['md']}px", 'display': 'block'}
 
+# Callback para selecionar/desselecionar todas as linhas da página
+@callback(
+    Output('tabela-transacoes', 'selected_rows', allow_duplicate=True),
+    [Input('btn-selecionar-todos', 'n_clicks'),
+     Input('btn-desselecionar-todos', 'n_clicks')],
+    State('tabela-transacoes', 'data'),
+    prevent_initial_call=True
+)
+def selecionar_transacoes(n_selecionar, n_desselecionar, dados):
+    """Marca (ou desmarca) todas as linhas da página exibida"""
+    from dash import ctx
+    
+    if ctx.triggered_id == 'btn-selecionar-todos':
+        return list(range(len(dados or [])))
+    return []
+
 # Callback para categorização em bloco
 @callback(
     [Output('mensagem-bloco', 'children'),
      Output('mensagem-bloco', 'style'),
-     Output('tabela-transacoes-container', 'children', allow_duplicate=True)],
+     Output('store-versao-transacoes', 'data', allow_duplicate=True)],
     [Input('btn-categorizar-bloco', 'n_clicks')],
     [State('dropdown-categoria-bloco', 'value'),
-     State({'type': 'checkbox-transacao', 'index': ALL}, 'value'),
-     State({'type': 'checkbox-transacao', 'index': ALL}, 'id'),
-     State('store-mes-global', 'data'),
-     State('filtro-categoria-transacoes', 'value'),
-     State('filtro-fonte-transacoes', 'value'),
-     State('filtro-status-transacoes', 'value'),
-     State('filtro-mes-comp-transacoes', 'value'),
-     State('filtro-data-transacoes', 'start_date'),
-     State('filtro-data-transacoes', 'end_date'),
-     State('filtro-titular-transacoes', 'value'),
-     State('filtro-parcelado-transacoes', 'value')],
+     State('tabela-transacoes', 'selected_row_ids'),
+     State('store-versao-transacoes', 'data')],
     prevent_initial_call=True
 )
-def categorizar_bloco(n_clicks, categoria, checkboxes_values, checkboxes_ids, mes_selecionado, 
-                      categoria_filtro, fonte_filtro, status_filtro, mes_comp_filtro, data_inicio, data_fim,
-                      titular_filtro=None, parcelado_filtro='TODOS'):
+def categorizar_bloco(n_clicks, categoria, ids_selecionados, versao):
     """Categoriza múltiplas transações de uma vez"""
     from dash import no_update
-    import sqlite3
     
     if not n_clicks or not categoria:
         return no_update, no_update, no_update
     
-    # Coletar IDs selecionados
-    ids_selecionados = []
-    for values, id_dict in zip(checkboxes_values, checkboxes_ids):
-        if values:  # Se checkbox marcado
-            ids_selecionados.append(id_dict['index'])
-    
+    ids_selecionados = list(ids_selecionados or [])
     if not ids_selecionados:
         return "Nenhuma transação selecionada", {'color': COLORS['danger'], 'marginTop': '10px'}, no_update
     
     # Atualizar banco de dados
-    db_path = BASE_DIR.parent.parent / 'dados' / 'db' / 'financeiro.db'
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
     placeholders = ','.join('?' * len(ids_selecionados))
     query = f"UPDATE lancamentos SET Categoria = ? WHERE rowid IN ({placeholders})"
-    cursor.execute(query, [categoria] + ids_selecionados)
-    
-    conn.commit()
-    conn.close()
-    
-    # Recarregar tabela
-    tabela_atualizada = atualizar_tabela_transacoes(mes_selecionado, categoria_filtro, fonte_filtro, 
-                                                     status_filtro, mes_comp_filtro, data_inicio, data_fim,
-                                                     titular_filtro, parcelado_filtro)
+    with get_connection(DB_PATH) as conn:
+        conn.execute(query, [categoria] + ids_selecionados)
     
     mensagem = f"✓ {len(ids_selecionados)} transação(ões) categorizada(s) como '{categoria}'"
-    return mensagem, {'color': COLORS['success'], 'marginTop': '10px', 'fontWeight': 'bold'}, tabela_atualizada
+    # Nova versão -> a grade recarrega a página atual
+    return mensagem, {'color': COLORS['success'], 'marginTop': '10px', 'fontWeight': 'bold'}, (versao or 0) + 1
 
 # Health check endpoint para monitoramento
 @app.server.route('/health')
@@ -864,7 +730,6 @@ def health_check():
 # ===== MAIN =====
 if __name__ == '__main__':
     import os
-    from dashboard_v2.utils.database import DB_PATH
     
     # Configurações de ambiente
     DEBUG_MODE = os.getenv('DASH_DEBUG', 'False').lower() == 'true'
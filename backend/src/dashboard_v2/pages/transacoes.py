@@ -1,11 +1,33 @@
 """
 Página Transações - Lista e categorização
-Tabela interativa com filtros
+Tabela interativa com filtros (paginada no servidor)
 """
 
 from dash import html, dcc, dash_table
+from dash.dash_table.Format import Format, Group, Scheme, Symbol
+import dash_bootstrap_components as dbc
 from dashboard_v2.config import COLORS, FONTS, SPACING
 
+# Linhas por página da grade (cada página é uma consulta LIMIT/OFFSET)
+TAMANHO_PAGINA_TRANSACOES = 50
+
+# Colunas da grade; os ids de dados são os de COLUNAS_TABELA_TRANSACOES
+COLUNAS_GRADE_TRANSACOES = [
+    {'name': 'Data', 'id': 'data'},
+    {'name': 'Descrição', 'id': 'descricao'},
+    {
+        'name': 'Valor', 'id': 'valor_normalizado', 'type': 'numeric',
+        'format': Format(group=Group.yes, precision=2, scheme=Scheme.fixed,
+                         symbol=Symbol.yes, symbol_prefix='R$ ')
+    },
+    {'name': 'Categoria', 'id': 'categoria'},
+    {'name': 'Fonte', 'id': 'fonte'},
+    {'name': 'Mês', 'id': 'mes_comp'},
+    {'name': 'Titular', 'id': 'nome_titular'},
+    {'name': 'Parcela', 'id': 'parcela'},
+    {'name': 'Ações', 'id': 'acoes'},
+]
+
 # Estilo para dropdowns
 dropdown_style = {
     'backgroundColor': COLORS['bg_card'],
@@ -214,6 +236,28 @@ def create_transacoes_page():
                         className='custom-dropdown'
                     )
                 ], style={'flex': '1', 'minWidth': '200px'}),
+                
+                html.Div([
+                    html.Label(
+                        "Buscar descrição",
+                        style={
+                            'color': COLORS['text_secondary'],
+                            'fontSize': FONTS['size']['sm'],
+                            'fontWeight': FONTS['weight']['semibold'],
+                            'marginBottom': '8px',
+                            'display': 'block'
+                        }
+                    ),
+                    # Busca no índice de descrições (atualiza ao parar de digitar)
+                    dcc.Input(
+                        id='busca-descricao-transacoes',
+                        type='search',
+                        value='',
+                        placeholder='Ex: UBER, IFOOD...',
+                        debounce=True,
+                        style={**dropdown_style, 'width': '100%', 'padding': '8px 12px'}
+                    )
+                ], style={'flex': '1', 'minWidth': '200px'}),
             ], style={
                 'display': 'flex',
                 'flexWrap': 'wrap',
@@ -287,15 +331,104 @@ def create_transacoes_page():
             style={'display': 'none'}  # Inicialmente oculto
         ),
         
+        # Modal de edição (a transação vem da célula ✏️ clicada)
+        dbc.Modal([
+            dbc.ModalHeader(dbc.ModalTitle("Editar Categoria")),
+            dbc.ModalBody([
+                html.Div([
+                    html.Label("Transação:", style={'fontWeight': 'bold', 'color': COLORS['text_primary'], 'marginBottom': '8px'}),
+                    html.P(id='modal-transacao-descricao', style={'color': COLORS['text_secondary'], 'marginBottom': '16px'}),
+                    html.Label("Nova Categoria:", style={'fontWeight': 'bold', 'color': COLORS['text_primary'], 'marginBottom': '8px'}),
+                    dcc.Dropdown(
+                        id='modal-dropdown-categoria',
+                        options=[],
+                        value=None,
+                        clearable=False,
+                        className='dropdown-white-text',
+                        style={
+                            'marginBottom': '16px',
+                        }
+                    )
+                ])
+            ]),
+            dbc.ModalFooter([
+                dbc.Button("Cancelar", id="modal-btn-cancelar", color="secondary", className="me-2"),
+                dbc.Button("Salvar", id="modal-btn-salvar", color="primary")
+            ])
+        ], id="modal-edit-transacao", is_open=False, backdrop=True),
+        
+        # Store para guardar ID da transação sendo editada
+        dcc.Store(id='store-transacao-id'),
+        # Incrementado a cada gravação para recarregar a página atual da grade
+        dcc.Store(id='store-versao-transacoes', data=0),
+        
         # Tabela de transações
         html.Div([
             html.Div(
-                id='tabela-transacoes-container',
+                id='resumo-tabela-transacoes',
                 children=[
-                    html.P(
+                    html.Span(
                         "Carregando transações...",
-                        style={'color': COLORS['text_secondary'], 'textAlign': 'center'}
+                        style={'color': COLORS['text_secondary'], 'fontSize': FONTS['size']['sm']}
                     )
+                ],
+                style={'marginBottom': '16px'}
+            ),
+            dash_table.DataTable(
+                id='tabela-transacoes',
+                columns=COLUNAS_GRADE_TRANSACOES,
+                data=[],
+                # Paginação, ordenação e filtro feitos no banco (callback)
+                page_action='custom',
+                page_current=0,
+                page_size=TAMANHO_PAGINA_TRANSACOES,
+                page_count=1,
+                sort_action='custom',
+                sort_mode='multi',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
+                row_selectable='multi',
+                selected_rows=[],
+                virtualization=True,
+                fixed_rows={'headers': True},
+                style_table={'overflowX': 'auto', 'height': '600px', 'overflowY': 'auto'},
+                style_header={
+                    'backgroundColor': COLORS['bg_secondary'],
+                    'color': COLORS['text_primary'],
+                    'fontWeight': 'bold',
+                    'borderBottom': f"2px solid {COLORS['border']}"
+                },
+                style_filter={
+                    'backgroundColor': COLORS['bg_card'],
+                    'color': COLORS['text_primary']
+                },
+                style_cell={
+                    'backgroundColor': COLORS['bg_card'],
+                    'color': COLORS['text_primary'],
+                    'border': 'none',
+                    'borderBottom': f"1px solid {COLORS['border']}",
+                    'padding': '12px',
+                    'textAlign': 'left',
+                    'fontSize': FONTS['size']['sm'],
+                    'minWidth': '90px'
+                },
+                style_cell_conditional=[
+                    {'if': {'column_id': 'descricao'}, 'minWidth': '260px'},
+                    {'if': {'column_id': ['parcela', 'acoes']}, 'textAlign': 'center', 'cursor': 'pointer'},
+                ],
+                style_data_conditional=[
+                    {
+                        'if': {'filter_query': '{categoria} = "A definir"', 'column_id': 'categoria'},
+                        'backgroundColor': COLORS['warning'],
+                        'color': COLORS['bg_primary'],
+                        'fontWeight': 'bold'
+                    },
+                    {
+                        'if': {'state': 'active'},
+                        'backgroundColor': COLORS['bg_hover'],
+                        'border': f"1px solid {COLORS['primary']}"
+                    },
                 ]
             )
         ], className="custom-card")
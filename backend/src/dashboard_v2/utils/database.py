@@ -3,27 +3,149 @@ Utilitários de banco de dados
 Funções para carregar e processar dados do SQLite
 """
 
-import sqlite3
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from pathlib import Path
 import pandas as pd
 
+from database.connection import get_connection, get_shared_connection
+from database.monthly_summary_repository import MonthlySummaryRepository, DESCRICOES_EXCLUIDAS
+from database.month_key import month_key_sql, ensure_month_key
+from database.description_search import (
+    ensure_description_search, search_condition, exclusion_condition,
+)
+
 # Caminho do banco
 BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent.parent
 DB_PATH = BASE_DIR / 'dados' / 'db' / 'financeiro.db'
 
+# Lançamentos que o dashboard nunca mostra (investimentos, salário e
+# pagamentos de fatura/transferências internas)
+_CONDICAO_BASE = """Categoria NOT IN ('INVESTIMENTOS', 'SALÁRIO', 'Salário', 'Investimentos')
+      AND (
+        Descricao NOT LIKE '%ITAU VISA%'
+        AND Descricao NOT LIKE '%ITAU BLACK%'
+        AND Descricao NOT LIKE '%ITAU MASTER%'
+        AND Descricao NOT LIKE '%PGTO FATURA%'
+        AND Descricao NOT LIKE '%PAGAMENTO CARTAO%'
+        AND Descricao NOT LIKE '%PAGAMENTO EFETUADO%'
+      )"""
+
+# Mesma condição com os trechos procurados no índice lancamentos_fts (uma
+# consulta ao índice em vez de seis LIKE por linha)
+_CONDICAO_BASE_FTS = (
+    "Categoria NOT IN ('INVESTIMENTOS', 'SALÁRIO', 'Salário', 'Investimentos')\n      AND "
+    + exclusion_condition(DESCRICOES_EXCLUIDAS)
+)
+
+# Cache de transações compartilhado pelos callbacks
+CACHE_TTL_SEGUNDOS = 30
+CACHE_MAX_ENTRADAS = 16
+
+
+class _CacheTransacoes:
+    """
+    Cache LRU com TTL para os DataFrames de carregar_transacoes().
+
+    Uma troca de filtro dispara vários callbacks ao mesmo tempo (página +
+    gráficos), todos pedindo o mesmo DataFrame. A chave inclui a versão do
+    banco, então qualquer commit invalida o cache; e chamadas simultâneas
+    para a mesma chave esperam uma única consulta (single-flight).
+    """
+    
+    def __init__(self, ttl=CACHE_TTL_SEGUNDOS, max_entradas=CACHE_MAX_ENTRADAS):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()  # chave -> (instante, DataFrame)
+        self._em_andamento = {}         # chave -> Future
+        self._lock = threading.Lock()
+    
+    def obter(self, chave, carregar):
+        """Retorna o DataFrame da chave, carregando uma única vez se preciso."""
+        agora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and agora - entrada[0] < self.ttl:
+                self._entradas.move_to_end(chave)
+                return entrada[1]
+            
+            futuro = self._em_andamento.get(chave)
+            dono = futuro is None
+            if dono:
+                futuro = Future()
+                self._em_andamento[chave] = futuro
+        
+        if not dono:
+            return futuro.result()
+        
+        try:
+            df = carregar()
+        except BaseException as e:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+            futuro.set_exception(e)
+            raise
+        
+        with self._lock:
+            self._entradas[chave] = (time.monotonic(), df)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+            self._em_andamento.pop(chave, None)
+        futuro.set_result(df)
+        return df
+    
+    def limpar(self):
+        """Descarta todas as entradas."""
+        with self._lock:
+            self._entradas.clear()
+
+
+_cache_transacoes = _CacheTransacoes()
+
+# Conexão compartilhada dedicada só a ler PRAGMA data_version: o valor muda
+# sempre que OUTRA conexão (de qualquer thread ou processo) faz commit no banco.
+_versao_lock = threading.Lock()
+
+
+def _versao_banco(db_path=None):
+    """Retorna um token que muda a cada commit no banco."""
+    with _versao_lock:
+        conn = get_shared_connection(db_path or DB_PATH, 'data_version')
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def limpar_cache_transacoes():
+    """Descarta o cache de transações (ex.: após alterações feitas por fora)."""
+    _cache_transacoes.limpar()
+
+
 def carregar_transacoes(mes_filtro='TODOS'):
     """
     Carrega transações do banco (exceto INVESTIMENTOS, SALÁRIO, pagamentos de fatura)
     
+    O resultado é compartilhado entre os callbacks pelo cache de transações
+    (chave: filtro + versão do banco); cada chamada recebe sua própria cópia.
+    
     Args:
         mes_filtro: Mês para filtrar (ex: 'Dezembro 2025') ou 'TODOS'
     
     Returns:
         DataFrame com as transações
     """
-    # Forçar nova conexão a cada chamada (sem cache)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
-    conn.execute("PRAGMA read_uncommitted = true")
+    chave = (str(DB_PATH), mes_filtro, _versao_banco())
+    df = _cache_transacoes.obter(chave, lambda: _consultar_transacoes(mes_filtro))
+    return df.copy()
+
+
+def _consultar_transacoes(mes_filtro='TODOS'):
+    """Executa a consulta de carregar_transacoes() no banco (sem cache)."""
+    _garantir_esquema()
+    # Conexão reutilizável da thread (leituras em autocommit sempre veem o último commit)
+    conn = get_connection(DB_PATH)
     
     # Query base
     query = """
@@ -35,31 +157,25 @@ def carregar_transacoes(mes_filtro='TODOS'):
         Categoria as categoria,
         Fonte as fonte,
         MesComp as mes_comp,
+        mes_key,
         NomeTitular as nome_titular,
         Titularidade as titularidade,
         ParcelaAtual as parcela_atual,
         QtdParcelas as qtd_parcelas,
         Pais as pais
     FROM lancamentos
-    WHERE Categoria NOT IN ('INVESTIMENTOS', 'SALÁRIO', 'Salário', 'Investimentos')
-      AND (
-        Descricao NOT LIKE '%ITAU VISA%'
-        AND Descricao NOT LIKE '%ITAU BLACK%'
-        AND Descricao NOT LIKE '%ITAU MASTER%'
-        AND Descricao NOT LIKE '%PGTO FATURA%'
-        AND Descricao NOT LIKE '%PAGAMENTO CARTAO%'
-        AND Descricao NOT LIKE '%PAGAMENTO EFETUADO%'
-      )
+    WHERE """ + _condicao_base() + """
     """
     
     # Adiciona filtro de mês se especificado
+    params = ()
     if mes_filtro != 'TODOS':
-        query += f" AND MesComp = '{mes_filtro}'"
+        query += " AND MesComp = ?"
+        params = (mes_filtro,)
     
     query += " ORDER BY data DESC"
     
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = pd.read_sql_query(query, conn, params=params)
     
     # Processar dados
     if len(df) > 0:
@@ -78,6 +194,481 @@ def carregar_transacoes(mes_filtro='TODOS'):
     
     return df
 
+
+_esquema_lock = threading.Lock()
+_esquema_verificado = set()
+_busca_disponivel = set()
+
+
+def _garantir_esquema():
+    """Bancos antigos: cria resumo_mensal, mes_key e o índice de busca uma vez por processo."""
+    with _esquema_lock:
+        if str(DB_PATH) in _esquema_verificado:
+            return
+        MonthlySummaryRepository(DB_PATH)
+        with get_connection(DB_PATH) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lancamentos'")
+            if cursor.fetchone():
+                ensure_month_key(cursor, 'lancamentos', 'MesComp')
+                if ensure_description_search(cursor):
+                    _busca_disponivel.add(str(DB_PATH))
+        _esquema_verificado.add(str(DB_PATH))
+
+
+def _busca_indexada():
+    """Indica se o banco atual tem o índice lancamentos_fts."""
+    return str(DB_PATH) in _busca_disponivel
+
+
+def _condicao_base():
+    """Condição dos lançamentos exibidos (usa o índice de busca quando existe)."""
+    return _CONDICAO_BASE_FTS if _busca_indexada() else _CONDICAO_BASE
+
+
+def carregar_resumo_mensal(mes_filtro='TODOS'):
+    """
+    Carrega o resumo mensal materializado (tabela resumo_mensal)
+
+    Uma linha por (mes_comp, categoria, fonte, titular, pais) com totais e
+    contagens, já sem INVESTIMENTOS/SALÁRIO e pagamentos de fatura (mesmos
+    filtros de carregar_transacoes). Os gráficos agregam a partir daqui, então
+    o custo depende do número de grupos e não do número de lançamentos.
+
+    Args:
+        mes_filtro: Mês para filtrar (ex: 'Dezembro 2025') ou 'TODOS'
+
+    Returns:
+        DataFrame com colunas mes_comp, mes_key, categoria, fonte, nome_titular,
+        pais, total, qtd, total_debitos, qtd_debitos (débito = valor positivo)
+    """
+    chave = ('resumo_mensal', str(DB_PATH), mes_filtro, _versao_banco())
+    df = _cache_transacoes.obter(chave, lambda: _consultar_resumo_mensal(mes_filtro))
+    return df.copy()
+
+
+def _consultar_resumo_mensal(mes_filtro='TODOS'):
+    """Executa a consulta de carregar_resumo_mensal() no banco (sem cache)."""
+    _garantir_esquema()
+    conn = get_connection(DB_PATH)
+
+    query = f"""
+    SELECT
+        mes_comp,
+        {month_key_sql('mes_comp')} as mes_key,
+        categoria,
+        fonte,
+        NULLIF(titular, '') as nome_titular,
+        NULLIF(pais, '') as pais,
+        total,
+        qtd,
+        total_debitos,
+        qtd_debitos
+    FROM resumo_mensal
+    WHERE categoria NOT IN ('INVESTIMENTOS', 'SALÁRIO', 'Salário', 'Investimentos')
+    """
+    params = ()
+    if mes_filtro != 'TODOS':
+        query += " AND mes_comp = ?"
+        params = (mes_filtro,)
+
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def carregar_totais_mensais(janela_meses=None, ultimos_meses=None):
+    """
+    Total de débitos por mês (mes_key AAAAMM), calculado no SQL
+
+    Parte do resumo mensal; meses gravados em formatos diferentes
+    ('Dezembro 2025', '2025-12') caem na mesma chave.
+
+    Args:
+        janela_meses: Só os N meses de calendário que terminam no mês mais recente
+        ultimos_meses: Só os N meses mais recentes que têm gastos
+
+    Returns:
+        DataFrame com colunas mes_key e valor, em ordem cronológica
+    """
+    chave = ('totais_mensais', str(DB_PATH), janela_meses, ultimos_meses, _versao_banco())
+    df = _cache_transacoes.obter(chave, lambda: _consultar_totais_mensais(janela_meses, ultimos_meses))
+    return df.copy()
+
+
+def _consultar_totais_mensais(janela_meses=None, ultimos_meses=None):
+    """Executa a consulta de carregar_totais_mensais() no banco (sem cache)."""
+    _garantir_esquema()
+
+    # indice = AAAA * 12 + MM: meses consecutivos viram inteiros consecutivos
+    query = f"""
+    WITH por_mes_comp AS (
+        SELECT mes_comp, SUM(total_debitos) as valor
+        FROM resumo_mensal
+        WHERE categoria NOT IN ('INVESTIMENTOS', 'SALÁRIO', 'Salário', 'Investimentos')
+          AND qtd_debitos > 0
+        GROUP BY mes_comp
+    ),
+    mensal AS (
+        SELECT {month_key_sql('mes_comp')} as mes_key, SUM(valor) as valor
+        FROM por_mes_comp
+        GROUP BY 1
+        HAVING mes_key IS NOT NULL
+    ),
+    indexado AS (
+        SELECT mes_key, valor, (mes_key / 100) * 12 + mes_key % 100 as indice FROM mensal
+    )
+    SELECT mes_key, valor FROM (
+        SELECT mes_key, valor FROM indexado
+        WHERE indice > (SELECT MAX(indice) FROM indexado) - ?
+        ORDER BY mes_key DESC
+        LIMIT ?
+    )
+    ORDER BY mes_key
+    """
+    params = (int(janela_meses) if janela_meses else 1 << 30, int(ultimos_meses) if ultimos_meses else -1)
+    return pd.read_sql_query(query, get_connection(DB_PATH), params=params)
+
+
+# Colunas da grade de transações -> expressão SQL. Só o que está aqui pode
+# ser usado para ordenar/filtrar (os ids vêm do navegador).
+COLUNAS_TABELA_TRANSACOES = {
+    'id': 'rowid',
+    'data': 'Data',
+    'descricao': 'Descricao',
+    'valor_normalizado': 'ABS(CAST(Valor AS REAL))',
+    'categoria': 'Categoria',
+    'fonte': 'Fonte',
+    'mes_comp': 'MesComp',
+    'mes_key': 'mes_key',
+    'nome_titular': 'NomeTitular',
+    'parcela_atual': 'ParcelaAtual',
+    'qtd_parcelas': 'QtdParcelas',
+}
+
+# Colunas ordenadas por outra: o mês segue a ordem cronológica (mes_key)
+_ORDENAR_COLUNA_POR = {'mes_comp': 'mes_key'}
+
+# Ordenação padrão da tabela de transações: (coluna, descendente?). O id no
+# fim desempata e torna a paginação determinística.
+ORDEM_TABELA_TRANSACOES = (
+    ('mes_key', False),
+    ('fonte', True),
+    ('data', False),
+    ('id', False),
+)
+
+
+def _data_sql(valor):
+    """Converte a data do DatePicker para o formato texto gravado em Data."""
+    data = pd.to_datetime(valor)
+    if data == data.normalize():
+        return data.strftime('%Y-%m-%d')
+    return data.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def montar_filtros_transacoes(mes_filtro='TODOS', categorias=None, fontes=None, status='TODOS',
+                              meses_comp=None, data_inicio=None, data_fim=None, titulares=None,
+                              incluir_sem_titular=False, parcelado='TODOS', apenas_debitos=True,
+                              filtro_tabela=None, mes_key_inicio=None, mes_key_fim=None, busca=None):
+    """
+    Monta a cláusula WHERE (parametrizada) dos filtros da página de transações
+
+    Parte dos mesmos filtros de carregar_transacoes (sem investimentos, salário
+    e pagamentos de fatura) e acrescenta os filtros da tela.
+
+    Args:
+        mes_filtro: Mês global (ex: 'Dezembro 2025') ou 'TODOS'
+        categorias: Lista de categorias (vazia/None = todas)
+        fontes: Lista de fontes (vazia/None = todas)
+        status: 'TODOS', 'CATEGORIZADAS' ou 'PENDENTES'
+        meses_comp: Lista de meses de compensação (vazia/None = todos)
+        data_inicio, data_fim: Limites de data (inclusive); inválidos são ignorados
+        titulares: Lista de nomes de titular (vazia/None = sem filtro)
+        incluir_sem_titular: Inclui transações sem titular (PIX/formato antigo)
+        parcelado: 'TODOS', 'SIM' ou 'NAO'
+        apenas_debitos: Só valores positivos (gastos)
+        filtro_tabela: filter_query digitado no cabeçalho da grade
+        mes_key_inicio, mes_key_fim: Faixa de meses AAAAMM (inclusive)
+        busca: Trecho da descrição (caixa de busca; índice lancamentos_fts)
+
+    Returns:
+        Tupla (clausula_where, parametros)
+    """
+    _garantir_esquema()
+    condicoes = [f"({_condicao_base()})"]
+    params = []
+
+    def em_lista(coluna, valores):
+        condicoes.append(f"{coluna} IN ({', '.join('?' * len(valores))})")
+        params.extend(valores)
+
+    if mes_filtro != 'TODOS':
+        condicoes.append("MesComp = ?")
+        params.append(mes_filtro)
+
+    if apenas_debitos:
+        condicoes.append("CAST(Valor AS REAL) > 0")
+
+    if categorias:
+        em_lista("Categoria", list(categorias))
+    if fontes:
+        em_lista("Fonte", list(fontes))
+
+    if status == 'CATEGORIZADAS':
+        condicoes.append("Categoria != 'A definir'")
+    elif status == 'PENDENTES':
+        condicoes.append("Categoria = 'A definir'")
+
+    if meses_comp:
+        em_lista("MesComp", list(meses_comp))
+    if mes_key_inicio is not None:
+        condicoes.append("mes_key >= ?")
+        params.append(int(mes_key_inicio))
+    if mes_key_fim is not None:
+        condicoes.append("mes_key <= ?")
+        params.append(int(mes_key_fim))
+
+    titulares = list(titulares or [])
+    if titulares and incluir_sem_titular:
+        condicoes.append(f"(NomeTitular IN ({', '.join('?' * len(titulares))}) OR NomeTitular IS NULL)")
+        params.extend(titulares)
+    elif titulares:
+        em_lista("NomeTitular", titulares)
+    elif incluir_sem_titular:
+        condicoes.append("NomeTitular IS NULL")
+
+    if parcelado == 'SIM':
+        condicoes.append("QtdParcelas IS NOT NULL")
+    elif parcelado == 'NAO':
+        condicoes.append("QtdParcelas IS NULL")
+
+    for valor, operador in ((data_inicio, '>='), (data_fim, '<=')):
+        if not valor:
+            continue
+        try:
+            params.append(_data_sql(valor))
+        except (ValueError, TypeError):
+            continue
+        condicoes.append(f"Data {operador} ?")
+
+    if busca and busca.strip():
+        condicao, params_busca = search_condition(busca, use_index=_busca_indexada())
+        condicoes.append(condicao)
+        params.extend(params_busca)
+
+    for condicao, params_condicao in traduzir_filtro_tabela(filtro_tabela):
+        condicoes.append(condicao)
+        params.extend(params_condicao)
+
+    return " AND ".join(condicoes), params
+
+
+# Operadores do filter_query da DataTable -> SQL
+_OPERADORES_FILTRO = {
+    '=': '=', 'eq': '=',
+    '!=': '!=', 'ne': '!=',
+    '>': '>', 'gt': '>',
+    '>=': '>=', 'ge': '>=',
+    '<': '<', 'lt': '<',
+    '<=': '<=', 'le': '<=',
+}
+
+_TERMO_FILTRO = re.compile(r'^\{(\w+)\}\s+(s=|[=!<>]=?|eq|ne|gt|ge|lt|le|contains|datestartswith)\s+(.+)$')
+
+
+def _valor_filtro(texto):
+    """Valor de um termo do filter_query (sem aspas; número quando possível)."""
+    texto = texto.strip()
+    if len(texto) >= 2 and texto[0] == texto[-1] and texto[0] in '"\'`':
+        return texto[1:-1]
+    try:
+        return float(texto)
+    except ValueError:
+        return texto
+
+
+def traduzir_filtro_tabela(filter_query):
+    """
+    Converte o filter_query da DataTable (filter_action='custom') em SQL
+
+    Termos são ligados por '&&'. Colunas fora de COLUNAS_TABELA_TRANSACOES ou
+    operadores desconhecidos são ignorados.
+
+    Args:
+        filter_query: Ex: '{descricao} contains "UBER" && {valor_normalizado} > 100'
+
+    Returns:
+        Lista de tuplas (condicao_sql, parametros)
+    """
+    condicoes = []
+    for termo in (filter_query or '').split(' && '):
+        encontrado = _TERMO_FILTRO.match(termo.strip())
+        if not encontrado:
+            continue
+        coluna, operador, valor = encontrado.groups()
+        expressao = COLUNAS_TABELA_TRANSACOES.get(coluna)
+        if expressao is None:
+            continue
+        valor = _valor_filtro(valor)
+
+        if operador == 'contains' and coluna == 'descricao':
+            condicoes.append(search_condition(str(valor), use_index=_busca_indexada()))
+        elif operador == 'contains':
+            condicoes.append((f"{expressao} LIKE ?", [f"%{valor}%"]))
+        elif operador == 'datestartswith':
+            condicoes.append((f"{expressao} LIKE ?", [f"{valor}%"]))
+        elif operador == 's=':
+            condicoes.append((f"{expressao} = ?", [str(valor)]))
+        else:
+            condicoes.append((f"{expressao} {_OPERADORES_FILTRO[operador]} ?", [valor]))
+    return condicoes
+
+
+def traduzir_ordem_tabela(sort_by):
+    """
+    Converte o sort_by da DataTable (sort_action='custom') em ordem SQL
+
+    Args:
+        sort_by: Lista de {'column_id': ..., 'direction': 'asc'|'desc'}
+
+    Returns:
+        Tupla de (coluna, descendente?) ou None (= ordem padrão)
+    """
+    ordem = tuple(
+        (_ORDENAR_COLUNA_POR.get(item['column_id'], item['column_id']), item.get('direction') == 'desc')
+        for item in (sort_by or [])
+        if item.get('column_id') in COLUNAS_TABELA_TRANSACOES
+    )
+    return ordem or None
+
+
+def _ordem_completa(ordem):
+    """Ordem pedida + id como desempate final."""
+    ordem = list(ordem or ORDEM_TABELA_TRANSACOES)
+    if all(coluna != 'id' for coluna, _ in ordem):
+        ordem.append(('id', False))
+    return ordem
+
+
+def _condicao_apos(ordem, chave):
+    """Condição keyset: linhas depois de `chave` na ordem dada."""
+    # (a, b, c) depois de (x, y, z) == a > x OR (a = x AND (b > y OR (b = y AND c > z)))
+    condicao, params = None, []
+    for (coluna, desc), valor in reversed(list(zip(ordem, chave))):
+        expressao = COLUNAS_TABELA_TRANSACOES[coluna]
+        depois = f"{expressao} {'<' if desc else '>'} ?"
+        if condicao is None:
+            condicao, params = depois, [valor]
+        else:
+            condicao = f"({depois} OR ({expressao} = ? AND {condicao}))"
+            params = [valor, valor] + params
+    return condicao, params
+
+
+def consultar_pagina_transacoes(filtros, limite=100, apos=None, ordem=None, deslocamento=0):
+    """
+    Busca uma página da tabela de transações direto no banco
+
+    Args:
+        filtros: Resultado de montar_filtros_transacoes()
+        limite: Linhas por página
+        apos: Chave da última linha da página anterior (None = primeira página).
+            Só vale para colunas de ordenação sem NULL (a ordem padrão é assim)
+        ordem: Tupla de (coluna, descendente?) com colunas de
+            COLUNAS_TABELA_TRANSACOES (None = ORDEM_TABELA_TRANSACOES)
+        deslocamento: Linhas a pular (paginação por número de página)
+
+    Returns:
+        Tupla (DataFrame da página, chave para a próxima página ou None)
+    """
+    _garantir_esquema()
+    ordem = _ordem_completa(ordem)
+    where, params = filtros
+    params = list(params)
+    if apos is not None:
+        condicao, params_apos = _condicao_apos(ordem, apos)
+        where = f"{where} AND {condicao}"
+        params.extend(params_apos)
+
+    colunas = ",\n        ".join(f"{expressao} as {coluna}" for coluna, expressao in COLUNAS_TABELA_TRANSACOES.items())
+    order_by = ", ".join(
+        f"{COLUNAS_TABELA_TRANSACOES[coluna]} {'DESC' if desc else 'ASC'}" for coluna, desc in ordem
+    )
+    query = f"""
+    SELECT
+        {colunas}
+    FROM lancamentos
+    WHERE {where}
+    ORDER BY {order_by}
+    LIMIT ? OFFSET ?
+    """
+    params.extend([limite, deslocamento])
+
+    df = pd.read_sql_query(query, get_connection(DB_PATH), params=params)
+
+    proxima = None
+    if len(df) == limite:
+        ultima = df.iloc[-1]
+        # Escalares numpy viram tipos Python (int64 seria gravado como BLOB)
+        proxima = tuple(
+            ultima[coluna].item() if hasattr(ultima[coluna], 'item') else ultima[coluna]
+            for coluna, _ in ordem
+        )
+    return df, proxima
+
+
+def obter_transacao(transacao_id):
+    """
+    Busca uma transação pelo id (rowid)
+
+    Args:
+        transacao_id: rowid em lancamentos
+
+    Returns:
+        Dict com descricao e valor_normalizado, ou None
+    """
+    row = get_connection(DB_PATH).execute(
+        "SELECT Descricao, ABS(CAST(Valor AS REAL)) FROM lancamentos WHERE rowid = ?",
+        (transacao_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    return {'descricao': row[0], 'valor_normalizado': row[1]}
+
+
+def resumir_transacoes(filtros):
+    """
+    Quantidade e soma dos valores (absolutos) das transações filtradas
+
+    Args:
+        filtros: Resultado de montar_filtros_transacoes()
+
+    Returns:
+        Tupla (quantidade, subtotal)
+    """
+    where, params = filtros
+    query = f"""
+    SELECT COUNT(*), IFNULL(SUM(ABS(CAST(Valor AS REAL))), 0)
+    FROM lancamentos
+    WHERE {where}
+    """
+    quantidade, subtotal = get_connection(DB_PATH).execute(query, params).fetchone()
+    return quantidade, subtotal
+
+
+def obter_categorias_transacoes(mes_filtro='TODOS'):
+    """
+    Categorias presentes nas transações do mês (para o modal de edição)
+
+    Args:
+        mes_filtro: Mês (ex: 'Dezembro 2025') ou 'TODOS'
+
+    Returns:
+        Lista ordenada de categorias
+    """
+    where, params = montar_filtros_transacoes(mes_filtro, apenas_debitos=False)
+    query = f"SELECT DISTINCT Categoria FROM lancamentos WHERE {where} ORDER BY Categoria"
+    return [row[0] for row in get_connection(DB_PATH).execute(query, params).fetchall()]
+
 def obter_meses_disponiveis():
     """
     Retorna lista de meses disponíveis no banco
@@ -85,15 +676,17 @@ def obter_meses_disponiveis():
     Returns:
         Lista de strings com os meses (ex: ['Dezembro 2025', 'Novembro 2025'])
     """
-    conn = sqlite3.connect(DB_PATH)
+    _garantir_esquema()
+    conn = get_connection(DB_PATH)
+    # Ordem cronológica (mes_key), do mais recente para o mais antigo
     query = """
-    SELECT DISTINCT MesComp 
+    SELECT MesComp 
     FROM lancamentos 
     WHERE Categoria NOT IN ('INVESTIMENTOS', 'SALÁRIO', 'Salário', 'Investimentos')
-    ORDER BY MesComp DESC
+    GROUP BY MesComp
+    ORDER BY MAX(mes_key) DESC, MesComp DESC
     """
     df = pd.read_sql_query(query, conn)
-    conn.close()
     
     return df['MesComp'].tolist()
 
@@ -104,7 +697,7 @@ def obter_categorias():
     Returns:
         Lista de strings com categorias
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     query = """
     SELECT DISTINCT Categoria 
     FROM lancamentos 
@@ -112,7 +705,6 @@ def obter_categorias():
     ORDER BY Categoria
     """
     df = pd.read_sql_query(query, conn)
-    conn.close()
     
     return df['Categoria'].tolist()
 
@@ -123,7 +715,7 @@ def obter_fontes():
     Returns:
         Lista de strings com fontes
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     query = """
     SELECT DISTINCT Fonte 
     FROM lancamentos 
@@ -131,7 +723,6 @@ def obter_fontes():
     ORDER BY Fonte
     """
     df = pd.read_sql_query(query, conn)
-    conn.close()
     
     return df['Fonte'].tolist()
 
@@ -144,7 +735,7 @@ def obter_titulares():
     Returns:
         Lista de strings com nomes de titulares
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     query = """
     SELECT DISTINCT NomeTitular 
     FROM lancamentos 
@@ -153,7 +744,6 @@ def obter_titulares():
     ORDER BY NomeTitular
     """
     df = pd.read_sql_query(query, conn)
-    conn.close()
     
     return df['NomeTitular'].tolist()
 
@@ -211,14 +801,12 @@ def atualizar_categoria(rowid, nova_categoria):
         bool: True se sucesso, False se erro
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE lancamentos SET Categoria = ? WHERE rowid = ?",
-            (nova_categoria, rowid)
-        )
-        conn.commit()
-        conn.close()
+        with get_connection(DB_PATH) as conn:
+            conn.execute(
+                "UPDATE lancamentos SET Categoria = ? WHERE rowid = ?",
+                (nova_categoria, rowid)
+            )
+        limpar_cache_transacoes()
         return True
     except Exception as e:
         print(f"❌ Erro ao atualizar categoria: {e}")
@@ -232,14 +820,13 @@ def obter_orcamento_mais_recente():
         Dict com data de geração e dados do orçamento
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         
         # Busca data mais recente
         query_date = "SELECT MAX(generated_at) FROM weekly_budgets"
         latest_date = pd.read_sql_query(query_date, conn).iloc[0, 0]
         
         if not latest_date:
-            conn.close()
             return None
         
         # Busca dados do orçamento
@@ -258,7 +845,6 @@ def obter_orcamento_mais_recente():
         """
         
         df = pd.read_sql_query(query_budgets, conn)
-        conn.close()
         
         return {
             'generated_at': latest_date,
@@ -278,14 +864,13 @@ def obter_resumo_orcamento_semanal():
         Dict com totais por semana, pessoa e categoria
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         
         # Busca data mais recente
         query_date = "SELECT MAX(generated_at) FROM weekly_budgets"
         latest_date = pd.read_sql_query(query_date, conn).iloc[0, 0]
         
         if not latest_date:
-            conn.close()
             return {}
         
         # Resumo por semana
@@ -302,7 +887,6 @@ def obter_resumo_orcamento_semanal():
         """
         
         df = pd.read_sql_query(query, conn)
-        conn.close()
         
         # Organiza por semana
         summary = {}
@@ -332,7 +916,7 @@ def obter_meses_orcamento_disponiveis():
         List de dicts com label e value para dropdown
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         
         query = """
         SELECT DISTINCT generated_at
@@ -341,7 +925,6 @@ def obter_meses_orcamento_disponiveis():
         """
         
         df = pd.read_sql_query(query, conn)
-        conn.close()
         
         if df.empty:
             return [{'label': 'Nenhum orçamento disponível', 'value': 'none'}]
@@ -385,7 +968,7 @@ def obter_resumo_orcamento_por_data(data_geracao: str):
         Dict com totais por semana, pessoa e categoria
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_connection(DB_PATH)
         
         # Resumo por semana
         query = f"""
@@ -401,7 +984,6 @@ def obter_resumo_orcamento_por_data(data_geracao: str):
         """
         
         df = pd.read_sql_query(query, conn)
-        conn.close()
         
         if df.empty:
             return {}
@@ -434,7 +1016,7 @@ def obter_meses_disponiveis_para_comparacao():
         Lista de dicts com 'label' e 'value' (YYYY-MM)
     """
     try:
-        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        conn = get_connection(DB_PATH)
         
         query = """
         SELECT DISTINCT
@@ -447,7 +1029,6 @@ def obter_meses_disponiveis_para_comparacao():
         """
         
         df = pd.read_sql_query(query, conn)
-        conn.close()
         
         # Mapeamento de meses
         meses_pt = {
@@ -6,7 +6,8 @@ Funções que geram os gráficos Plotly baseado nos dados
 import pandas as pd
 import plotly.graph_objects as go
 from dashboard_v2.config import COLORS, PLOTLY_TEMPLATE
-from dashboard_v2.utils.database import carregar_transacoes
+from dashboard_v2.utils.database import carregar_transacoes, carregar_resumo_mensal, carregar_totais_mensais
+from database.month_key import month_key_label, month_key_shift
 
 def criar_grafico_evolucao(mes_selecionado='TODOS'):
     """
@@ -18,92 +19,24 @@ def criar_grafico_evolucao(mes_selecionado='TODOS'):
     Returns:
         Figure do Plotly
     """
-    df = carregar_transacoes('TODOS')
+    # Débitos (valor positivo = gasto) dos últimos 12 meses de calendário,
+    # agrupados e recortados no SQL pela chave de mês (mes_key AAAAMM)
+    totais = carregar_totais_mensais(janela_meses=12)
     
-    if len(df) == 0:
+    if len(totais) == 0:
         return go.Figure().update_layout(
             **PLOTLY_TEMPLATE['layout'],
             title="Sem dados disponíveis"
         )
     
-    # Filtrar apenas débitos (valor positivo = gasto)
-    df_debitos = df[df['valor'] > 0].copy()
-    
-    # Agrupar por mês
-    evolucao = df_debitos.groupby('mes_comp')['valor'].sum().reset_index()
-    
-    # Converter mes_comp para datetime usando mapeamento manual (fix para março no Windows)
-    from datetime import datetime
-    from dateutil.relativedelta import relativedelta
-    
-    # Mapeamento manual de meses em português para número
-    meses_map = {
-        'janeiro': 1, 'fevereiro': 2, 'março': 3, 'abril': 4,
-        'maio': 5, 'junho': 6, 'julho': 7, 'agosto': 8,
-        'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
-    }
-    
-    def converter_mes_para_data(mes_comp_str):
-        """Converte 'Março 2025' para datetime(2025, 3, 1)"""
-        try:
-            partes = mes_comp_str.split()
-            if len(partes) == 2:
-                mes_nome = partes[0].lower()
-                ano = int(partes[1])
-                mes_num = meses_map.get(mes_nome)
-                if mes_num:
-                    return datetime(ano, mes_num, 1)
-        except:
-            pass
-        return None
-    
-    evolucao['data_ordenacao'] = evolucao['mes_comp'].apply(converter_mes_para_data)
-    
-    # Remover linhas onde conversão falhou (None)
-    evolucao = evolucao.dropna(subset=['data_ordenacao'])
-    
-    # Criar dicionário com valores reais
-    valores_reais = dict(zip(evolucao['mes_comp'], evolucao['valor']))
-    
-    # Criar range completo dos últimos 12 meses
-    data_mais_recente = evolucao['data_ordenacao'].max()
-    data_inicial = data_mais_recente - relativedelta(months=11)
-    
-    # Mapeamento de meses em português
-    meses_pt = {
-        1: 'janeiro', 2: 'fevereiro', 3: 'março', 4: 'abril',
-        5: 'maio', 6: 'junho', 7: 'julho', 8: 'agosto',
-        9: 'setembro', 10: 'outubro', 11: 'novembro', 12: 'dezembro'
-    }
-    
-    meses_completos = []
-    data_atual = data_inicial
-    while data_atual <= data_mais_recente:
-        # Gerar nome do mês em português com encoding correto
-        mes_nome = meses_pt[data_atual.month].capitalize()
-        ano = data_atual.year
-        mes_formatado = f"{mes_nome} {ano}"
-        
-        # Procurar mês correspondente nos dados reais (comparação por data usando a função manual)
-        valor = 0
-        for mes_real, val_real in valores_reais.items():
-            data_real = converter_mes_para_data(mes_real)
-            if data_real and data_real.year == ano and data_real.month == data_atual.month:
-                valor = val_real
-                break
-        
-        meses_completos.append({
-            'mes_comp': mes_formatado,
-            'data_ordenacao': data_atual,
-            'valor': valor
-        })
-        data_atual += relativedelta(months=1)
-    
-    evolucao = pd.DataFrame(meses_completos)
-    
-    # Ordenar por data
-    evolucao = evolucao.sort_values('data_ordenacao')
-    evolucao = evolucao.reset_index(drop=True)
+    # Range completo dos 12 meses (meses sem gasto ficam com 0)
+    valores_reais = dict(zip(totais['mes_key'], totais['valor']))
+    mes_mais_recente = int(totais['mes_key'].max())
+    chaves = [month_key_shift(mes_mais_recente, -i) for i in range(11, -1, -1)]
+    evolucao = pd.DataFrame({
+        'mes_comp': [month_key_label(chave) for chave in chaves],
+        'valor': [valores_reais.get(chave, 0) for chave in chaves]
+    })
     
     # Criar labels na ordem correta
     labels_ordenados = evolucao['mes_comp'].tolist()
@@ -157,19 +90,20 @@ def criar_grafico_top_categorias(mes_selecionado='TODOS'):
     Returns:
         Figure do Plotly
     """
-    df = carregar_transacoes(mes_selecionado)
+    resumo = carregar_resumo_mensal(mes_selecionado)
     
-    if len(df) == 0:
+    if len(resumo) == 0:
         return go.Figure().update_layout(
             **PLOTLY_TEMPLATE['layout'],
             title="Sem dados disponíveis"
         )
     
-    # Filtrar apenas débitos (valor POSITIVO = gastos) e categorias válidas
-    df_debitos = df[(df['valor'] > 0) & (df['categoria'] != 'A definir')].copy()
+    # Apenas débitos (valor POSITIVO = gastos) e categorias válidas
+    resumo_debitos = resumo[(resumo['qtd_debitos'] > 0) & (resumo['categoria'] != 'A definir')]
     
     # Top 5 categorias
-    top_cat = df_debitos.groupby('categoria')['valor_normalizado'].sum().nlargest(5).reset_index()
+    top_cat = (resumo_debitos.groupby('categoria')['total_debitos'].sum().nlargest(5)
+               .reset_index().rename(columns={'total_debitos': 'valor_normalizado'}))
     top_cat = top_cat.sort_values('valor_normalizado')  # Ordem crescente para barras horizontais
     
     fig = go.Figure()
@@ -217,19 +151,20 @@ def criar_grafico_top_fontes(mes_selecionado='TODOS'):
     Returns:
         Figure do Plotly
     """
-    df = carregar_transacoes(mes_selecionado)
+    resumo = carregar_resumo_mensal(mes_selecionado)
     
-    if len(df) == 0:
+    if len(resumo) == 0:
         return go.Figure().update_layout(
             **PLOTLY_TEMPLATE['layout'],
             title="Sem dados disponíveis"
         )
     
-    # Filtrar apenas débitos (valor POSITIVO = gastos)
-    df_debitos = df[df['valor'] > 0].copy()
+    # Apenas débitos (valor POSITIVO = gastos)
+    resumo_debitos = resumo[resumo['qtd_debitos'] > 0]
     
     # Top 5 fontes
-    top_fontes = df_debitos.groupby('fonte')['valor_normalizado'].sum().nlargest(5).reset_index()
+    top_fontes = (resumo_debitos.groupby('fonte')['total_debitos'].sum().nlargest(5)
+                  .reset_index().rename(columns={'total_debitos': 'valor_normalizado'}))
     top_fontes = top_fontes.sort_values('valor_normalizado')  # Ordem crescente
     
     fig = go.Figure()
@@ -287,25 +222,26 @@ def criar_grafico_gasto_por_pais(mes_selecionado='TODOS'):
     Returns:
         Figure do Plotly
     """
-    df = carregar_transacoes(mes_selecionado)
+    resumo = carregar_resumo_mensal(mes_selecionado)
 
-    if len(df) == 0 or 'pais' not in df.columns:
+    if len(resumo) == 0:
         return go.Figure().update_layout(
             **PLOTLY_TEMPLATE['layout'],
             title_text="Sem dados disponíveis"
         )
 
-    df_debitos = df[(df['valor'] > 0) & (df['pais'].notna())].copy()
+    resumo_debitos = resumo[(resumo['qtd_debitos'] > 0) & (resumo['pais'].notna())].copy()
 
-    if len(df_debitos) == 0:
+    if len(resumo_debitos) == 0:
         return go.Figure().update_layout(
             **PLOTLY_TEMPLATE['layout'],
             title_text="Sem dados de país disponíveis para o período"
         )
 
-    df_debitos['pais_label'] = df_debitos['pais'].map(_NOMES_PAISES).fillna(df_debitos['pais'])
+    resumo_debitos['pais_label'] = resumo_debitos['pais'].map(_NOMES_PAISES).fillna(resumo_debitos['pais'])
 
-    top_paises = df_debitos.groupby('pais_label')['valor_normalizado'].sum().nlargest(10).reset_index()
+    top_paises = (resumo_debitos.groupby('pais_label')['total_debitos'].sum().nlargest(10)
+                  .reset_index().rename(columns={'total_debitos': 'valor_normalizado'}))
     top_paises = top_paises.sort_values('valor_normalizado')
 
     fig = go.Figure()
@@ -355,17 +291,17 @@ def criar_grafico_real_ideal(mes_selecionado='TODOS'):
     """
     from dashboard_v2.config import ORCAMENTO_IDEAL
     
-    df = carregar_transacoes(mes_selecionado)
+    resumo = carregar_resumo_mensal(mes_selecionado)
     
-    if len(df) == 0:
+    if len(resumo) == 0:
         return go.Figure().update_layout(
             **PLOTLY_TEMPLATE['layout'],
             title="Sem dados disponíveis"
         )
     
-    # Filtrar débitos e agrupar por categoria
-    df_debitos = df[(df['valor'] > 0) & (df['categoria'] != 'A definir')].copy()
-    real = df_debitos.groupby('categoria')['valor_normalizado'].sum().reset_index()
+    # Débitos agrupados por categoria
+    resumo_debitos = resumo[(resumo['qtd_debitos'] > 0) & (resumo['categoria'] != 'A definir')]
+    real = resumo_debitos.groupby('categoria')['total_debitos'].sum().reset_index()
     real.columns = ['categoria', 'real']
     
     # Criar DataFrame com orçamento ideal
@@ -507,46 +443,20 @@ def criar_grafico_acumulado(mes_selecionado='TODOS'):
     Returns:
         Figure do Plotly
     """
-    df = carregar_transacoes('TODOS')  # Sempre pegar todos para calcular acumulado
+    # Últimos 6 meses com gastos, em ordem cronológica (mes_key no SQL)
+    mensal = carregar_totais_mensais(ultimos_meses=6)
     
-    if len(df) == 0:
+    if len(mensal) == 0:
         return go.Figure().update_layout(
             **PLOTLY_TEMPLATE['layout'],
             title="Sem dados disponíveis"
         )
     
-    # Filtrar débitos e últimos 6 meses
-    df_debitos = df[df['valor'] > 0].copy()
-    
-    # Converter mes_comp para datetime para ordenação cronológica
-    import locale
-    try:
-        locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-    except:
-        try:
-            locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil.1252')
-        except:
-            pass
-    
-    # Agrupar por mês primeiro
-    mensal = df_debitos.groupby('mes_comp')['valor'].sum().reset_index()
-    mensal['data_ordenacao'] = pd.to_datetime(mensal['mes_comp'], format='%B %Y', errors='coerce')
-    
-    # Remover linhas onde conversão falhou (NaT)
-    mensal = mensal.dropna(subset=['data_ordenacao'])
-    
-    # Ordenar por data
-    mensal = mensal.sort_values('data_ordenacao')
-    
-    # Pegar últimos 6 meses
-    mensal = mensal.tail(6)
-    mensal = mensal.reset_index(drop=True)
-    
     # Calcular acumulado
     mensal['acumulado'] = mensal['valor'].cumsum()
     
     # Criar labels na ordem correta
-    labels_ordenados = mensal['mes_comp'].tolist()
+    labels_ordenados = [month_key_label(int(chave)) for chave in mensal['mes_key']]
     
     fig = go.Figure()
     
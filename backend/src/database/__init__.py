@@ -2,10 +2,47 @@
 Módulo de acesso a dados (Database Layer)
 """
 
+from .connection import (
+    ConnectionProvider,
+    PragmaProfile,
+    get_connection,
+    get_shared_connection,
+    configure_connections,
+    close_all_connections
+)
 from .category_repository import CategoryRepository
 from .transaction_repository import TransactionRepository
+from .ingest_ledger_repository import IngestLedgerRepository
+from .monthly_summary_repository import MonthlySummaryRepository
+from .month_key import month_key, month_key_label, month_key_shift, month_key_sql, ensure_month_key
+from .dedup_keys import ensure_dedup_columns, ensure_content_ids, assign_content_ids
+from .raw_data_store import ensure_raw_data_storage
+from .description_search import ensure_description_search, search_condition
+from .openfinance_writer import OpenFinanceWriter
+from .openfinance_sync_state import OpenFinanceSyncStateRepository
 
 __all__ = [
+    'ConnectionProvider',
+    'PragmaProfile',
+    'get_connection',
+    'get_shared_connection',
+    'configure_connections',
+    'close_all_connections',
     'CategoryRepository',
-    'TransactionRepository'
-]
\ No newline at end of file
+    'TransactionRepository',
+    'IngestLedgerRepository',
+    'MonthlySummaryRepository',
+    'month_key',
+    'month_key_label',
+    'month_key_shift',
+    'month_key_sql',
+    'ensure_month_key',
+    'ensure_dedup_columns',
+    'ensure_content_ids',
+    'assign_content_ids',
+    'ensure_raw_data_storage',
+    'ensure_description_search',
+    'search_condition',
+    'OpenFinanceWriter',
+    'OpenFinanceSyncStateRepository'
+]
@@ -13,6 +13,7 @@ from pathlib import Path
 from datetime import date, datetime
 
 from budget_analysis.models import WeeklyBudget, RecurringTransaction
+from .connection import get_connection
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +28,7 @@ class BudgetRepository:
     def _ensure_table_exists(self):
         """Garante que a tabela de orçamentos existe."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Tabela de orçamentos semanais
@@ -78,7 +79,7 @@ class BudgetRepository:
             True se salvou com sucesso
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Limpa orçamentos da mesma data (atualização)
@@ -125,7 +126,7 @@ class BudgetRepository:
             Tupla (data_geração, lista_orçamentos)
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Busca data mais recente
@@ -181,7 +182,7 @@ class BudgetRepository:
         try:
             month_ref = f"{year}-{month:02d}"
             
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -223,7 +224,7 @@ class BudgetRepository:
             Dicionário com totais por semana, pessoa e categoria
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Define qual data usar
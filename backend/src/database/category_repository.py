@@ -8,6 +8,7 @@ from typing import List, Dict, Optional
 from pathlib import Path
 
 from models import LearnedCategory, TransactionCategory
+from .connection import get_connection
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +23,7 @@ class CategoryRepository:
     def _ensure_table_exists(self):
         """Garante que a tabela de categorias existe."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS categorias_aprendidas (
@@ -50,7 +51,7 @@ class CategoryRepository:
             True se salvou com sucesso, False caso contrário
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT OR REPLACE INTO categorias_aprendidas 
@@ -79,7 +80,7 @@ class CategoryRepository:
         """
         mapping = {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT descricao, categoria FROM categorias_aprendidas
@@ -131,7 +132,7 @@ class CategoryRepository:
         """
         categories = []
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT descricao, categoria, confidence, learned_at, usage_count
@@ -142,12 +143,13 @@ class CategoryRepository:
                 for row in cursor.fetchall():
                     description, category, confidence, learned_at, usage_count = row
                     try:
-                        categories.append(LearnedCategory(
-                            description=description,
-                            category=TransactionCategory(category),
-                            confidence=confidence,
-                            learned_at=learned_at,
-                            usage_count=usage_count
+                        # Linhas já normalizadas ao gravar (save_category)
+                        categories.append(LearnedCategory.from_trusted(
+                            description,
+                            TransactionCategory(category),
+                            confidence,
+                            learned_at,
+                            usage_count
                         ))
                     except ValueError as e:
                         logger.warning(f"⚠️ Erro ao carregar categoria: {e}")
@@ -167,7 +169,7 @@ class CategoryRepository:
             True se atualizou com sucesso
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     UPDATE categorias_aprendidas 
@@ -180,6 +182,32 @@ class CategoryRepository:
             logger.error(f"❌ Erro ao atualizar contador: {e}")
             return False
     
+    def update_usage_counts(self, counts: Dict[str, int]) -> int:
+        """
+        Incrementa contadores de uso em lote (uma transação no banco).
+        
+        Args:
+            counts: Descrição da categoria -> quantidade de usos
+            
+        Returns:
+            Número de categorias atualizadas
+        """
+        if not counts:
+            return 0
+        try:
+            with get_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany("""
+                    UPDATE categorias_aprendidas 
+                    SET usage_count = usage_count + ?
+                    WHERE descricao = ?
+                """, [(int(n), description.upper().strip()) for description, n in counts.items()])
+                conn.commit()
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"❌ Erro ao atualizar contadores: {e}")
+            return 0
+    
     def delete_category(self, description: str) -> bool:
         """
         Remove uma categoria aprendida.
@@ -191,7 +219,7 @@ class CategoryRepository:
             True se removeu com sucesso
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     DELETE FROM categorias_aprendidas WHERE descricao = ?
@@ -219,7 +247,7 @@ class CategoryRepository:
         }
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Total de categorias
@@ -261,7 +289,7 @@ class CategoryRepository:
         }
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Busca todas as descrições únicas que terminam com padrão dd/mm
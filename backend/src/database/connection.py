@@ -0,0 +1,231 @@
+"""
+Gerenciamento de conexões SQLite compartilhadas
+===============================================
+
+Em vez de abrir e fechar uma conexão nova a cada chamada, repositórios e
+loaders do dashboard pegam conexões daqui. Cada thread mantém uma conexão
+reutilizável por arquivo de banco, configurada uma única vez com o perfil
+de PRAGMAs (WAL, synchronous=NORMAL, mmap, cache, busy_timeout, temp_store).
+
+Uso:
+    from database.connection import get_connection
+
+    with get_connection(db_path) as conn:   # commit/rollback como sqlite3
+        conn.execute("UPDATE ...")
+
+As conexões NÃO devem ser fechadas por quem as usa: as de uma thread são
+fechadas quando ela termina, e close_all_connections() libera tudo (ex.: ao
+final de um script ou teste).
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PragmaProfile:
+    """Perfil de PRAGMAs aplicado a cada conexão nova."""
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024      # bytes
+    cache_size: int = -64000                # negativo = KiB (~64 MB)
+    busy_timeout: int = 5000                # ms
+    temp_store: str = "MEMORY"
+
+    def statements(self) -> list:
+        """Retorna os comandos PRAGMA correspondentes ao perfil."""
+        return [
+            f"PRAGMA journal_mode = {self.journal_mode}",
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA mmap_size = {int(self.mmap_size)}",
+            f"PRAGMA cache_size = {int(self.cache_size)}",
+            f"PRAGMA busy_timeout = {int(self.busy_timeout)}",
+            f"PRAGMA temp_store = {self.temp_store}",
+        ]
+
+
+def _close_pool(pool: Dict[str, Tuple[sqlite3.Connection, Optional[tuple]]]):
+    """Fecha e esvazia as conexões de um pool de thread."""
+    for conn, _ in list(pool.values()):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    pool.clear()
+
+
+class _ThreadConnections:
+    """
+    Conexões de uma thread (guardado no threading.local do provider).
+
+    Quando a thread termina o threading.local solta o objeto, e o finalize
+    fecha as conexões dele: threads de servidor (ex.: workers do dashboard)
+    não deixam conexões nem descritores de arquivo para trás.
+    """
+    __slots__ = ("pool", "__weakref__")
+
+    def __init__(self):
+        self.pool: Dict[str, Tuple[sqlite3.Connection, Optional[tuple]]] = {}
+        weakref.finalize(self, _close_pool, self.pool)
+
+
+class ConnectionProvider:
+    """
+    Pool de conexões SQLite por thread.
+
+    Cada thread recebe sua própria conexão por arquivo de banco (uma conexão
+    sqlite3 não deve ser usada por duas threads ao mesmo tempo). Se o arquivo
+    do banco for removido/recriado, a conexão é reaberta. As conexões de uma
+    thread são fechadas quando ela termina; o provider só guarda referências
+    fracas aos pools das threads (para close_all).
+    """
+
+    def __init__(self, profile: Optional[PragmaProfile] = None):
+        self.profile = profile or PragmaProfile()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads: "weakref.WeakSet[_ThreadConnections]" = weakref.WeakSet()
+        self._shared: Dict[Tuple[str, str], Tuple[sqlite3.Connection, Optional[tuple]]] = {}
+
+    def configure(self, profile: PragmaProfile):
+        """Troca o perfil de PRAGMAs e descarta as conexões existentes."""
+        self.close_all()
+        self.profile = profile
+
+    def get_connection(self, db_path: Union[str, Path]) -> sqlite3.Connection:
+        """
+        Retorna a conexão da thread atual para o banco informado.
+
+        Args:
+            db_path: Caminho do arquivo SQLite
+
+        Returns:
+            Conexão sqlite3 pronta para uso (não feche; é reutilizada)
+        """
+        key = self._path_key(db_path)
+        pool = self._thread_pool()
+
+        cached = pool.get(key)
+        if cached is not None:
+            conn, file_id = cached
+            if file_id == self._file_id(key):
+                return conn
+            # Arquivo removido/recriado: a conexão antiga aponta para outro inode
+            del pool[key]
+            self._discard(conn)
+
+        conn = self._open(key)
+        pool[key] = (conn, self._file_id(key))
+        logger.debug(f"🔌 Nova conexão SQLite: {key} (thread {threading.current_thread().name})")
+        return conn
+
+    def get_shared_connection(self, db_path: Union[str, Path], name: str) -> sqlite3.Connection:
+        """
+        Retorna uma conexão única do processo, separada das conexões das threads.
+
+        Para leituras que precisam de uma conexão própria e estável, como
+        PRAGMA data_version (só muda com commits de OUTRAS conexões). Quem
+        usa de várias threads deve serializar o acesso.
+
+        Args:
+            db_path: Caminho do arquivo SQLite
+            name: Identifica a conexão (uma por banco e nome)
+
+        Returns:
+            Conexão sqlite3 (não feche; close_all() a libera)
+        """
+        key = self._path_key(db_path)
+        file_id = self._file_id(key)
+        with self._lock:
+            cached = self._shared.get((key, name))
+            if cached is not None:
+                conn, cached_file_id = cached
+                if cached_file_id == file_id:
+                    return conn
+                # Arquivo removido/recriado: reabre
+                self._discard(conn)
+            conn = self._open(key)
+            self._shared[(key, name)] = (conn, self._file_id(key))
+        logger.debug(f"🔌 Nova conexão SQLite compartilhada: {key} ({name})")
+        return conn
+
+    def close_all(self):
+        """Fecha todas as conexões abertas (de todas as threads)."""
+        with self._lock:
+            threads = list(self._threads)
+            self._threads = weakref.WeakSet()
+            self._local = threading.local()
+            shared = self._shared
+            self._shared = {}
+        for thread_connections in threads:
+            _close_pool(thread_connections.pool)
+        _close_pool(shared)
+
+    def _thread_pool(self) -> Dict[str, Tuple[sqlite3.Connection, Optional[tuple]]]:
+        thread_connections = getattr(self._local, "connections", None)
+        if thread_connections is None:
+            thread_connections = self._local.connections = _ThreadConnections()
+            with self._lock:
+                self._threads.add(thread_connections)
+        return thread_connections.pool
+
+    def _open(self, key: str) -> sqlite3.Connection:
+        """Abre uma conexão e aplica o perfil de PRAGMAs."""
+        conn = sqlite3.connect(key, check_same_thread=False)
+        for statement in self.profile.statements():
+            try:
+                conn.execute(statement)
+            except sqlite3.DatabaseError as e:
+                logger.warning(f"⚠️ PRAGMA ignorado ({statement}): {e}")
+        return conn
+
+    @staticmethod
+    def _path_key(db_path: Union[str, Path]) -> str:
+        key = str(db_path)
+        return key if key == ":memory:" else os.path.abspath(key)
+
+    def _discard(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def _file_id(path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+            return (st.st_dev, st.st_ino)
+        except OSError:
+            return None
+
+
+# Provider padrão compartilhado pelo processo
+_provider = ConnectionProvider()
+
+
+def get_connection(db_path: Union[str, Path]) -> sqlite3.Connection:
+    """Atalho para a conexão da thread atual no provider padrão."""
+    return _provider.get_connection(db_path)
+
+
+def get_shared_connection(db_path: Union[str, Path], name: str) -> sqlite3.Connection:
+    """Atalho para uma conexão compartilhada do provider padrão."""
+    return _provider.get_shared_connection(db_path, name)
+
+
+def configure_connections(profile: PragmaProfile):
+    """Define o perfil de PRAGMAs do provider padrão."""
+    _provider.configure(profile)
+
+
+def close_all_connections():
+    """Fecha todas as conexões do provider padrão."""
+    _provider.close_all()
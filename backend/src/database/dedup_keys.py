@@ -0,0 +1,252 @@
+"""
+Colunas de deduplicação em lancamentos
+======================================
+
+A checagem de duplicatas comparava ABS(Valor - ?) < 0.01, UPPER(Fonte) e
+UPPER(TRIM(Descricao)): expressões sobre a coluna, que nenhum índice cobre.
+Aqui ficam as mesmas normalizações gravadas em colunas próprias
+(valor_centavos, fonte_norm, desc_norm) e o índice composto
+idx_lancamentos_dedup, para a busca virar um seek no índice.
+
+Os valores são calculados sempre pelas expressões SQL abaixo (inclusive do
+lado do parâmetro na consulta), então gravação e busca usam exatamente a
+mesma regra. Valores monetários têm 2 casas, então centavos iguais equivalem
+à antiga tolerância de 0.01.
+
+O id das linhas também vem do conteúdo: um hash (blake2b, 128 bits) de data,
+centavos, fonte, descrição e mês normalizados, mais o número da ocorrência (compras iguais no
+mesmo dia). Com o índice único em id, reimportar é um upsert em lote, sem
+consultar duplicatas antes de gravar.
+"""
+
+import sqlite3
+import hashlib
+import logging
+from typing import Any, Iterable, List, Optional
+
+from .month_key import month_key
+
+logger = logging.getLogger(__name__)
+
+# Prefixo fixo dos ids de lancamentos (mudar invalida todos os ids gravados)
+_PREFIXO_IDS = b'financeiropy/lancamentos|'
+
+# Colunas gravadas -> tipo
+DEDUP_COLUMNS = {
+    'valor_centavos': 'INTEGER',
+    'fonte_norm': 'TEXT',
+    'desc_norm': 'TEXT',
+}
+
+
+def cents_sql(expr: str) -> str:
+    """Valor em centavos inteiros (arredondado)."""
+    return f"CAST(ROUND({expr} * 100) AS INTEGER)"
+
+
+def source_norm_sql(expr: str) -> str:
+    """Fonte normalizada (maiúsculas)."""
+    return f"UPPER({expr})"
+
+
+def description_norm_sql(expr: str) -> str:
+    """Descrição normalizada (maiúsculas, sem espaços nas pontas)."""
+    return f"UPPER(TRIM({expr}))"
+
+
+def _expressoes(linha: str = '') -> dict:
+    """coluna -> expressão calculada a partir da linha (ex: 'NEW.')."""
+    return {
+        'valor_centavos': cents_sql(f"{linha}Valor"),
+        'fonte_norm': source_norm_sql(f"{linha}Fonte"),
+        'desc_norm': description_norm_sql(f"{linha}Descricao"),
+    }
+
+
+def ensure_dedup_columns(cursor: sqlite3.Cursor):
+    """
+    Garante as colunas de deduplicação (com índice e triggers) em lancamentos.
+
+    Na primeira vez as colunas são criadas e preenchidas. Quem grava pelo
+    repositório já envia os valores; os triggers cobrem inserções sem eles
+    (scripts antigos) e alterações de Valor/Fonte/Descricao.
+
+    Args:
+        cursor: Cursor com transação aberta
+    """
+    cursor.execute("PRAGMA table_info(lancamentos)")
+    existentes = {row[1].lower() for row in cursor.fetchall()}
+    faltando = [coluna for coluna in DEDUP_COLUMNS if coluna not in existentes]
+    if faltando:
+        for coluna in faltando:
+            cursor.execute(f"ALTER TABLE lancamentos ADD COLUMN {coluna} {DEDUP_COLUMNS[coluna]}")
+        atribuicoes = ", ".join(f"{coluna} = {expr}" for coluna, expr in _expressoes().items())
+        cursor.execute(f"UPDATE lancamentos SET {atribuicoes}")
+        logger.info(f"🆕 Colunas de deduplicação preenchidas em lancamentos ({cursor.rowcount} linhas)")
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_lancamentos_dedup
+        ON lancamentos(Data, valor_centavos, fonte_norm, desc_norm, MesComp)
+    """)
+
+    atribuicoes = ", ".join(f"{coluna} = {expr}" for coluna, expr in _expressoes('NEW.').items())
+    atualizar = f"UPDATE lancamentos SET {atribuicoes} WHERE rowid = NEW.rowid;"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_lancamentos_dedup_insert
+        AFTER INSERT ON lancamentos
+        WHEN NEW.valor_centavos IS NULL OR NEW.fonte_norm IS NULL OR NEW.desc_norm IS NULL
+        BEGIN
+            {atualizar}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_lancamentos_dedup_update
+        AFTER UPDATE OF Valor, Fonte, Descricao ON lancamentos
+        BEGIN
+            {atualizar}
+        END
+    """)
+
+
+def content_key(data: str, valor: Any, fonte: str, descricao: str, mes: str) -> str:
+    """
+    Chave de conteúdo de um lançamento (base do id determinístico).
+
+    Args:
+        data: Data ISO ('2025-10-15')
+        valor: Valor em reais
+        fonte: Fonte ('PIX', 'Master Físico', ...)
+        descricao: Descrição original
+        mes: Mês de competência em qualquer formato aceito por month_key()
+
+    Returns:
+        Texto com os campos normalizados
+    """
+    try:
+        centavos = int(round(float(valor) * 100))
+    except (TypeError, ValueError):
+        centavos = valor
+    mes_norm = month_key(mes) or (mes or '').strip()
+    return f"{data}|{centavos}|{(fonte or '').upper()}|{(descricao or '').strip().upper()}|{mes_norm}"
+
+
+def content_id(chave: str, ordinal: int = 0) -> str:
+    """Id determinístico para a ocorrência `ordinal` de uma chave de conteúdo."""
+    return hashlib.blake2b(_PREFIXO_IDS + f"{chave}|{ordinal}".encode(), digest_size=16).hexdigest()
+
+
+def content_ids(datas: Iterable[str], valores: Iterable[Any], fontes: Iterable[str],
+                descricoes: Iterable[str], meses: Iterable[str]) -> List[str]:
+    """
+    Ids de conteúdo de um lote, a partir das colunas.
+
+    Linhas iguais dentro do lote recebem ocorrências 0, 1, 2... na ordem
+    em que aparecem, então o mesmo arquivo gera sempre os mesmos ids.
+
+    Args:
+        datas, valores, fontes, descricoes, meses: Colunas alinhadas (ver content_key)
+
+    Returns:
+        Lista de ids, na ordem das linhas
+    """
+    ocorrencias = {}
+    ids = []
+    for data, valor, fonte, descricao, mes in zip(datas, valores, fontes, descricoes, meses):
+        chave = content_key(data, valor, fonte, descricao, mes)
+        ordinal = ocorrencias.get(chave, 0)
+        ocorrencias[chave] = ordinal + 1
+        ids.append(content_id(chave, ordinal))
+    return ids
+
+
+def next_content_id(cursor: sqlite3.Cursor, chave: str, atual: Optional[str] = None) -> str:
+    """
+    Primeiro id livre em lancamentos para uma chave de conteúdo.
+
+    Usado quando a linha é gravada sozinha (fora de um lote): ocorrências já
+    gravadas com a mesma chave ocupam os primeiros ids, então uma segunda
+    compra idêntica no mesmo dia recebe a ocorrência seguinte em vez de
+    sobrescrever a primeira.
+
+    Args:
+        cursor: Cursor da conexão
+        chave: Chave de conteúdo (content_key)
+        atual: Id que a linha já tem; se for uma das ocorrências da chave, é
+            mantido (regravar a mesma transação atualiza em vez de duplicar)
+
+    Returns:
+        Id de conteúdo
+    """
+    ordinal = 0
+    while True:
+        candidato = content_id(chave, ordinal)
+        if candidato == atual:
+            return candidato
+        if not cursor.execute("SELECT 1 FROM lancamentos WHERE id = ?", (candidato,)).fetchone():
+            return candidato
+        ordinal += 1
+
+
+def assign_content_ids(transactions: Iterable) -> None:
+    """
+    Substitui o id das transações pelo id de conteúdo.
+
+    O mês usado é mes_comp (mês do arquivo) ou, na falta dele, month_ref.
+
+    Args:
+        transactions: Transações a gravar (alteradas no lugar)
+    """
+    transactions = list(transactions)
+    ids = content_ids(
+        (t.date.isoformat() for t in transactions),
+        (t.amount for t in transactions),
+        (t.source.value for t in transactions),
+        (t.description for t in transactions),
+        (t.mes_comp or t.month_ref for t in transactions),
+    )
+    for transaction, id_ in zip(transactions, ids):
+        transaction.id = id_
+
+
+def ensure_content_ids(cursor: sqlite3.Cursor):
+    """
+    Garante ids de conteúdo (com índice único) em lancamentos.
+
+    Na primeira vez todos os ids (uuid4 antigos ou NULL) são recalculados, na
+    ordem de inserção, e o índice único é criado. Depois disso só as linhas
+    gravadas sem id (scripts que inserem direto) são preenchidas, com a
+    próxima ocorrência livre da chave.
+
+    Args:
+        cursor: Cursor com transação aberta
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_lancamentos_id'")
+    migrar = cursor.fetchone() is None
+
+    cursor.execute(f"""
+        SELECT rowid, Data, Valor, Fonte, Descricao, MesComp FROM lancamentos
+        {'' if migrar else 'WHERE id IS NULL'}
+        ORDER BY rowid
+    """)
+    linhas = cursor.fetchall()
+
+    novos_ids = []
+    ocorrencias = {}
+    for rowid, *campos in linhas:
+        chave = content_key(*campos)
+        ordinal = ocorrencias.get(chave, 0)
+        novo_id = content_id(chave, ordinal)
+        if not migrar:
+            # Ocorrências já gravadas com essa chave ocupam os primeiros ids
+            while cursor.execute("SELECT 1 FROM lancamentos WHERE id = ?", (novo_id,)).fetchone():
+                ordinal += 1
+                novo_id = content_id(chave, ordinal)
+        ocorrencias[chave] = ordinal + 1
+        novos_ids.append((novo_id, rowid))
+
+    if novos_ids:
+        cursor.executemany("UPDATE lancamentos SET id = ? WHERE rowid = ?", novos_ids)
+        logger.info(f"🆔 Ids de conteúdo gravados em {len(novos_ids)} linhas de lancamentos")
+
+    if migrar:
+        cursor.execute("CREATE UNIQUE INDEX idx_lancamentos_id ON lancamentos(id)")
@@ -0,0 +1,137 @@
+"""
+Busca textual nas descrições de lancamentos
+===========================================
+
+lancamentos_fts é um índice FTS5 (tokenizador trigram) sobre
+lancamentos.Descricao. É uma tabela de conteúdo externo: guarda só o
+índice, o texto continua em lancamentos, e os triggers mantêm os dois em
+sincronia em INSERT, DELETE e UPDATE de Descricao.
+
+Com trigramas, qualquer trecho de 3 ou mais caracteres é encontrado pelo
+índice (mesma semântica de LIKE '%trecho%', sem diferenciar maiúsculas),
+em vez de varrer a tabela inteira. Trechos menores e SQLite sem FTS5 caem
+no LIKE.
+"""
+
+import sqlite3
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'lancamentos_fts'
+
+# Menor trecho que o índice trigram consegue procurar
+_MIN_TRECHO = 3
+
+_TRIGGERS = {
+    'trg_lancamentos_fts_insert': f"""
+        AFTER INSERT ON lancamentos BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, Descricao) VALUES (NEW.rowid, NEW.Descricao);
+        END
+    """,
+    'trg_lancamentos_fts_delete': f"""
+        AFTER DELETE ON lancamentos BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, Descricao) VALUES ('delete', OLD.rowid, OLD.Descricao);
+        END
+    """,
+    'trg_lancamentos_fts_update': f"""
+        AFTER UPDATE OF Descricao ON lancamentos BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, Descricao) VALUES ('delete', OLD.rowid, OLD.Descricao);
+            INSERT INTO {FTS_TABLE}(rowid, Descricao) VALUES (NEW.rowid, NEW.Descricao);
+        END
+    """,
+}
+
+
+def ensure_description_search(cursor: sqlite3.Cursor) -> bool:
+    """
+    Garante o índice lancamentos_fts e os triggers que o mantêm.
+
+    Na criação o índice é preenchido com as linhas existentes ('rebuild').
+
+    Args:
+        cursor: Cursor com transação aberta
+
+    Returns:
+        True se a busca por índice está disponível (False se o SQLite não tem FTS5)
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,))
+    if not cursor.fetchone():
+        try:
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                    Descricao, content='lancamentos', content_rowid='rowid', tokenize='trigram'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"⚠️ Busca textual indisponível (SQLite sem FTS5/trigram): {e}")
+            return False
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        logger.info(f"🔎 Índice de busca {FTS_TABLE} criado")
+
+    for nome, corpo in _TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nome} {corpo}")
+    return True
+
+
+def has_description_search(cursor: sqlite3.Cursor) -> bool:
+    """Indica se o banco já tem o índice lancamentos_fts."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,))
+    return cursor.fetchone() is not None
+
+
+def fts_phrase(trecho: str) -> str:
+    """Trecho como frase FTS5 entre aspas (aspas internas duplicadas)."""
+    return '"' + trecho.replace('"', '""') + '"'
+
+
+def like_escape(trecho: str) -> str:
+    """Escapa %, _ e \\ para uso em LIKE ... ESCAPE '\\'."""
+    return trecho.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_condition(termo: str, prefix: bool = False, column: str = 'Descricao',
+                     rowid: str = 'rowid', use_index: bool = True) -> Tuple[str, List[str]]:
+    """
+    Condição SQL (parametrizada) para descrições que contêm o termo.
+
+    Args:
+        termo: Texto procurado (sem curingas)
+        prefix: Só descrições que começam com o termo
+        column, rowid: Expressões da descrição e do rowid na consulta
+        use_index: Usa lancamentos_fts (False = só LIKE)
+
+    Returns:
+        Tupla (condicao_sql, parametros)
+    """
+    termo = termo.strip()
+    padrao = like_escape(termo) + '%'
+    if not prefix:
+        padrao = '%' + padrao
+    condicao_like = f"{column} LIKE ? ESCAPE '\\'"
+
+    if not use_index or len(termo) < _MIN_TRECHO:
+        return condicao_like, [padrao]
+
+    condicao = f"{rowid} IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)"
+    if prefix:
+        # O índice acha o trecho em qualquer posição; o LIKE confere o início
+        return f"{condicao} AND {condicao_like}", [fts_phrase(termo), padrao]
+    return condicao, [fts_phrase(termo)]
+
+
+def exclusion_condition(trechos: Sequence[str], rowid: str = 'rowid') -> Optional[str]:
+    """
+    Condição que descarta descrições com qualquer um dos trechos.
+
+    Equivale a 'Descricao NOT LIKE ...' para cada trecho, com uma única
+    consulta ao índice. Trechos vão literais no SQL (são constantes do código).
+
+    Returns:
+        Condição SQL ou None se algum trecho for curto demais para o índice
+    """
+    if any(len(t) < _MIN_TRECHO for t in trechos):
+        return None
+    consulta = " OR ".join(fts_phrase(t) for t in trechos).replace("'", "''")
+    return f"{rowid} NOT IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH '{consulta}')"
@@ -0,0 +1,236 @@
+"""
+Repositório do ledger de ingestão de arquivos
+=============================================
+
+Registra cada arquivo de extrato já importado (caminho, tamanho, mtime,
+hash do conteúdo, processador usado e linhas emitidas). Na próxima execução,
+arquivos sem alteração são pulados sem serem lidos; um arquivo alterado tem
+apenas as suas linhas substituídas (ver TransactionRepository.save_transactions).
+
+Verificação de alteração:
+1. tamanho e mtime iguais ao ledger -> sem alteração (nem lê o arquivo)
+2. senão, compara o hash SHA-256 do conteúdo (ex.: arquivo só "tocado")
+"""
+
+import hashlib
+import sqlite3
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from models import IngestRecord
+from .connection import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Tamanho do bloco de leitura para o hash
+_HASH_CHUNK = 1024 * 1024
+
+
+class IngestLedgerRepository:
+    """Repositório para o ledger de arquivos importados."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._ensure_table_exists()
+
+    def _ensure_table_exists(self):
+        """Garante que a tabela do ledger existe."""
+        try:
+            with get_connection(self.db_path) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS arquivos_ingeridos (
+                        caminho TEXT PRIMARY KEY,
+                        tamanho INTEGER NOT NULL,
+                        mtime REAL NOT NULL,
+                        hash TEXT NOT NULL,
+                        processador TEXT,
+                        linhas INTEGER DEFAULT 0,
+                        ingerido_em TEXT DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                logger.debug("✅ Tabela arquivos_ingeridos verificada/criada")
+        except Exception as e:
+            logger.error(f"❌ Erro ao criar tabela arquivos_ingeridos: {e}")
+            raise
+
+    @staticmethod
+    def compute_hash(file_path: Union[str, Path]) -> str:
+        """
+        Calcula o hash SHA-256 do conteúdo do arquivo.
+
+        Args:
+            file_path: Caminho do arquivo
+
+        Returns:
+            Hash em hexadecimal
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get_record(self, file_path: Union[str, Path]) -> Optional[IngestRecord]:
+        """
+        Busca o registro de um arquivo no ledger.
+
+        Args:
+            file_path: Caminho do arquivo (como gravado em raw_data['file_source'])
+
+        Returns:
+            IngestRecord ou None se o arquivo nunca foi importado
+        """
+        try:
+            conn = get_connection(self.db_path)
+            row = conn.execute("""
+                SELECT caminho, tamanho, mtime, hash, processador, linhas, ingerido_em
+                FROM arquivos_ingeridos WHERE caminho = ?
+            """, (str(file_path),)).fetchone()
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar arquivo no ledger: {e}")
+            return None
+
+        return self._row_to_record(row) if row else None
+
+    def get_all_records(self) -> List[IngestRecord]:
+        """Retorna todos os arquivos registrados no ledger."""
+        try:
+            conn = get_connection(self.db_path)
+            rows = conn.execute("""
+                SELECT caminho, tamanho, mtime, hash, processador, linhas, ingerido_em
+                FROM arquivos_ingeridos ORDER BY caminho
+            """).fetchall()
+        except Exception as e:
+            logger.error(f"❌ Erro ao listar ledger: {e}")
+            return []
+
+        return [self._row_to_record(row) for row in rows]
+
+    def check_file(self, file_path: Union[str, Path]) -> Tuple[bool, IngestRecord]:
+        """
+        Verifica se o arquivo mudou desde a última importação.
+
+        Args:
+            file_path: Caminho do arquivo
+
+        Returns:
+            Tupla (sem_alteracao, registro com a impressão digital atual).
+            O registro retornado ainda não tem processor/rows preenchidos.
+        """
+        st = Path(file_path).stat()
+        previous = self.get_record(file_path)
+
+        if previous and previous.size == st.st_size and previous.mtime == st.st_mtime:
+            return True, previous
+
+        current = IngestRecord(
+            path=str(file_path),
+            size=st.st_size,
+            mtime=st.st_mtime,
+            content_hash=self.compute_hash(file_path)
+        )
+
+        if previous and previous.content_hash == current.content_hash:
+            # Conteúdo igual (arquivo copiado/tocado): só atualiza o mtime
+            self._update_mtime(current)
+            return True, previous
+
+        return False, current
+
+    @staticmethod
+    def record_files(cursor: sqlite3.Cursor, records: List[IngestRecord]):
+        """
+        Grava/atualiza registros no ledger usando o cursor informado.
+
+        Recebe o cursor de quem chama para que o ledger seja atualizado na
+        mesma transação em que as linhas do arquivo são gravadas.
+
+        Args:
+            cursor: Cursor com transação aberta
+            records: Registros a gravar
+        """
+        cursor.executemany("""
+            INSERT INTO arquivos_ingeridos
+            (caminho, tamanho, mtime, hash, processador, linhas, ingerido_em)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(caminho) DO UPDATE SET
+                tamanho = excluded.tamanho,
+                mtime = excluded.mtime,
+                hash = excluded.hash,
+                processador = excluded.processador,
+                linhas = excluded.linhas,
+                ingerido_em = excluded.ingerido_em
+        """, [
+            (r.path, r.size, r.mtime, r.content_hash, r.processor, r.rows, r.ingested_at.isoformat())
+            for r in records
+        ])
+
+    def has_rows(self, file_path: Union[str, Path]) -> bool:
+        """
+        Verifica se o arquivo já tem linhas em lancamentos.
+
+        Um arquivo alterado que já tem linhas pode ter ficado com linhas que
+        outros arquivos também contêm (a deduplicação mantém o arquivo_id de
+        quem veio primeiro).
+
+        Args:
+            file_path: Caminho do arquivo
+
+        Returns:
+            True se alguma linha de lancamentos aponta para o arquivo
+        """
+        try:
+            conn = get_connection(self.db_path)
+            row = conn.execute("""
+                SELECT 1 FROM lancamentos
+                WHERE arquivo_id = (SELECT id FROM arquivos_origem WHERE caminho = ?)
+                LIMIT 1
+            """, (str(file_path),)).fetchone()
+        except sqlite3.OperationalError:
+            # Banco ainda sem lancamentos/arquivos_origem
+            return False
+        return row is not None
+
+    def forget(self, file_path: Union[str, Path]) -> bool:
+        """
+        Remove um arquivo do ledger (força reimportação na próxima execução).
+
+        Args:
+            file_path: Caminho do arquivo
+
+        Returns:
+            True se removeu algum registro
+        """
+        try:
+            with get_connection(self.db_path) as conn:
+                cursor = conn.execute(
+                    "DELETE FROM arquivos_ingeridos WHERE caminho = ?", (str(file_path),)
+                )
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"❌ Erro ao remover arquivo do ledger: {e}")
+            return False
+
+    def _update_mtime(self, record: IngestRecord):
+        try:
+            with get_connection(self.db_path) as conn:
+                conn.execute(
+                    "UPDATE arquivos_ingeridos SET tamanho = ?, mtime = ? WHERE caminho = ?",
+                    (record.size, record.mtime, record.path)
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao atualizar mtime no ledger: {e}")
+
+    @staticmethod
+    def _row_to_record(row) -> IngestRecord:
+        return IngestRecord(
+            path=row[0],
+            size=row[1],
+            mtime=row[2],
+            content_hash=row[3],
+            processor=row[4] or "",
+            rows=row[5] or 0,
+            ingested_at=datetime.fromisoformat(row[6]) if row[6] else datetime.now()
+        )
@@ -0,0 +1,144 @@
+"""
+Chave canônica de mês (mes_key)
+===============================
+
+O mês de competência chega em formatos diferentes conforme a origem:
+'Dezembro 2025' (month_ref dos processadores), '2025-12' (nome do arquivo de
+fatura) e '202511' (Open Finance). A coluna inteira mes_key (AAAAMM) dá a
+todos a mesma chave, indexada, para ordenar e filtrar por período direto no
+SQL (sem reconverter nomes de mês em Python a cada consulta).
+
+month_key() e month_key_sql() seguem exatamente as mesmas regras: a primeira
+é usada ao gravar pelo Python, a segunda no backfill e nos triggers que
+cobrem escritas feitas por fora dos repositórios.
+"""
+
+import re
+import sqlite3
+import logging
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Nomes de mês aceitos (minúsculos). 'marÇo' é o que o lower() do SQLite
+# (só ASCII) produz para 'MARÇO'.
+MESES_PT = {
+    'janeiro': 1, 'fevereiro': 2, 'março': 3, 'marÇo': 3, 'marco': 3, 'abril': 4,
+    'maio': 5, 'junho': 6, 'julho': 7, 'agosto': 8,
+    'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12
+}
+
+NOMES_MESES = {
+    1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril',
+    5: 'Maio', 6: 'Junho', 7: 'Julho', 8: 'Agosto',
+    9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro'
+}
+
+_AAAAMM = re.compile(r'(\d{4})-?(\d{2})')
+_NOME_ANO = re.compile(r'(.*) (\d{4})', re.DOTALL)
+
+
+@lru_cache(maxsize=1024)
+def month_key(value: Optional[str]) -> Optional[int]:
+    """
+    Converte um mês de competência em AAAAMM.
+
+    Args:
+        value: 'Dezembro 2025', '2025-12' ou '202512'
+
+    Returns:
+        Inteiro AAAAMM (ex: 202512) ou None se o formato não for reconhecido
+    """
+    if not value:
+        return None
+
+    encontrado = _AAAAMM.fullmatch(value)
+    if encontrado:
+        ano, mes = int(encontrado.group(1)), int(encontrado.group(2))
+        return ano * 100 + mes if 1 <= mes <= 12 else None
+
+    encontrado = _NOME_ANO.fullmatch(value)
+    if encontrado:
+        mes = MESES_PT.get(encontrado.group(1).strip(' ').lower())
+        if mes:
+            return int(encontrado.group(2)) * 100 + mes
+    return None
+
+
+def month_key_label(key: int) -> str:
+    """Nome de exibição de uma chave (202512 -> 'Dezembro 2025')."""
+    return f"{NOMES_MESES[key % 100]} {key // 100}"
+
+
+def month_key_shift(key: int, months: int) -> int:
+    """Soma (ou subtrai) meses a uma chave (202601, -1 -> 202512)."""
+    indice = (key // 100) * 12 + key % 100 - 1 + months
+    return (indice // 12) * 100 + indice % 12 + 1
+
+
+def month_key_sql(column: str) -> str:
+    """
+    Expressão SQL equivalente a month_key() para a coluna dada.
+
+    Args:
+        column: Coluna (ou expressão) com o mês de competência
+
+    Returns:
+        Expressão SQL que resulta em AAAAMM ou NULL
+    """
+    c = column
+    nome = f"lower(trim(substr({c}, 1, length({c}) - 5), ' '))"
+    casos_mes = " ".join(f"WHEN '{nome_mes}' THEN {numero}" for nome_mes, numero in MESES_PT.items())
+    return f"""(CASE
+        WHEN {c} GLOB '[0-9][0-9][0-9][0-9][0-9][0-9]'
+             AND CAST(substr({c}, 5, 2) AS INTEGER) BETWEEN 1 AND 12
+            THEN CAST({c} AS INTEGER)
+        WHEN {c} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]'
+             AND CAST(substr({c}, 6, 2) AS INTEGER) BETWEEN 1 AND 12
+            THEN CAST(substr({c}, 1, 4) || substr({c}, 6, 2) AS INTEGER)
+        WHEN {c} GLOB '* [0-9][0-9][0-9][0-9]'
+            THEN CAST(substr({c}, -4) AS INTEGER) * 100 + (CASE {nome} {casos_mes} END)
+    END)"""
+
+
+def ensure_month_key(cursor: sqlite3.Cursor, table: str, month_column: str):
+    """
+    Garante a coluna mes_key (com índice e triggers) em uma tabela.
+
+    Na primeira vez a coluna é criada e preenchida a partir de month_column.
+    Quem grava pelo Python já envia mes_key; os triggers preenchem as linhas
+    inseridas sem ela (scripts antigos) e recalculam quando o mês muda.
+
+    Args:
+        cursor: Cursor com transação aberta
+        table: Tabela (ex: 'lancamentos')
+        month_column: Coluna com o mês de competência (ex: 'MesComp')
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    if 'mes_key' not in {row[1].lower() for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN mes_key INTEGER")
+        cursor.execute(f"UPDATE {table} SET mes_key = {month_key_sql(month_column)}")
+        logger.info(f"🆕 Coluna mes_key preenchida em {table} ({cursor.rowcount} linhas)")
+
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_mes_key ON {table}(mes_key)")
+
+    atualizar = (
+        f"UPDATE {table} SET mes_key = {month_key_sql('NEW.' + month_column)} "
+        f"WHERE rowid = NEW.rowid;"
+    )
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_mes_key_insert
+        AFTER INSERT ON {table}
+        WHEN NEW.mes_key IS NULL
+        BEGIN
+            {atualizar}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_mes_key_update
+        AFTER UPDATE OF {month_column} ON {table}
+        BEGIN
+            {atualizar}
+        END
+    """)
@@ -0,0 +1,217 @@
+"""
+Repositório do resumo mensal (agregado materializado)
+=====================================================
+
+Mantém a tabela resumo_mensal com totais e contagens de lancamentos por
+(mês, categoria, fonte, titular, país). Os gráficos do dashboard leem daqui
+em vez de agrupar o histórico inteiro a cada requisição.
+
+A tabela é mantida por triggers em lancamentos (INSERT/UPDATE/DELETE), então
+qualquer caminho de escrita (save_transactions, update_transaction_category,
+atualizar_categoria do dashboard, categorização em lote, reimportação de
+arquivo) a mantém atualizada na mesma transação.
+
+Assim como no dashboard, lançamentos de pagamento de fatura/transferência
+interna (descrição) não entram no resumo. O filtro por categoria
+(INVESTIMENTOS, SALÁRIO...) fica para quem consulta, pois a categoria faz
+parte da chave.
+"""
+
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .connection import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Descrições que o dashboard nunca mostra (mesmo filtro de carregar_transacoes)
+DESCRICOES_EXCLUIDAS = (
+    'ITAU VISA',
+    'ITAU BLACK',
+    'ITAU MASTER',
+    'PGTO FATURA',
+    'PAGAMENTO CARTAO',
+    'PAGAMENTO EFETUADO',
+)
+
+# Colunas de lancamentos que mudam a chave ou os totais
+_COLUNAS_MONITORADAS = "Valor, Categoria, Fonte, MesComp, NomeTitular, Pais, Descricao"
+
+
+def _condicao_inclusao(linha: str) -> str:
+    """Expressão SQL: a linha (NEW/OLD) entra no resumo?"""
+    return " AND ".join(
+        f"{linha}.Descricao NOT LIKE '%{trecho}%'" for trecho in DESCRICOES_EXCLUIDAS
+    )
+
+
+def _sql_aplicar(linha: str, sinal: int) -> str:
+    """Comandos que somam (sinal=1) ou subtraem (sinal=-1) a linha do seu grupo."""
+    valor = f"CAST({linha}.Valor AS REAL)"
+    chave = (
+        f"IFNULL({linha}.MesComp, ''), IFNULL({linha}.Categoria, ''), IFNULL({linha}.Fonte, ''), "
+        f"IFNULL({linha}.NomeTitular, ''), IFNULL({linha}.Pais, '')"
+    )
+    comandos = f"""
+        INSERT INTO resumo_mensal
+            (mes_comp, categoria, fonte, titular, pais, total, qtd, total_debitos, qtd_debitos)
+        VALUES (
+            {chave},
+            {sinal} * {valor},
+            {sinal},
+            {sinal} * (CASE WHEN {valor} > 0 THEN {valor} ELSE 0 END),
+            {sinal} * ({valor} > 0)
+        )
+        ON CONFLICT(mes_comp, categoria, fonte, titular, pais) DO UPDATE SET
+            total = total + excluded.total,
+            qtd = qtd + excluded.qtd,
+            total_debitos = total_debitos + excluded.total_debitos,
+            qtd_debitos = qtd_debitos + excluded.qtd_debitos;
+    """
+    if sinal < 0:
+        comandos += f"""
+        DELETE FROM resumo_mensal
+        WHERE (mes_comp, categoria, fonte, titular, pais) = ({chave}) AND qtd <= 0;
+        """
+    return comandos
+
+
+# nome -> (evento, linha afetada, sinal)
+_TRIGGERS = {
+    "trg_resumo_mensal_insert": ("AFTER INSERT ON lancamentos", "NEW", 1),
+    "trg_resumo_mensal_delete": ("AFTER DELETE ON lancamentos", "OLD", -1),
+    "trg_resumo_mensal_update_old": (f"AFTER UPDATE OF {_COLUNAS_MONITORADAS} ON lancamentos", "OLD", -1),
+    "trg_resumo_mensal_update_new": (f"AFTER UPDATE OF {_COLUNAS_MONITORADAS} ON lancamentos", "NEW", 1),
+}
+
+
+class MonthlySummaryRepository:
+    """Repositório da tabela resumo_mensal."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._ensure_table_exists()
+
+    def _ensure_table_exists(self):
+        """Garante tabela e triggers; reconstrói o resumo na primeira vez."""
+        try:
+            with get_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('lancamentos', 'resumo_mensal')"
+                )
+                tabelas = {row[0] for row in cursor.fetchall()}
+                if 'lancamentos' not in tabelas:
+                    logger.debug("⏭️ Tabela lancamentos ainda não existe; resumo mensal adiado")
+                    return
+
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS resumo_mensal (
+                        mes_comp TEXT NOT NULL,
+                        categoria TEXT NOT NULL,
+                        fonte TEXT NOT NULL,
+                        titular TEXT NOT NULL DEFAULT '',
+                        pais TEXT NOT NULL DEFAULT '',
+                        total REAL NOT NULL DEFAULT 0,
+                        qtd INTEGER NOT NULL DEFAULT 0,
+                        total_debitos REAL NOT NULL DEFAULT 0,
+                        qtd_debitos INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (mes_comp, categoria, fonte, titular, pais)
+                    )
+                """)
+
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_resumo_mensal_%'"
+                )
+                existentes = {row[0] for row in cursor.fetchall()}
+                for nome, (evento, linha, sinal) in _TRIGGERS.items():
+                    if nome in existentes:
+                        continue
+                    cursor.execute(f"""
+                        CREATE TRIGGER {nome} {evento}
+                        WHEN {_condicao_inclusao(linha)}
+                        BEGIN
+                            {_sql_aplicar(linha, sinal)}
+                        END
+                    """)
+
+                # Tabela nova (ou triggers recriados): resumo precisa refletir o histórico
+                if 'resumo_mensal' not in tabelas or len(existentes) < len(_TRIGGERS):
+                    self._rebuild(cursor)
+
+                conn.commit()
+                logger.debug("✅ Tabela resumo_mensal verificada/criada")
+        except Exception as e:
+            logger.error(f"❌ Erro ao criar tabela resumo_mensal: {e}")
+            raise
+
+    def _rebuild(self, cursor: sqlite3.Cursor):
+        """Recalcula o resumo inteiro a partir de lancamentos."""
+        valor = "CAST(Valor AS REAL)"
+        cursor.execute("DELETE FROM resumo_mensal")
+        cursor.execute(f"""
+            INSERT INTO resumo_mensal
+                (mes_comp, categoria, fonte, titular, pais, total, qtd, total_debitos, qtd_debitos)
+            SELECT
+                IFNULL(MesComp, ''), IFNULL(Categoria, ''), IFNULL(Fonte, ''),
+                IFNULL(NomeTitular, ''), IFNULL(Pais, ''),
+                SUM({valor}),
+                COUNT(*),
+                SUM(CASE WHEN {valor} > 0 THEN {valor} ELSE 0 END),
+                SUM({valor} > 0)
+            FROM lancamentos
+            WHERE {_condicao_inclusao('lancamentos')}
+            GROUP BY 1, 2, 3, 4, 5
+        """)
+        logger.info(f"🔄 Resumo mensal reconstruído ({cursor.rowcount} grupos)")
+
+    def rebuild(self) -> bool:
+        """
+        Reconstrói o resumo a partir de lancamentos.
+
+        Só é necessário se lancamentos for alterado com os triggers desativados
+        (ex.: restauração de backup por ferramenta externa).
+
+        Returns:
+            True se sucesso
+        """
+        try:
+            with get_connection(self.db_path) as conn:
+                self._rebuild(conn.cursor())
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erro ao reconstruir resumo mensal: {e}")
+            return False
+
+    def get_groups(self, mes_comp: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna os grupos do resumo.
+
+        Args:
+            mes_comp: Filtra um mês (ex: 'Dezembro 2025'); None = todos
+
+        Returns:
+            Lista de dicts (titular/pais vazios voltam como None)
+        """
+        query = """
+            SELECT mes_comp, categoria, fonte, NULLIF(titular, ''), NULLIF(pais, ''),
+                   total, qtd, total_debitos, qtd_debitos
+            FROM resumo_mensal
+        """
+        params = ()
+        if mes_comp is not None:
+            query += " WHERE mes_comp = ?"
+            params = (mes_comp,)
+
+        try:
+            rows = get_connection(self.db_path).execute(query, params).fetchall()
+        except Exception as e:
+            logger.error(f"❌ Erro ao consultar resumo mensal: {e}")
+            return []
+
+        campos = ('mes_comp', 'categoria', 'fonte', 'titular', 'pais',
+                  'total', 'qtd', 'total_debitos', 'qtd_debitos')
+        return [dict(zip(campos, row)) for row in rows]
@@ -0,0 +1,121 @@
+"""
+Estado da sincronização Open Finance por conta
+==============================================
+
+Guarda, para cada conta do Pluggy, quando foi a última sincronização bem
+sucedida, a maior data de transação recebida e o início do período já
+coberto. A próxima sincronização busca só a partir desse ponto (menos uma
+janela de sobreposição para lançamentos que chegam atrasados) em vez de
+baixar de novo todos os meses retroativos.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+from .connection import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Dias buscados de novo antes do ponto salvo (lançamentos com data retroativa)
+SOBREPOSICAO_DIAS = 7
+
+
+class OpenFinanceSyncStateRepository:
+    """Repositório do estado de sincronização (watermark) por conta."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._ensure_table_exists()
+
+    def _ensure_table_exists(self):
+        """Garante que a tabela de estado existe."""
+        try:
+            with get_connection(self.db_path) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS openfinance_sync_estado (
+                        account_id TEXT PRIMARY KEY,
+                        item_id TEXT,
+                        ultima_sincronizacao TEXT NOT NULL,
+                        max_data TEXT,
+                        cobertura_inicio TEXT
+                    )
+                """)
+                logger.debug("✅ Tabela openfinance_sync_estado verificada/criada")
+        except Exception as e:
+            logger.error(f"❌ Erro ao criar tabela openfinance_sync_estado: {e}")
+            raise
+
+    def get_state(self, account_id: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Estado salvo de uma conta.
+
+        Returns:
+            Dict com ultima_sincronizacao, max_data e cobertura_inicio (ISO) ou None
+        """
+        row = get_connection(self.db_path).execute("""
+            SELECT ultima_sincronizacao, max_data, cobertura_inicio
+            FROM openfinance_sync_estado WHERE account_id = ?
+        """, (account_id,)).fetchone()
+        if row is None:
+            return None
+        return {'ultima_sincronizacao': row[0], 'max_data': row[1], 'cobertura_inicio': row[2]}
+
+    def start_date(self, account_id: str, date_from: datetime,
+                   sobreposicao_dias: int = SOBREPOSICAO_DIAS) -> datetime:
+        """
+        Data inicial da busca de uma conta.
+
+        Sem estado, ou se o período pedido começa antes do já coberto, é o
+        próprio date_from (busca completa). Senão, o menor entre a maior data
+        recebida e o dia da última sincronização, menos a sobreposição.
+
+        Args:
+            account_id: Conta
+            date_from: Início do período pedido (meses retroativos)
+            sobreposicao_dias: Dias buscados de novo antes do ponto salvo
+        """
+        estado = self.get_state(account_id)
+        if not estado or not estado['cobertura_inicio']:
+            return date_from
+        if date_from.date() < date.fromisoformat(estado['cobertura_inicio']):
+            return date_from
+
+        marco = datetime.fromisoformat(estado['ultima_sincronizacao']).date()
+        if estado['max_data']:
+            marco = min(marco, date.fromisoformat(estado['max_data']))
+        inicio = datetime.combine(marco - timedelta(days=sobreposicao_dias), datetime.min.time())
+        return max(date_from, inicio)
+
+    def save_state(self, account_id: str, item_id: Optional[str], sincronizado_em: datetime,
+                   max_data: Optional[str], date_from: datetime):
+        """
+        Registra uma sincronização bem sucedida da conta.
+
+        max_data e cobertura_inicio só avançam/recuam: uma busca parcial não
+        apaga o que uma busca maior já cobriu.
+
+        Args:
+            account_id, item_id: Conta e Item do Pluggy
+            sincronizado_em: Início da sincronização
+            max_data: Maior data (AAAA-MM-DD) recebida nesta busca (None se nenhuma)
+            date_from: Início do período buscado
+        """
+        with get_connection(self.db_path) as conn:
+            conn.execute("""
+                INSERT INTO openfinance_sync_estado
+                    (account_id, item_id, ultima_sincronizacao, max_data, cobertura_inicio)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(account_id) DO UPDATE SET
+                    item_id = excluded.item_id,
+                    ultima_sincronizacao = excluded.ultima_sincronizacao,
+                    max_data = CASE
+                        WHEN openfinance_sync_estado.max_data IS NULL THEN excluded.max_data
+                        WHEN excluded.max_data IS NULL THEN openfinance_sync_estado.max_data
+                        ELSE MAX(openfinance_sync_estado.max_data, excluded.max_data)
+                    END,
+                    cobertura_inicio = MIN(IFNULL(openfinance_sync_estado.cobertura_inicio, excluded.cobertura_inicio),
+                                           excluded.cobertura_inicio)
+            """, (account_id, item_id, sincronizado_em.isoformat(timespec='seconds'), max_data,
+                  date_from.date().isoformat()))
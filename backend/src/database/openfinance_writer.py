@@ -0,0 +1,106 @@
+"""
+Gravação em lote de transacoes_openfinance
+==========================================
+
+OpenFinanceWriter acumula as transações processadas pela sincronização e
+grava em lotes: um executemany com INSERT ... ON CONFLICT(provider_id) DO
+NOTHING, numa única transação por conta, na conexão reutilizável da
+thread. Transações já existentes (mesmo provider_id) são contadas como
+duplicadas pelo número de linhas realmente inseridas (changes()), sem
+depender de IntegrityError linha a linha.
+"""
+
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .connection import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Colunas gravadas pela sincronização (chaves do dicionário da transação)
+COLUNAS_OPENFINANCE = (
+    'provider_id', 'account_id', 'data', 'descricao', 'valor',
+    'categoria', 'categoria_banco', 'tag',
+    'fonte', 'pagador', 'cartao_final',
+    'mes_comp', 'mes_key',
+    'tipo_transacao', 'tipo_conta', 'origem_banco',
+    'parcela_numero', 'parcela_total', 'data_compra',
+    'moeda_original', 'valor_moeda_original',
+    'origem_dado', 'metadata_json',
+)
+
+_INSERT_OPENFINANCE = f"""
+    INSERT INTO transacoes_openfinance ({', '.join(COLUNAS_OPENFINANCE)})
+    VALUES ({', '.join(':' + coluna for coluna in COLUNAS_OPENFINANCE)})
+    ON CONFLICT(provider_id) DO NOTHING
+"""
+
+
+class OpenFinanceWriter:
+    """Gravador em lote para transacoes_openfinance."""
+
+    def __init__(self, db_path: Path, batch_size: int = 2000):
+        """
+        Args:
+            db_path: Caminho do banco
+            batch_size: Transações acumuladas antes de gravar automaticamente
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.stats = {'inseridas': 0, 'duplicadas': 0}
+        self.por_conta: Dict[str, Dict[str, int]] = defaultdict(lambda: {'inseridas': 0, 'duplicadas': 0})
+        self._buffer: List[Dict[str, Any]] = []
+
+    def __enter__(self) -> 'OpenFinanceWriter':
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, transacao: Dict[str, Any]):
+        """Acumula uma transação (grava quando o lote enche)."""
+        self._buffer.append(transacao)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, transacoes: List[Dict[str, Any]]):
+        """Acumula várias transações."""
+        for transacao in transacoes:
+            self.add(transacao)
+
+    def flush(self) -> Tuple[int, int]:
+        """
+        Grava o que está acumulado (uma transação SQLite por conta).
+
+        Returns:
+            Tupla (inseridas, duplicadas) deste lote
+        """
+        if not self._buffer:
+            return 0, 0
+
+        por_conta = defaultdict(list)
+        for transacao in self._buffer:
+            por_conta[transacao['account_id']].append(transacao)
+
+        inseridas_lote = duplicadas_lote = 0
+        conn = get_connection(self.db_path)
+        for account_id, transacoes in por_conta.items():
+            with conn:
+                cursor = conn.executemany(_INSERT_OPENFINANCE, transacoes)
+                # rowcount do executemany = soma de changes() de cada INSERT
+                inseridas = cursor.rowcount
+            duplicadas = len(transacoes) - inseridas
+
+            self.por_conta[account_id]['inseridas'] += inseridas
+            self.por_conta[account_id]['duplicadas'] += duplicadas
+            inseridas_lote += inseridas
+            duplicadas_lote += duplicadas
+
+        self._buffer.clear()
+        self.stats['inseridas'] += inseridas_lote
+        self.stats['duplicadas'] += duplicadas_lote
+        logger.debug(f"💾 transacoes_openfinance: {inseridas_lote} inseridas, {duplicadas_lote} duplicadas")
+        return inseridas_lote, duplicadas_lote
@@ -0,0 +1,207 @@
+"""
+Armazenamento compacto de raw_data em lancamentos
+=================================================
+
+Cada linha guardava em raw_data um JSON repetindo o caminho do arquivo
+(file_source), o banco e a descrição original, além do mesmo caminho de novo
+em ArquivoOrigem. Agora:
+
+- o caminho e o banco ficam uma vez só em arquivos_origem, e a linha aponta
+  para ele por arquivo_id (chave estrangeira, indexada);
+- raw_data guarda só o resto, em JSON compacto (NULL quando não sobra nada),
+  opcionalmente comprimido com zlib (BLOB);
+- file_source, bank e original_description são recompostos na leitura.
+
+Linhas de arquivo sempre têm original_description (todos os processadores
+gravam); quando ela é igual à descrição da linha não é armazenada.
+"""
+
+import json
+import zlib
+import sqlite3
+import logging
+from typing import Any, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_raw_data_storage(cursor: sqlite3.Cursor):
+    """
+    Garante arquivos_origem e lancamentos.arquivo_id.
+
+    Na primeira vez os arquivos são extraídos de ArquivoOrigem (ou de
+    raw_data['file_source'] em bancos mais antigos), raw_data é compactado e
+    a coluna ArquivoOrigem é removida.
+
+    Args:
+        cursor: Cursor com transação aberta
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS arquivos_origem (
+            id INTEGER PRIMARY KEY,
+            caminho TEXT NOT NULL UNIQUE,
+            banco TEXT
+        )
+    """)
+
+    cursor.execute("PRAGMA table_info(lancamentos)")
+    colunas = {row[1] for row in cursor.fetchall()}
+    if 'arquivo_id' not in colunas:
+        cursor.execute("ALTER TABLE lancamentos ADD COLUMN arquivo_id INTEGER REFERENCES arquivos_origem(id)")
+        _migrar_arquivos(cursor, 'ArquivoOrigem' in colunas)
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lancamentos_arquivo ON lancamentos(arquivo_id)")
+
+    if 'ArquivoOrigem' in colunas:
+        cursor.execute("DROP INDEX IF EXISTS idx_arquivo_origem")
+        try:
+            cursor.execute("ALTER TABLE lancamentos DROP COLUMN ArquivoOrigem")
+        except sqlite3.OperationalError:
+            # SQLite sem DROP COLUMN (< 3.35): ao menos libera o espaço
+            cursor.execute("UPDATE lancamentos SET ArquivoOrigem = NULL")
+        logger.info("🗜️ Coluna ArquivoOrigem substituída por arquivo_id")
+
+
+def _migrar_arquivos(cursor: sqlite3.Cursor, tem_arquivo_origem: bool):
+    """Preenche arquivos_origem/arquivo_id e compacta raw_data das linhas existentes."""
+    json_ok = "json_valid(raw_data) AND json_type(raw_data) = 'object'"
+    caminho = f"CASE WHEN {json_ok} THEN json_extract(raw_data, '$.file_source') END"
+    if tem_arquivo_origem:
+        caminho = f"COALESCE(ArquivoOrigem, {caminho})"
+
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO arquivos_origem (caminho, banco)
+        SELECT caminho, MIN(banco) FROM (
+            SELECT {caminho} AS caminho,
+                   CASE WHEN {json_ok} THEN json_extract(raw_data, '$.bank') END AS banco
+            FROM lancamentos
+        )
+        WHERE caminho IS NOT NULL
+        GROUP BY caminho
+    """)
+    cursor.execute(f"""
+        UPDATE lancamentos
+        SET arquivo_id = (SELECT id FROM arquivos_origem WHERE caminho = {caminho})
+        WHERE {caminho} IS NOT NULL
+    """)
+    logger.info(f"🆕 arquivo_id preenchido em {cursor.rowcount} linhas de lancamentos")
+
+    # Remove o que passa a vir de arquivos_origem/Descricao. Caminho que não
+    # se aplica cai em '$.file_source' (já removido, não faz nada).
+    cursor.execute(f"""
+        UPDATE lancamentos
+        SET raw_data = (
+            SELECT NULLIF(json_remove(
+                lancamentos.raw_data,
+                '$.file_source',
+                CASE WHEN json_extract(lancamentos.raw_data, '$.bank') = a.banco
+                     THEN '$.bank' ELSE '$.file_source' END,
+                CASE WHEN json_extract(lancamentos.raw_data, '$.original_description') = lancamentos.Descricao
+                     THEN '$.original_description' ELSE '$.file_source' END
+            ), '{{}}')
+            FROM arquivos_origem a WHERE a.id = lancamentos.arquivo_id
+        )
+        WHERE arquivo_id IS NOT NULL AND {json_ok}
+    """)
+    # Demais linhas: só minifica o JSON
+    cursor.execute(f"""
+        UPDATE lancamentos SET raw_data = NULLIF(json(raw_data), '{{}}')
+        WHERE arquivo_id IS NULL AND {json_ok}
+    """)
+
+
+def register_files(cursor: sqlite3.Cursor, arquivos: Dict[str, Optional[str]]) -> Dict[str, Tuple[int, Optional[str]]]:
+    """
+    Registra arquivos em arquivos_origem (se ainda não existem).
+
+    Args:
+        cursor: Cursor com transação aberta
+        arquivos: caminho -> banco (ou None)
+
+    Returns:
+        caminho -> (id, banco gravado)
+    """
+    if not arquivos:
+        return {}
+    cursor.executemany("""
+        INSERT INTO arquivos_origem (caminho, banco) VALUES (?, ?)
+        ON CONFLICT(caminho) DO UPDATE SET banco = excluded.banco
+        WHERE arquivos_origem.banco IS NULL
+    """, list(arquivos.items()))
+
+    registrados = {}
+    caminhos = list(arquivos)
+    for inicio in range(0, len(caminhos), 500):
+        parte = caminhos[inicio:inicio + 500]
+        cursor.execute(
+            f"SELECT caminho, id, banco FROM arquivos_origem WHERE caminho IN ({','.join('?' * len(parte))})",
+            parte,
+        )
+        registrados.update({caminho: (id_arquivo, banco) for caminho, id_arquivo, banco in cursor.fetchall()})
+    return registrados
+
+
+def encode_raw_data(raw: Dict[str, Any], descricao: str, banco_arquivo: Optional[str] = None,
+                    compress: bool = False) -> Union[str, bytes, None]:
+    """
+    Converte raw_data para o formato gravado.
+
+    Args:
+        raw: raw_data da transação
+        descricao: Descrição da transação
+        banco_arquivo: Banco registrado para o arquivo da transação
+        compress: Comprime com zlib (só se ficar menor)
+
+    Returns:
+        JSON compacto, BLOB zlib ou None se não sobrou nada
+    """
+    dados = dict(raw or {})
+    if dados.get('file_source'):
+        del dados['file_source']
+        if dados.get('original_description') == descricao:
+            del dados['original_description']
+        if 'bank' in dados and dados['bank'] == banco_arquivo:
+            del dados['bank']
+    if not dados:
+        return None
+
+    texto = json.dumps(dados, ensure_ascii=False, separators=(',', ':'))
+    if compress:
+        comprimido = zlib.compress(texto.encode('utf-8'))
+        if len(comprimido) < len(texto.encode('utf-8')):
+            return comprimido
+    return texto
+
+
+def decode_raw_data(stored: Union[str, bytes, None], descricao: str,
+                    caminho: Optional[str] = None, banco: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Reconstrói raw_data a partir do valor gravado.
+
+    Args:
+        stored: Valor da coluna raw_data (JSON, BLOB zlib ou NULL)
+        descricao: Descrição da linha
+        caminho, banco: Arquivo de origem (arquivos_origem), se houver
+
+    Returns:
+        Dicionário raw_data. Conteúdo que não é um objeto JSON (gravado por
+        scripts antigos) fica em {'raw': valor}.
+    """
+    if stored is None:
+        dados = {}
+    else:
+        if isinstance(stored, bytes):
+            stored = zlib.decompress(stored).decode('utf-8')
+        try:
+            dados = json.loads(stored)
+        except ValueError:
+            dados = None
+        if not isinstance(dados, dict):
+            dados = {'raw': stored}
+
+    if caminho:
+        dados.setdefault('file_source', caminho)
+        dados.setdefault('original_description', descricao)
+        if banco:
+            dados.setdefault('bank', banco)
+    return dados
@@ -4,13 +4,22 @@ Repositório para gerenciamento de transações
 
 import sqlite3
 import logging
-from typing import List, Dict, Optional, Any
+from typing import Iterable, List, Dict, Optional, Any, Union
 from pathlib import Path
 from datetime import date, datetime
-import json
 
-from models import Transaction, TransactionSource, TransactionCategory
+from models import Transaction, TransactionBatch, TransactionSource, TransactionCategory, IngestRecord, LazyRawData
 from utils import DeduplicationHelper
+from .connection import get_connection
+from .ingest_ledger_repository import IngestLedgerRepository
+from .monthly_summary_repository import MonthlySummaryRepository
+from .month_key import month_key, ensure_month_key
+from .dedup_keys import (
+    ensure_dedup_columns, ensure_content_ids, assign_content_ids, content_ids,
+    content_key, next_content_id, cents_sql, source_norm_sql, description_norm_sql,
+)
+from .raw_data_store import ensure_raw_data_storage, register_files, encode_raw_data, decode_raw_data
+from .description_search import ensure_description_search, search_condition
 
 logger = logging.getLogger(__name__)
 
@@ -31,21 +40,61 @@ NOVAS_COLUNAS_V2 = {
     "LocalSite": "TEXT",
 }
 
+# Placeholders das colunas de deduplicação no INSERT (valor, fonte, descrição):
+# calculadas pelo SQLite com as mesmas expressões usadas nas buscas
+_COLUNAS_DEDUP_VALUES = ", ".join([cents_sql("?"), source_norm_sql("?"), description_norm_sql("?")])
+
+# Gravação de transações: upsert pelo id de conteúdo. Uma linha que já existe
+# mantém categoria e datas; só raw_data (e o que vem dele) é atualizado, e
+# apenas quando mudou, para não disparar os triggers do resumo à toa.
+_UPSERT_LANCAMENTO = f"""
+    INSERT INTO lancamentos
+    (Data, Descricao, Valor, Fonte, Categoria, MesComp, id, raw_data, created_at, updated_at,
+     ParcelaAtual, QtdParcelas, Titularidade, NomeTitular, TipoCartaoRaw, NumeroCartao,
+     Cotacao, MoedaEstrangeira, ValorMoedaEstrangeira, Pais, LocalSite, arquivo_id, mes_key,
+     valor_centavos, fonte_norm, desc_norm)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+            {_COLUNAS_DEDUP_VALUES})
+    ON CONFLICT(id) DO UPDATE SET
+        raw_data = excluded.raw_data,
+        {", ".join(f"{coluna} = excluded.{coluna}" for coluna in NOVAS_COLUNAS_V2)}
+    WHERE lancamentos.raw_data IS NOT excluded.raw_data
+"""
+# Posição do id nos parâmetros de _UPSERT_LANCAMENTO
+_POS_ID = 6
+
+# Texto gravado -> enum (evita a busca do Enum por linha na leitura)
+_FONTES = {fonte.value: fonte for fonte in TransactionSource}
+_CATEGORIAS = {categoria.value: categoria for categoria in TransactionCategory}
+
+# Leitura de transações: raw_data é recomposto com o arquivo de origem
+_SELECT_TRANSACAO = """
+    SELECT l.id, l.Data, l.Descricao, l.Valor, l.Fonte, l.Categoria, l.MesComp,
+           l.raw_data, l.created_at, l.updated_at, a.caminho, a.banco
+    FROM lancamentos l
+    LEFT JOIN arquivos_origem a ON a.id = l.arquivo_id
+"""
+
 
 class TransactionRepository:
     """Repositório para gerenciar transações no banco de dados."""
     
-    def __init__(self, db_path: Path, enable_deduplication: bool = True):
+    def __init__(self, db_path: Path, enable_deduplication: bool = True,
+                 compress_raw_data: bool = False):
         self.db_path = db_path
         self.enable_deduplication = enable_deduplication
+        # raw_data gravado como BLOB zlib (deixa de ser legível por json_extract)
+        self.compress_raw_data = compress_raw_data
         self.dedup_helper = DeduplicationHelper()
         self.dedup_stats = {'checked': 0, 'duplicates_skipped': 0}
         self._ensure_table_exists()
+        # Resumo mensal mantido por triggers em lancamentos
+        self.summary = MonthlySummaryRepository(db_path)
     
     def _ensure_table_exists(self):
         """Garante que a tabela de transações existe com esquema compatível."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Verifica se a tabela existe e seu esquema
@@ -100,12 +149,32 @@ class TransactionRepository:
                         except sqlite3.OperationalError:
                             pass  # Coluna já existe
                 
+                # Arquivo de origem (ledger de ingestão) em arquivos_origem +
+                # raw_data compacto: permite substituir só as linhas de um
+                # arquivo alterado sem repetir o caminho em cada linha
+                ensure_raw_data_storage(cursor)
+                
+                # Chave de mês AAAAMM (MesComp mistura 'Dezembro 2025' e '2025-12')
+                ensure_month_key(cursor, 'lancamentos', 'MesComp')
+                
+                # Valor/fonte/descrição normalizados + índice composto da deduplicação
+                ensure_dedup_columns(cursor)
+                
+                # Id derivado do conteúdo + índice único (upsert na gravação)
+                ensure_content_ids(cursor)
+                
+                # Índice FTS5 (trigram) das descrições para busca por trecho
+                self.search_enabled = ensure_description_search(cursor)
+                
                 # Cria índices para performance (usando nomes em português)
                 try:
                     cursor.execute("CREATE INDEX IF NOT EXISTS idx_data ON lancamentos(Data)")
                     cursor.execute("CREATE INDEX IF NOT EXISTS idx_categoria ON lancamentos(Categoria)")
                     cursor.execute("CREATE INDEX IF NOT EXISTS idx_fonte ON lancamentos(Fonte)")
                     cursor.execute("CREATE INDEX IF NOT EXISTS idx_mescomp ON lancamentos(MesComp)")
+                    # Ordem da tabela de transações do dashboard (paginação por chave)
+                    cursor.execute("DROP INDEX IF EXISTS idx_mescomp_fonte_data")
+                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_meskey_fonte_data ON lancamentos(mes_key, Fonte DESC, Data)")
                 except sqlite3.OperationalError:
                     pass  # Índices podem já existir
                 
@@ -119,6 +188,11 @@ class TransactionRepository:
         """
         Salva uma transação no banco.
         
+        O id da transação passa a ser o id de conteúdo com a primeira
+        ocorrência livre no banco: uma segunda compra idêntica no mesmo dia
+        vira outra linha. Regravar a mesma transação (que já tem o id de
+        uma das ocorrências) atualiza a linha em vez de duplicá-la.
+        
         Args:
             transaction: Transação a ser salva
             
@@ -126,28 +200,15 @@ class TransactionRepository:
             True se salvou com sucesso, False caso contrário
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
-                campos_v2 = self._extrair_campos_v2(transaction)
-                cursor.execute("""
-                    INSERT OR REPLACE INTO lancamentos 
-                    (Data, Descricao, Valor, Fonte, Categoria, MesComp, id, raw_data, created_at, updated_at,
-                     ParcelaAtual, QtdParcelas, Titularidade, NomeTitular, TipoCartaoRaw, NumeroCartao,
-                     Cotacao, MoedaEstrangeira, ValorMoedaEstrangeira, Pais, LocalSite)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    transaction.date.isoformat(),
-                    transaction.description,
-                    transaction.amount,
-                    transaction.source.value,
-                    transaction.category.value,
-                    transaction.month_ref,
-                    transaction.id,
-                    json.dumps(transaction.raw_data),
-                    transaction.created_at.isoformat(),
-                    None,  # updated_at vazia por padrão
-                    *campos_v2,
-                ))
+                chave = content_key(
+                    transaction.date.isoformat(), transaction.amount, transaction.source.value,
+                    transaction.description, transaction.mes_comp or transaction.month_ref,
+                )
+                transaction.id = next_content_id(cursor, chave, atual=transaction.id)
+                arquivos = self._registrar_arquivos(cursor, [transaction.raw_data])
+                cursor.execute(_UPSERT_LANCAMENTO, self._linha_insert(transaction, None, arquivos))
                 conn.commit()
                 logger.debug(f"✅ Transação salva: {transaction.description} - R$ {transaction.amount}")
                 return True
@@ -155,6 +216,65 @@ class TransactionRepository:
             logger.error(f"❌ Erro ao salvar transação: {e}")
             return False
 
+    @staticmethod
+    def _registrar_arquivos(cursor: sqlite3.Cursor, raws: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, tuple]:
+        """Registra os arquivos de origem do lote (caminho -> (id, banco))."""
+        arquivos = {}
+        for rd in raws:
+            rd = rd or {}
+            caminho = rd.get("file_source")
+            if caminho and arquivos.get(caminho) is None:
+                arquivos[caminho] = rd.get("bank")
+        return register_files(cursor, arquivos)
+
+    def _linha_insert(self, transaction: Transaction, updated_at: Optional[str],
+                      arquivos: Dict[str, tuple]) -> tuple:
+        """Parâmetros de _UPSERT_LANCAMENTO para uma transação."""
+        return self._linha(
+            transaction.date.isoformat(), transaction.description, transaction.amount,
+            transaction.source.value, transaction.category.value, transaction.month_ref,
+            transaction.id, transaction.raw_data, transaction.created_at.isoformat(),
+            updated_at, arquivos,
+        )
+
+    def _linhas_lote(self, batch: TransactionBatch, arquivos: Dict[str, tuple]) -> List[tuple]:
+        """Parâmetros de _UPSERT_LANCAMENTO para um lote colunar (sem criar Transaction)."""
+        frame = batch.frame
+        created_at = batch.created_at.isoformat()
+        return [
+            self._linha(data, descricao, valor, fonte, categoria, month_ref, id_, rd, created_at, None, arquivos)
+            for data, descricao, valor, fonte, categoria, month_ref, id_, rd in zip(
+                batch.date_iso(), frame['description'].tolist(), frame['amount'].tolist(),
+                frame['source'].astype(object).tolist(), frame['category'].astype(object).tolist(),
+                frame['month_ref'].astype(object).tolist(), frame['id'].tolist(), frame['raw_data'].tolist(),
+            )
+        ]
+
+    def _linha(self, data: str, descricao: str, valor: float, fonte: str, categoria: str,
+               month_ref: str, id_: str, raw_data: Optional[Dict[str, Any]], created_at: str,
+               updated_at: Optional[str], arquivos: Dict[str, tuple]) -> tuple:
+        """Parâmetros de _UPSERT_LANCAMENTO a partir dos valores já convertidos."""
+        rd = raw_data or {}
+        arquivo_id, banco = arquivos.get(rd.get("file_source"), (None, None))
+        return (
+            data,
+            descricao,
+            valor,
+            fonte,
+            categoria,
+            month_ref,
+            id_,
+            encode_raw_data(rd, descricao, banco, self.compress_raw_data),
+            created_at,
+            updated_at,
+            *self._campos_v2(rd),
+            arquivo_id,
+            month_key(month_ref),
+            valor,
+            fonte,
+            descricao,
+        )
+
     @staticmethod
     def _extrair_campos_v2(transaction: Transaction) -> tuple:
         """
@@ -162,7 +282,12 @@ class TransactionRepository:
         transação. Transações do formato antigo não têm essas chaves em
         raw_data, então tudo fica None (colunas nullable).
         """
-        rd = transaction.raw_data or {}
+        return TransactionRepository._campos_v2(transaction.raw_data)
+
+    @staticmethod
+    def _campos_v2(rd: Optional[Dict[str, Any]]) -> tuple:
+        """Campos do formato v2 a partir de um raw_data (ver _extrair_campos_v2)."""
+        rd = rd or {}
         return (
             rd.get("parcela_atual"),
             rd.get("qtd_parcelas"),
@@ -183,7 +308,7 @@ class TransactionRepository:
         
         Compara descrições ORIGINAIS (sem normalização) junto com:
         - Data da transação
-        - Valor (com tolerância de 0.01)
+        - Valor (em centavos, equivale à tolerância de 0.01)
         - Fonte (PIX, Cartão, etc)
         - Mês de compensação (para distinguir parcelas de cartão)
         
@@ -194,22 +319,24 @@ class TransactionRepository:
             True se já existe (duplicata), False se é nova
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
-                # Busca transações com mesma data, valor aproximado, fonte E descrição exata
-                cursor.execute("""
+                # Busca transações com mesma data, valor (tolerância de 0.01), fonte
+                # E descrição normalizadas: seek em idx_lancamentos_dedup
+                cursor.execute(f"""
                     SELECT Descricao, MesComp FROM lancamentos 
-                    WHERE Data = ? 
-                    AND ABS(Valor - ?) < 0.01
-                    AND UPPER(Fonte) = UPPER(?)
-                    AND UPPER(TRIM(Descricao)) = UPPER(TRIM(?))
-                """, (
-                    transaction.date.isoformat(),
-                    float(transaction.amount),
-                    transaction.source.value,
-                    transaction.description
-                ))
+                    WHERE Data = :data
+                    AND valor_centavos IN ({cents_sql(':valor')} - 1, {cents_sql(':valor')}, {cents_sql(':valor')} + 1)
+                    AND ABS(Valor - :valor) < 0.01
+                    AND fonte_norm = {source_norm_sql(':fonte')}
+                    AND desc_norm = {description_norm_sql(':descricao')}
+                """, {
+                    'data': transaction.date.isoformat(),
+                    'valor': float(transaction.amount),
+                    'fonte': transaction.source.value,
+                    'descricao': transaction.description,
+                })
                 
                 existing = cursor.fetchall()
                 
@@ -235,84 +362,111 @@ class TransactionRepository:
         except Exception as e:
             logger.warning(f"⚠️ Erro ao verificar duplicata: {e}")
             return False  # Em caso de erro, assume que não é duplicata
-    
-    def save_transactions(self, transactions: List[Transaction], skip_duplicates: bool = None) -> int:
+
+    def save_transactions(self, transactions: Union[List[Transaction], TransactionBatch],
+                          skip_duplicates: bool = None,
+                          ingested_files: Optional[List[IngestRecord]] = None) -> int:
         """
         Salva múltiplas transações no banco.
         
+        Cada transação recebe o id de conteúdo (data, valor, fonte, descrição,
+        mês e ocorrência no lote) e o lote inteiro é gravado com um único
+        upsert: o que já existe no banco com o mesmo id é atualizado em vez de
+        duplicado. Com a deduplicação ativa, as regras de check_duplicate()
+        (tolerância de 0.01 e mês de compensação vazio em qualquer lado) são
+        resolvidas antes, com um único JOIN (_find_duplicates_bulk), e essas
+        duplicatas não são gravadas. As linhas novas são contadas pelo rowid
+        (tudo acima do maior rowid anterior ao lote).
+        
         Args:
-            transactions: Lista de transações
-            skip_duplicates: Se True, verifica duplicatas antes de inserir.
-                           Se None, usa a configuração do repositório (self.enable_deduplication)
+            transactions: Lista de transações ou TransactionBatch (os ids são
+                         substituídos no lugar)
+            skip_duplicates: Se True, pula duplicatas pelas regras de
+                           check_duplicate() e contabiliza em dedup_stats. Se
+                           False, só o upsert por id. Se None, usa a
+                           configuração do repositório (self.enable_deduplication).
+            ingested_files: Arquivos (re)importados nesta execução. As linhas
+                           antigas de cada arquivo são substituídas e o ledger
+                           de ingestão é atualizado, tudo na mesma transação.
             
         Returns:
-            Número de transações salvas com sucesso
+            Número de transações novas gravadas
         """
-        # Determina se deve verificar duplicatas
+        # Determina se deve contabilizar duplicatas
         should_check_dupes = skip_duplicates if skip_duplicates is not None else self.enable_deduplication
         
-        # DEBUG: Mostrar totais de Dezembro 2025 Master ANTES da deduplicação
-        debug_dez_master = [t for t in transactions if t.month_ref == 'Dezembro 2025' and 'Master' in t.source.value]
-        if debug_dez_master:
-            total_dez_master = sum(abs(t.amount) for t in debug_dez_master)
-            logger.info(f"🔍 DEBUG: Dezembro 2025 Master ANTES deduplicacao: {len(debug_dez_master)} transacoes = R$ {total_dez_master:,.2f}")
+        lote = transactions if isinstance(transactions, TransactionBatch) else None
         
         saved_count = 0
         duplicates_count = 0
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
-                
-                for transaction in transactions:
-                    # Verifica duplicata se habilitado
-                    if should_check_dupes:
-                        self.dedup_stats['checked'] += 1
-                        if self.check_duplicate(transaction):
-                            duplicates_count += 1
-                            self.dedup_stats['duplicates_skipped'] += 1
-                            logger.debug(f"⏭️  Duplicata ignorada: {transaction.description}")
-                            continue  # Pula esta transação
-                    
-                    try:
-                        campos_v2 = self._extrair_campos_v2(transaction)
-                        cursor.execute("""
-                            INSERT OR REPLACE INTO lancamentos 
-                            (Data, Descricao, Valor, Fonte, Categoria, MesComp, id, raw_data, created_at, updated_at,
-                             ParcelaAtual, QtdParcelas, Titularidade, NomeTitular, TipoCartaoRaw, NumeroCartao,
-                             Cotacao, MoedaEstrangeira, ValorMoedaEstrangeira, Pais, LocalSite)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            transaction.date.isoformat(),
-                            transaction.description,
-                            transaction.amount,
-                            transaction.source.value,
-                            transaction.category.value,
-                            transaction.month_ref,
-                            transaction.id,
-                            json.dumps(transaction.raw_data),
-                            transaction.created_at.isoformat(),
-                            transaction.updated_at.isoformat() if transaction.updated_at else None,
-                            *campos_v2,
-                        ))
-                        saved_count += 1
-                    except Exception as e:
-                        logger.warning(f"⚠️ Erro ao salvar transação individual: {e}")
-                
+
+                if lote is not None:
+                    frame = lote.frame
+                    mes_comps = frame['mes_comp'].astype(object).tolist()
+                    meses = frame['mes_comp'].astype(object).where(frame['mes_comp'] != "", frame['month_ref'].astype(object))
+                    frame['id'] = content_ids(
+                        lote.date_iso(), frame['amount'].tolist(), frame['source'].astype(object).tolist(),
+                        frame['description'].tolist(), meses.tolist(),
+                    )
+                    arquivos = self._registrar_arquivos(cursor, frame['raw_data'].tolist())
+                    rows = self._linhas_lote(lote, arquivos)
+                else:
+                    assign_content_ids(transactions)
+                    arquivos = self._registrar_arquivos(cursor, (t.raw_data for t in transactions))
+
+                    rows = []
+                    mes_comps = []
+                    for transaction in transactions:
+                        try:
+                            rows.append(self._linha_insert(
+                                transaction,
+                                transaction.updated_at.isoformat() if transaction.updated_at else None,
+                                arquivos,
+                            ))
+                            mes_comps.append(transaction.mes_comp)
+                        except Exception as e:
+                            logger.warning(f"⚠️ Erro ao salvar transação individual: {e}")
+
+                # Arquivos reimportados: remove as linhas antigas que nenhum
+                # arquivo do lote emite mais (as demais são atualizadas pelo upsert)
+                if ingested_files:
+                    self._remove_file_rows(cursor, [r.path for r in ingested_files],
+                                           [row[_POS_ID] for row in rows])
+
+                total_rows = len(rows)
+                if should_check_dupes and rows:
+                    duplicate_positions = self._find_duplicates_bulk(cursor, rows, mes_comps)
+                    if duplicate_positions:
+                        rows = [row for pos, row in enumerate(rows) if pos not in duplicate_positions]
+
+                # Linhas novas recebem rowid acima do maior rowid atual
+                ultimo_rowid = cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM lancamentos").fetchone()[0]
+                cursor.executemany(_UPSERT_LANCAMENTO, rows)
+                saved_count = cursor.execute(
+                    "SELECT COUNT(*) FROM lancamentos WHERE rowid > ?", (ultimo_rowid,)
+                ).fetchone()[0]
+                duplicates_count = total_rows - saved_count
+
+                if should_check_dupes:
+                    self.dedup_stats['checked'] += len(transactions)
+                    self.dedup_stats['duplicates_skipped'] += duplicates_count
+
+                if ingested_files:
+                    self._restore_file_categories(cursor)
+                    IngestLedgerRepository.record_files(cursor, ingested_files)
+                    logger.info(f"📒 {len(ingested_files)} arquivos registrados no ledger de ingestão")
+
                 conn.commit()
                 
-                # DEBUG: Mostrar totais de Dezembro 2025 Master DEPOIS da deduplicação
-                if debug_dez_master:
-                    saved_dez_master = [t for t in transactions if t.month_ref == 'Dezembro 2025' and 'Master' in t.source.value]
-                    # Contar quantos foram realmente salvos (não eram duplicatas)
-                    saved_count_dez = saved_count  # Aproximação
-                    logger.info(f"🔍 DEBUG: Dezembro 2025 Master DEPOIS deduplicacao: {saved_count}/{len(transactions)} salvas, {duplicates_count} duplicatas removidas")
-                
                 # Log com estatísticas
                 if duplicates_count > 0:
                     logger.info(
                         f"✅ {saved_count}/{len(transactions)} transações salvas "
-                        f"({duplicates_count} duplicatas ignoradas)"
+                        f"({duplicates_count} já existentes)"
                     )
                 else:
                     logger.info(f"✅ {saved_count}/{len(transactions)} transações salvas")
@@ -322,6 +476,135 @@ class TransactionRepository:
         
         return saved_count
     
+    def _find_duplicates_bulk(self, cursor: sqlite3.Cursor, rows: List[tuple],
+                              mes_comps: List[Optional[str]]) -> set:
+        """
+        Verifica duplicatas de um lote inteiro de uma só vez.
+
+        Carrega o lote numa tabela temporária (na mesma conexão), já com
+        valor/fonte/descrição normalizados, e resolve todas as duplicatas com
+        um único JOIN em idx_lancamentos_dedup. Os critérios são os mesmos de
+        check_duplicate(): valor com tolerância de 0.01 e regra do mês de
+        compensação (se algum lado não tem mês, a descrição basta). Linhas
+        cujo id já existe no banco não entram: o upsert as atualiza.
+
+        Args:
+            cursor: Cursor da conexão usada para salvar o lote
+            rows: Parâmetros de _UPSERT_LANCAMENTO do lote
+            mes_comps: Mês de compensação de cada linha (vazio/None = sem mês)
+
+        Returns:
+            Conjunto com as posições (índices em rows) que são duplicatas
+        """
+        cursor.execute("DROP TABLE IF EXISTS temp.lote_dedup")
+        cursor.execute("""
+            CREATE TEMP TABLE lote_dedup (
+                pos INTEGER PRIMARY KEY,
+                id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                valor REAL NOT NULL,
+                valor_centavos INTEGER NOT NULL,
+                fonte_norm TEXT NOT NULL,
+                descricao_norm TEXT NOT NULL,
+                mes_comp TEXT NOT NULL
+            )
+        """)
+
+        try:
+            # Normalização feita pelo próprio SQLite, com as mesmas expressões
+            # que preenchem as colunas de lancamentos
+            cursor.executemany(
+                "INSERT INTO lote_dedup (pos, id, data, valor, valor_centavos, fonte_norm, descricao_norm, mes_comp) "
+                f"VALUES (?1, ?2, ?3, ?4, {cents_sql('?4')}, {source_norm_sql('?5')}, {description_norm_sql('?6')}, ?7)",
+                (
+                    (pos, row[_POS_ID], row[0], float(row[2]), row[3], row[1], mes_comp or "")
+                    for pos, (row, mes_comp) in enumerate(zip(rows, mes_comps))
+                ),
+            )
+
+            # Centavos vizinhos mantêm o seek no índice; ABS aplica a tolerância
+            cursor.execute("""
+                SELECT DISTINCT b.pos
+                FROM lote_dedup b
+                JOIN lancamentos e
+                  ON e.Data = b.data
+                 AND e.valor_centavos IN (b.valor_centavos - 1, b.valor_centavos, b.valor_centavos + 1)
+                 AND e.fonte_norm = b.fonte_norm
+                 AND e.desc_norm = b.descricao_norm
+                WHERE ABS(e.Valor - b.valor) < 0.01
+                  AND (b.mes_comp = '' OR e.MesComp IS NULL OR e.MesComp = '' OR e.MesComp = b.mes_comp)
+                  AND NOT EXISTS (SELECT 1 FROM lancamentos x WHERE x.id = b.id)
+            """)
+            return {pos for (pos,) in cursor.fetchall()}
+        finally:
+            cursor.execute("DROP TABLE IF EXISTS temp.lote_dedup")
+
+    def _remove_file_rows(self, cursor: sqlite3.Cursor, paths: List[str], keep_ids: Iterable[str]):
+        """
+        Remove as linhas antigas de arquivos reimportados que saíram do lote.
+        
+        Só são apagadas as linhas do arquivo cujo id não está no lote que vai
+        ser gravado: linhas que o arquivo ainda emite (ou que outro arquivo
+        lido nesta execução emite, já que a deduplicação em memória mantém o
+        arquivo_id de quem veio primeiro) ficam e são atualizadas pelo upsert.
+        
+        As categorias das linhas removidas ficam na tabela temporária
+        categorias_reimportacao para _restore_file_categories() reaplicar
+        (categorizações manuais não se perdem na reimportação).
+        
+        Args:
+            cursor: Cursor com transação aberta
+            paths: Caminhos dos arquivos (arquivos_origem.caminho)
+            keep_ids: Ids de conteúdo do lote
+        """
+        cursor.execute("DROP TABLE IF EXISTS temp.ids_reimportacao")
+        cursor.execute("CREATE TEMP TABLE ids_reimportacao (id TEXT PRIMARY KEY) WITHOUT ROWID")
+        cursor.executemany("INSERT OR IGNORE INTO ids_reimportacao VALUES (?)", ((i,) for i in keep_ids))
+        
+        cursor.execute("DROP TABLE IF EXISTS temp.categorias_reimportacao")
+        cursor.execute("""
+            CREATE TEMP TABLE categorias_reimportacao (
+                arquivo INTEGER, data TEXT, descricao TEXT, valor REAL, categoria TEXT
+            )
+        """)
+        linhas_saindo = """
+            arquivo_id = (SELECT id FROM arquivos_origem WHERE caminho = ?)
+            AND id NOT IN (SELECT id FROM temp.ids_reimportacao)
+        """
+        cursor.executemany(f"""
+            INSERT INTO categorias_reimportacao
+            SELECT arquivo_id, Data, Descricao, Valor, Categoria
+            FROM lancamentos
+            WHERE {linhas_saindo} AND Categoria != ?
+        """, [(path, TransactionCategory.A_DEFINIR.value) for path in paths])
+        cursor.executemany(f"DELETE FROM lancamentos WHERE {linhas_saindo}", [(p,) for p in paths])
+        cursor.execute("DROP TABLE IF EXISTS temp.ids_reimportacao")
+        logger.info(f"🔄 {len(paths)} arquivos alterados: linhas que saíram deles serão removidas")
+    
+    def _restore_file_categories(self, cursor: sqlite3.Cursor):
+        """Reaplica categorias das linhas reimportadas que voltaram como 'A definir'."""
+        cursor.execute("""
+            UPDATE lancamentos
+            SET Categoria = (
+                SELECT c.categoria FROM categorias_reimportacao c
+                WHERE c.arquivo = lancamentos.arquivo_id
+                  AND c.data = lancamentos.Data
+                  AND c.descricao = lancamentos.Descricao
+                  AND ABS(c.valor - lancamentos.Valor) < 0.01
+                LIMIT 1
+            )
+            WHERE Categoria = ?
+              AND arquivo_id IN (SELECT arquivo FROM categorias_reimportacao)
+              AND EXISTS (
+                SELECT 1 FROM categorias_reimportacao c
+                WHERE c.arquivo = lancamentos.arquivo_id
+                  AND c.data = lancamentos.Data
+                  AND c.descricao = lancamentos.Descricao
+                  AND ABS(c.valor - lancamentos.Valor) < 0.01
+              )
+        """, (TransactionCategory.A_DEFINIR.value,))
+        cursor.execute("DROP TABLE IF EXISTS temp.categorias_reimportacao")
+    
     def get_transaction_by_id(self, transaction_id: str) -> Optional[Transaction]:
         """
         Busca transação por ID.
@@ -333,12 +616,9 @@ class TransactionRepository:
             Transação encontrada ou None
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT id, date, description, amount, source, category, month_ref, raw_data, created_at, updated_at
-                    FROM lancamentos WHERE id = ?
-                """, (transaction_id,))
+                cursor.execute(_SELECT_TRANSACAO + " WHERE l.id = ?", (transaction_id,))
                 
                 row = cursor.fetchone()
                 if row:
@@ -361,13 +641,11 @@ class TransactionRepository:
         """
         transactions = []
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT id, Data, Descricao, Valor, Fonte, Categoria, MesComp, raw_data, created_at, updated_at
-                    FROM lancamentos 
-                    WHERE Data BETWEEN ? AND ?
-                    ORDER BY Data DESC, created_at DESC
+                cursor.execute(_SELECT_TRANSACAO + """
+                    WHERE l.Data BETWEEN ? AND ?
+                    ORDER BY l.Data DESC, l.created_at DESC
                 """, (start_date.isoformat(), end_date.isoformat()))
                 
                 for row in cursor.fetchall():
@@ -391,13 +669,11 @@ class TransactionRepository:
         """
         transactions = []
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT id, date, description, amount, source, category, month_ref, raw_data, created_at, updated_at
-                    FROM lancamentos 
-                    WHERE category = ?
-                    ORDER BY date DESC
+                cursor.execute(_SELECT_TRANSACAO + """
+                    WHERE l.Categoria = ?
+                    ORDER BY l.Data DESC
                 """, (category.value,))
                 
                 for row in cursor.fetchall():
@@ -406,9 +682,47 @@ class TransactionRepository:
                         transactions.append(transaction)
         except Exception as e:
             logger.error(f"❌ Erro ao buscar transações por categoria: {e}")
-        
+
         return transactions
-    
+
+    def search_transactions(self, termo: str, limit: Optional[int] = 100,
+                            prefix: bool = False) -> List[Transaction]:
+        """
+        Busca transações pela descrição (índice lancamentos_fts).
+
+        Args:
+            termo: Trecho da descrição (sem diferenciar maiúsculas)
+            limit: Máximo de transações (None = todas)
+            prefix: Só descrições que começam com o termo
+
+        Returns:
+            Lista de transações encontradas, mais recentes primeiro
+        """
+        if not termo or not termo.strip():
+            return []
+
+        condicao, params = search_condition(termo, prefix=prefix, column='l.Descricao',
+                                            rowid='l.rowid', use_index=self.search_enabled)
+        query = _SELECT_TRANSACAO + f" WHERE {condicao} ORDER BY l.Data DESC, l.rowid DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        transactions = []
+        try:
+            with get_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+
+                for row in cursor.fetchall():
+                    transaction = self._row_to_transaction(row)
+                    if transaction:
+                        transactions.append(transaction)
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar transações por descrição: {e}")
+
+        return transactions
+
     def update_transaction_category(self, transaction_id: str, new_category: TransactionCategory) -> bool:
         """
         Atualiza categoria de uma transação.
@@ -421,7 +735,7 @@ class TransactionRepository:
             True se atualizou com sucesso
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     UPDATE lancamentos 
@@ -445,7 +759,7 @@ class TransactionRepository:
             True se removeu com sucesso
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM lancamentos WHERE id = ?", (transaction_id,))
                 conn.commit()
@@ -463,7 +777,7 @@ class TransactionRepository:
         """
         summary = {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT month_ref, 
@@ -517,7 +831,7 @@ class TransactionRepository:
         }
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Total de transações
@@ -560,6 +874,9 @@ class TransactionRepository:
         """
         Converte linha do banco para objeto Transaction.
         
+        Linhas do banco já foram validadas ao gravar: a transação é criada
+        por Transaction.from_trusted, sem __post_init__.
+        
         Args:
             row: Linha do resultado da query
             
@@ -567,19 +884,21 @@ class TransactionRepository:
             Objeto Transaction ou None se erro
         """
         try:
-            id_val, date_str, description, amount, source_str, category_str, month_ref, raw_data_str, created_at_str, updated_at_str = row
+            (id_val, date_str, description, amount, source_str, category_str, month_ref,
+             raw_data_val, created_at_str, updated_at_str, caminho, banco) = row
             
-            return Transaction(
-                id=id_val,
-                date=datetime.fromisoformat(date_str).date(),
-                description=description,
-                amount=amount,
-                source=TransactionSource(source_str),
-                category=TransactionCategory(category_str),
-                month_ref=month_ref,
-                raw_data=json.loads(raw_data_str) if raw_data_str else {},
-                created_at=datetime.fromisoformat(created_at_str),
-                updated_at=datetime.fromisoformat(updated_at_str) if updated_at_str else None
+            return Transaction.from_trusted(
+                id_val,
+                datetime.fromisoformat(date_str).date(),
+                description,
+                amount,
+                _FONTES.get(source_str) or TransactionSource(source_str),
+                _CATEGORIAS.get(category_str) or TransactionCategory(category_str),
+                month_ref,
+                "",
+                LazyRawData(decode_raw_data, raw_data_val, description, caminho, banco),
+                datetime.fromisoformat(created_at_str),
+                datetime.fromisoformat(updated_at_str) if updated_at_str else None
             )
         except Exception as e:
             logger.warning(f"⚠️ Erro ao converter linha do banco: {e}")
@@ -6,7 +6,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
-import requests
+from integrations.pluggy_auth import get_pluggy_fetcher
 from datetime import datetime, timedelta
 import pandas as pd
 from models import TransactionSource, TransactionCategory, Transaction, get_card_source
@@ -32,18 +32,12 @@ print(f"Ciclo: 19-18 (Novembro 2025)")
 
 # 1. Autenticar
 print("\n🔐 Autenticando...")
-auth_response = requests.post(f'{BASE_URL}/auth', json={
-    'clientId': CLIENT_ID,
-    'clientSecret': CLIENT_SECRET
-})
-api_key = auth_response.json()['apiKey']
-headers = {'X-API-KEY': api_key}
+fetcher = get_pluggy_fetcher(CLIENT_ID, CLIENT_SECRET, BASE_URL)
 print("✅ Autenticado")
 
 # 2. Buscar contas
 print("\n🏦 Buscando contas...")
-accounts_response = requests.get(f'{BASE_URL}/accounts?itemId={ITEM_ID}', headers=headers)
-accounts = accounts_response.json().get('results', [])
+accounts = fetcher.buscar_contas(ITEM_ID)
 print(f"✅ {len(accounts)} conta(s) encontrada(s)")
 
 # 3. Buscar transações de todas as contas
@@ -70,8 +64,7 @@ for acc in accounts:
             'pageSize': 500
         }
         
-        trans_response = requests.get(f'{BASE_URL}/transactions', headers=headers, params=params)
-        trans_data = trans_response.json()
+        trans_data = fetcher.request('GET', '/transactions', params=params)
         transactions = trans_data.get('results', [])
         
         if not transactions:
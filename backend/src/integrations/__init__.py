@@ -3,10 +3,17 @@ Módulo de integrações externas
 Integração com APIs de Open Finance (Pluggy)
 """
 
-from .pluggy_client import PluggyClient
+from .pluggy_client import PluggyClient, get_pluggy_client
 from .pluggy_sync import PluggySyncService
+from .pluggy_fetch import PluggyFetcher
+from .pluggy_auth import PluggyTokenCache, get_pluggy_fetcher, close_pluggy_fetchers
 
 __all__ = [
     'PluggyClient',
-    'PluggySyncService'
+    'get_pluggy_client',
+    'PluggySyncService',
+    'PluggyFetcher',
+    'PluggyTokenCache',
+    'get_pluggy_fetcher',
+    'close_pluggy_fetchers'
 ]
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Cache da apiKey do Pluggy e clientes compartilhados
+===================================================
+
+A apiKey devolvida por /auth vale 2 horas. PluggyTokenCache guarda a chave
+em memória (e, se pedido, num arquivo JSON com permissão 0600) junto com a
+validade, para que execuções seguidas e sincronizações de vários Items não
+autentiquem de novo a cada cliente criado.
+
+get_pluggy_fetcher() devolve sempre o mesmo PluggyFetcher para a mesma
+URL/credencial: a sessão HTTP (conexões keep-alive) é reaproveitada entre
+quem chama, e a autenticação só acontece quando não há chave válida.
+
+Por padrão o cache do processo fica só em memória; gravar a chave em
+disco é opcional: PLUGGY_TOKEN_CACHE com o caminho do arquivo (ex.:
+~/.cache/financeiro/pluggy_token.json).
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .pluggy_fetch import PluggyFetcher, BASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Validade da apiKey do Pluggy e folga para renovar antes de expirar
+TOKEN_VALIDADE = timedelta(hours=2)
+MARGEM_RENOVACAO = timedelta(minutes=10)
+
+# Caminho do arquivo de cache (sem a variável, só em memória)
+TOKEN_CACHE_ENV = 'PLUGGY_TOKEN_CACHE'
+
+
+class PluggyTokenCache:
+    """Cache de apiKeys do Pluggy por URL e credencial, com validade."""
+
+    def __init__(self, cache_path: Optional[Path] = None,
+                 validade: timedelta = TOKEN_VALIDADE, margem: timedelta = MARGEM_RENOVACAO):
+        """
+        Args:
+            cache_path: Arquivo JSON para guardar as chaves entre execuções
+                (None = só em memória)
+            validade: Tempo de vida de uma apiKey a partir da emissão
+            margem: Chaves que expiram dentro desse tempo já são renovadas
+        """
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.validade = validade
+        self.margem = margem
+        self._tokens: Dict[str, Tuple[str, datetime]] = {}
+        self._lock = threading.Lock()
+        self._carregar()
+
+    @staticmethod
+    def chave(base_url: str, client_id: str, client_secret: str) -> str:
+        """Chave do cache (hash: o arquivo não guarda a credencial)."""
+        texto = f"{base_url.rstrip('/')}|{client_id}|{client_secret}"
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def get(self, base_url: str, client_id: str, client_secret: str) -> Optional[str]:
+        """apiKey ainda válida para a credencial (None se não houver)."""
+        with self._lock:
+            registro = self._tokens.get(self.chave(base_url, client_id, client_secret))
+        if registro is None:
+            return None
+        api_key, expira_em = registro
+        if datetime.now() >= expira_em - self.margem:
+            return None
+        return api_key
+
+    def set(self, base_url: str, client_id: str, client_secret: str, api_key: str,
+            emitido_em: Optional[datetime] = None):
+        """Guarda uma apiKey recém obtida em /auth."""
+        expira_em = (emitido_em or datetime.now()) + self.validade
+        with self._lock:
+            self._tokens[self.chave(base_url, client_id, client_secret)] = (api_key, expira_em)
+            self._gravar()
+
+    def invalidate(self, base_url: str, client_id: str, client_secret: str):
+        """Descarta a apiKey da credencial (ex.: recusada com 401)."""
+        with self._lock:
+            if self._tokens.pop(self.chave(base_url, client_id, client_secret), None) is not None:
+                self._gravar()
+
+    # Arquivo --------------------------------------------------------------
+
+    def _carregar(self):
+        """Lê as chaves ainda válidas do arquivo (arquivo ausente ou inválido é ignorado)."""
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            dados = json.loads(self.cache_path.read_text(encoding='utf-8'))
+            agora = datetime.now()
+            for chave, registro in dados.items():
+                expira_em = datetime.fromisoformat(registro['expira_em'])
+                if expira_em > agora:
+                    self._tokens[chave] = (registro['api_key'], expira_em)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"⚠️ Cache de token do Pluggy ignorado ({self.cache_path}): {e}")
+
+    def _gravar(self):
+        """Grava as chaves válidas no arquivo (escrita atômica, diretório 0700, arquivo 0600)."""
+        if not self.cache_path:
+            return
+        agora = datetime.now()
+        dados = {
+            chave: {'api_key': api_key, 'expira_em': expira_em.isoformat(timespec='seconds')}
+            for chave, (api_key, expira_em) in self._tokens.items()
+            if expira_em > agora
+        }
+        try:
+            self.cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            temporario = self.cache_path.with_name(self.cache_path.name + '.tmp')
+            # Temporário de uma gravação interrompida pode ter outra permissão
+            temporario.unlink(missing_ok=True)
+            fd = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            if hasattr(os, 'fchmod'):
+                os.fchmod(fd, 0o600)  # independente do umask
+            with os.fdopen(fd, 'w', encoding='utf-8') as arquivo:
+                json.dump(dados, arquivo)
+            os.replace(temporario, self.cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Não foi possível gravar o cache de token do Pluggy: {e}")
+
+
+_cache_padrao: Optional[PluggyTokenCache] = None
+_fetchers: Dict[Tuple[str, str, int], PluggyFetcher] = {}
+_registro_lock = threading.Lock()
+
+
+def default_token_cache() -> PluggyTokenCache:
+    """
+    Cache compartilhado do processo.
+
+    Só em memória, a não ser que PLUGGY_TOKEN_CACHE indique o arquivo onde
+    guardar as chaves entre execuções.
+    """
+    global _cache_padrao
+    with _registro_lock:
+        if _cache_padrao is None:
+            caminho = (os.environ.get(TOKEN_CACHE_ENV) or '').strip()
+            _cache_padrao = PluggyTokenCache(Path(caminho).expanduser() if caminho else None)
+        return _cache_padrao
+
+
+def get_pluggy_fetcher(client_id: str, client_secret: str, base_url: str = BASE_URL,
+                       max_workers: int = 4, cache: Optional[PluggyTokenCache] = None,
+                       **kwargs) -> PluggyFetcher:
+    """
+    PluggyFetcher compartilhado e já autenticado.
+
+    Chamadas com a mesma URL, client_id e max_workers recebem a mesma
+    instância (mesma sessão HTTP). A apiKey vem do cache enquanto for
+    válida; /auth só é chamado quando ela falta ou expirou.
+
+    Args:
+        client_id, client_secret: Credenciais do Pluggy
+        base_url: URL da API
+        max_workers: Requisições simultâneas (tamanho do pool de conexões)
+        cache: Cache de tokens (padrão: default_token_cache())
+        **kwargs: Demais argumentos do PluggyFetcher (na primeira criação)
+    """
+    cache = cache or default_token_cache()
+    chave = (base_url.rstrip('/'), client_id, max_workers)
+    with _registro_lock:
+        fetcher = _fetchers.get(chave)
+        if fetcher is None:
+            fetcher = PluggyFetcher(base_url, max_workers=max_workers, **kwargs)
+            _fetchers[chave] = fetcher
+    fetcher.autenticar(client_id, client_secret, cache=cache)
+    return fetcher
+
+
+def close_pluggy_fetchers():
+    """Fecha as sessões de todos os fetchers compartilhados."""
+    with _registro_lock:
+        fetchers = list(_fetchers.values())
+        _fetchers.clear()
+    for fetcher in fetchers:
+        fetcher.close()
@@ -5,10 +5,14 @@ Fornece acesso aos dados do Open Finance via Pluggy
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from .pluggy_auth import PluggyTokenCache, default_token_cache
+from .pluggy_fetch import BASE_URL
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -21,15 +25,24 @@ except ImportError:
 
 
 class PluggyClient:
-    """Cliente para integração com a API Pluggy."""
+    """
+    Cliente para integração com a API Pluggy.
+    
+    Toda chamada passa por _chamar(): a apiKey é conferida no cache antes
+    (renovada quando está perto de expirar) e, se a API responder 401, o
+    cliente autentica de novo e repete a chamada uma vez.
+    """
     
-    def __init__(self, client_id: str, client_secret: str):
+    def __init__(self, client_id: str, client_secret: str,
+                 token_cache: Optional[PluggyTokenCache] = None):
         """
         Inicializa o cliente Pluggy.
         
         Args:
             client_id: Client ID fornecido pelo Pluggy
             client_secret: Client Secret fornecido pelo Pluggy
+            token_cache: Cache da apiKey (padrão: default_token_cache());
+                com uma chave válida no cache, não chama /auth
         """
         if not PLUGGY_AVAILABLE:
             raise ImportError(
@@ -39,23 +52,15 @@ class PluggyClient:
         
         self.client_id = client_id
         self.client_secret = client_secret
+        self.token_cache = token_cache or default_token_cache()
         
         try:
             # Configura API client
-            configuration = Configuration()
-            self.api_client = ApiClient(configuration)
-            
-            # Autentica e obtém access token
-            auth_api = AuthApi(self.api_client)
-            auth_request = pluggy_sdk.AuthRequest(
-                client_id=client_id,
-                client_secret=client_secret
-            )
-            auth_response = auth_api.auth_create(auth_request)
-            self.access_token = auth_response.api_key
+            self.configuration = Configuration()
+            self.api_client = ApiClient(self.configuration)
             
-            # Atualiza configuração com o token
-            configuration.api_key['X-API-KEY'] = self.access_token
+            # Autentica (ou reaproveita a apiKey do cache)
+            self.autenticar()
             
             # Inicializa APIs
             self.items_api = ItemsApi(self.api_client)
@@ -67,6 +72,53 @@ class PluggyClient:
             logger.error(f"❌ Erro ao inicializar cliente Pluggy: {e}")
             raise
     
+    def autenticar(self, forcar: bool = False) -> str:
+        """
+        Garante uma apiKey válida na configuração do cliente.
+        
+        Args:
+            forcar: Ignora o cache e chama /auth
+            
+        Returns:
+            apiKey em uso
+        """
+        host = getattr(self.configuration, 'host', BASE_URL)
+        if forcar:
+            self.token_cache.invalidate(host, self.client_id, self.client_secret)
+        
+        access_token = self.token_cache.get(host, self.client_id, self.client_secret)
+        if not access_token:
+            auth_api = AuthApi(self.api_client)
+            auth_request = pluggy_sdk.AuthRequest(
+                client_id=self.client_id,
+                client_secret=self.client_secret
+            )
+            auth_response = auth_api.auth_create(auth_request)
+            access_token = auth_response.api_key
+            self.token_cache.set(host, self.client_id, self.client_secret, access_token)
+            logger.debug("🔐 Nova apiKey obtida do Pluggy")
+        
+        self.access_token = access_token
+        self.configuration.api_key['X-API-KEY'] = access_token
+        return access_token
+    
+    def _chamar(self, funcao: Callable, *args, **kwargs):
+        """
+        Chama um método do SDK com apiKey válida.
+        
+        Com 401 (apiKey expirada ou revogada), descarta a chave do cache,
+        autentica de novo e repete a chamada uma vez.
+        """
+        self.autenticar()
+        try:
+            return funcao(*args, **kwargs)
+        except Exception as e:
+            if getattr(e, 'status', None) != 401:
+                raise
+            logger.warning("⚠️ apiKey recusada pelo Pluggy (401), autenticando de novo")
+            self.autenticar(forcar=True)
+            return funcao(*args, **kwargs)
+    
     def get_items(self) -> List[Dict[str, Any]]:
         """
         Retorna lista de items (conexões bancárias) conectadas.
@@ -80,7 +132,7 @@ class PluggyClient:
         try:
             # A API não lista items diretamente, então vamos buscar contas
             # e extrair os item_ids únicos
-            response = self.account_api.accounts_list()
+            response = self._chamar(self.account_api.accounts_list)
             accounts = response.results if hasattr(response, 'results') else []
             
             # Extrai item_ids únicos
@@ -109,7 +161,7 @@ class PluggyClient:
             Lista de contas (checking, savings, credit card)
         """
         try:
-            response = self.account_api.accounts_list(item_id=item_id)
+            response = self._chamar(self.account_api.accounts_list, item_id=item_id)
             accounts = response.results if hasattr(response, 'results') else []
             logger.info(f"💳 {len(accounts)} conta(s) encontrada(s)")
             return [acc.to_dict() if hasattr(acc, 'to_dict') else acc for acc in accounts]
@@ -143,7 +195,8 @@ class PluggyClient:
             to_date = datetime.now()
         
         try:
-            response = self.transaction_api.transactions_list(
+            response = self._chamar(
+                self.transaction_api.transactions_list,
                 account_id=account_id,
                 _from=from_date.strftime('%Y-%m-%d'),
                 to=to_date.strftime('%Y-%m-%d'),
@@ -232,3 +285,23 @@ class PluggyClient:
         except Exception as e:
             logger.error(f"❌ Falha na conexão: {e}")
             return False
+
+
+_clientes: Dict[tuple, PluggyClient] = {}
+_clientes_lock = threading.Lock()
+
+
+def get_pluggy_client(client_id: str, client_secret: str,
+                      token_cache: Optional[PluggyTokenCache] = None) -> PluggyClient:
+    """
+    PluggyClient compartilhado para a credencial.
+    
+    Reaproveita o mesmo ApiClient (pool de conexões) entre quem chama; a
+    apiKey é conferida a cada chamada e renovada quando expira ou recebe 401.
+    """
+    with _clientes_lock:
+        client = _clientes.get((client_id, client_secret))
+        if client is None:
+            client = PluggyClient(client_id, client_secret, token_cache=token_cache)
+            _clientes[(client_id, client_secret)] = client
+    return client
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Busca concorrente na API REST do Pluggy
+=======================================
+
+PluggyFetcher usa uma única requests.Session (pool de conexões keep-alive)
+e um ThreadPoolExecutor limitado para buscar contas e páginas de
+/transactions em paralelo:
+
+- a primeira página de cada conta informa totalPages; as demais páginas
+  são pedidas em paralelo assim que ela chega;
+- 429 e 5xx (e falhas de conexão) são repetidos com backoff exponencial,
+  respeitando Retry-After; um 429 pausa todas as threads, não só a que o
+  recebeu;
+- iterar_transacoes() entrega cada página assim que chega (fora de ordem),
+  para quem grava no banco ir processando enquanto as outras são baixadas.
+"""
+
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+BASE_URL = 'https://api.pluggy.ai'
+
+# Respostas que valem nova tentativa (limite de requisições e falhas do servidor)
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+
+
+class PluggyFetcher:
+    """Cliente HTTP do Pluggy com conexões reutilizadas e busca paralela."""
+
+    def __init__(self, base_url: str = BASE_URL, api_key: Optional[str] = None,
+                 max_workers: int = 4, page_size: int = 500, max_tentativas: int = 5,
+                 backoff_inicial: float = 0.5, timeout: float = 30.0):
+        """
+        Inicializa o cliente.
+
+        Args:
+            base_url: URL da API (ex.: servidor de teste local)
+            api_key: Chave já obtida em /auth (opcional)
+            max_workers: Requisições simultâneas (também o tamanho do pool de conexões)
+            page_size: Transações por página
+            max_tentativas: Tentativas por requisição em 429/5xx/falha de conexão
+            backoff_inicial: Espera da primeira repetição (segundos, dobra a cada vez)
+            timeout: Timeout de cada requisição (segundos)
+        """
+        if not REQUESTS_AVAILABLE:
+            raise ImportError("requests não está instalado. Execute: pip install requests")
+
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max(1, max_workers)
+        self.page_size = page_size
+        self.max_tentativas = max(1, max_tentativas)
+        self.backoff_inicial = backoff_inicial
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if api_key:
+            self.session.headers['X-API-KEY'] = api_key
+
+        self.stats = {'requisicoes': 0, 'repeticoes': 0, 'autenticacoes': 0}
+        self._lock = threading.Lock()
+        self._auth_lock = threading.Lock()
+        self._credenciais = None  # (client_id, client_secret, cache) de autenticar()
+        self._pausa_ate = 0.0  # time.monotonic() até quando ninguém deve requisitar
+
+    def __enter__(self) -> 'PluggyFetcher':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Fecha as conexões do pool."""
+        self.session.close()
+
+    # Requisições ----------------------------------------------------------
+
+    def autenticar(self, client_id: str, client_secret: str, cache=None) -> str:
+        """
+        Obtém a apiKey em /auth e passa a enviá-la em todas as requisições.
+
+        Com cache (PluggyTokenCache), uma chave ainda válida é reutilizada
+        sem ir a /auth, e a chave nova é guardada nele. As credenciais ficam
+        guardadas para autenticar de novo se a API recusar a chave (401).
+
+        Returns:
+            apiKey
+        """
+        self._credenciais = (client_id, client_secret, cache)
+        if cache is not None:
+            api_key = cache.get(self.base_url, client_id, client_secret)
+            if api_key:
+                self.session.headers['X-API-KEY'] = api_key
+                return api_key
+
+        dados = self.request('POST', '/auth', json={'clientId': client_id, 'clientSecret': client_secret})
+        api_key = dados['apiKey']
+        self.session.headers['X-API-KEY'] = api_key
+        with self._lock:
+            self.stats['autenticacoes'] += 1
+        if cache is not None:
+            cache.set(self.base_url, client_id, client_secret, api_key)
+        return api_key
+
+    def _reautenticar(self, api_key_recusada: Optional[str]):
+        """Troca a apiKey recusada (uma thread autentica, as outras reaproveitam)."""
+        client_id, client_secret, cache = self._credenciais
+        with self._auth_lock:
+            if self.session.headers.get('X-API-KEY') != api_key_recusada:
+                return
+            logger.info("🔐 apiKey do Pluggy recusada, autenticando de novo")
+            if cache is not None:
+                cache.invalidate(self.base_url, client_id, client_secret)
+            self.autenticar(client_id, client_secret, cache=cache)
+
+    def request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """
+        Executa uma requisição com repetição em 429/5xx.
+
+        Um 401 (apiKey expirada) faz uma nova autenticação e repete a
+        requisição uma vez, se autenticar() já foi chamado.
+
+        Raises:
+            requests.HTTPError: Erro HTTP definitivo (ou tentativas esgotadas)
+            requests.RequestException: Falha de conexão após todas as tentativas
+        """
+        url = f"{self.base_url}{path}"
+        reautenticado = False
+        tentativa = 0
+        while True:
+            self._aguardar_pausa()
+            with self._lock:
+                self.stats['requisicoes'] += 1
+            ultima = tentativa == self.max_tentativas - 1
+
+            api_key = self.session.headers.get('X-API-KEY')
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if ultima:
+                    raise
+                self._repetir(tentativa, None, path)
+                tentativa += 1
+                continue
+
+            if response.status_code in STATUS_REPETIR and not ultima:
+                self._repetir(tentativa, response, path)
+                tentativa += 1
+                continue
+
+            # apiKey expirada: autentica de novo uma vez (não conta como tentativa)
+            if (response.status_code == 401 and path != '/auth'
+                    and self._credenciais and not reautenticado):
+                response.close()
+                self._reautenticar(api_key)
+                reautenticado = True
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+    def _aguardar_pausa(self):
+        """Espera a pausa global pedida por um 429."""
+        espera = self._pausa_ate - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+
+    def _repetir(self, tentativa: int, response, path: str):
+        """Calcula a espera da próxima tentativa (Retry-After ou backoff com jitter)."""
+        espera = self.backoff_inicial * (2 ** tentativa) * (0.5 + random.random())
+        status = response.status_code if response is not None else 'conexão'
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    espera = float(retry_after)
+                except ValueError:
+                    pass
+            response.close()
+
+        with self._lock:
+            self.stats['repeticoes'] += 1
+            if status == 429:
+                self._pausa_ate = max(self._pausa_ate, time.monotonic() + espera)
+        logger.warning(f"⚠️ Pluggy {path}: {status}, nova tentativa em {espera:.1f}s")
+        time.sleep(espera)
+
+    # Endpoints ------------------------------------------------------------
+
+    def buscar_contas(self, item_id: str) -> List[Dict[str, Any]]:
+        """Contas de um Item."""
+        return self.request('GET', '/accounts', params={'itemId': item_id}).get('results', [])
+
+    def buscar_pagina(self, account_id: str, date_from: datetime, date_to: datetime,
+                      page: int = 1) -> Dict[str, Any]:
+        """Uma página de /transactions (resposta completa, com totalPages)."""
+        return self.request('GET', '/transactions', params={
+            'accountId': account_id,
+            'from': date_from.strftime('%Y-%m-%d'),
+            'to': date_to.strftime('%Y-%m-%d'),
+            'page': page,
+            'pageSize': self.page_size,
+        })
+
+    def buscar_transacoes(self, account_id: str, date_from: datetime,
+                          date_to: datetime) -> List[Dict[str, Any]]:
+        """Todas as transações de uma conta (páginas em paralelo)."""
+        transacoes = []
+        for _, pagina in self.iterar_transacoes([{'id': account_id}], date_from, date_to):
+            transacoes.extend(pagina)
+        return transacoes
+
+    def iterar_transacoes(self, contas: Iterable[Dict[str, Any]], date_from: datetime, date_to: datetime,
+                          inicio_por_conta: Optional[Dict[str, datetime]] = None
+                          ) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Busca as transações de várias contas em paralelo.
+
+        Args:
+            contas: Contas (dicionários com 'id')
+            date_from, date_to: Período
+            inicio_por_conta: Data inicial própria de algumas contas (account_id -> data)
+
+        Yields:
+            (conta, transações da página) conforme as páginas chegam; páginas
+            vazias não são entregues
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pluggy')
+        pendentes = {}
+        inicio_por_conta = inicio_por_conta or {}
+
+        def pedir(conta, page):
+            inicio = inicio_por_conta.get(conta['id'], date_from)
+            futuro = executor.submit(self.buscar_pagina, conta['id'], inicio, date_to, page)
+            pendentes[futuro] = (conta, page)
+
+        try:
+            for conta in contas:
+                pedir(conta, 1)
+
+            while pendentes:
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    conta, page = pendentes.pop(futuro)
+                    dados = futuro.result()
+                    resultados = dados.get('results') or []
+
+                    total_paginas = dados.get('totalPages')
+                    if page == 1 and total_paginas:
+                        for proxima in range(2, int(total_paginas) + 1):
+                            pedir(conta, proxima)
+                    elif not total_paginas and len(resultados) >= self.page_size:
+                        # Sem totalPages: segue página a página até uma incompleta
+                        pedir(conta, page + 1)
+
+                    if resultados:
+                        yield conta, resultados
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
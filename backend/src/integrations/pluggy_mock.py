@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Servidor Pluggy de teste (local, sem rede)
+==========================================
+
+Imita os endpoints usados pela sincronização (/auth, /accounts,
+/transactions, /items/{id} e /items/{id}/refresh) com dados gerados de
+forma determinística, latência configurável, 429 simulado e apiKeys que
+podem ser expiradas (401). Serve para
+testes e para medir a vazão da sincronização sem acessar a API real.
+
+Uso:
+    python -m integrations.pluggy_mock --porta 8765 --latencia 0.05
+    PLUGGY_BASE_URL=http://127.0.0.1:8765 python sync_openfinance.py
+"""
+
+import json
+import random
+import argparse
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+# Contas de cada Item: (nome, tipo, final do cartão)
+CONTAS_PADRAO = [
+    ('PERSON BLACK', 'CREDIT', '4059'),
+    ('LATAM PASS VISA', 'CREDIT', '1152'),
+    ('itau conta corrente', 'BANK', None),
+]
+
+_DESCRICOES = ['UBER TRIP', 'IFOOD *RESTAURANTE', 'SUPERMERCADO EXTRA', 'POSTO SHELL',
+               'DROGASIL', 'NETFLIX.COM', 'PIX ENVIADO', 'AMAZON MKTPLACE', 'PADARIA REAL']
+
+
+class PluggyMockServer:
+    """Servidor HTTP local que responde como a API Pluggy."""
+
+    def __init__(self, host: str = '127.0.0.1', porta: int = 0, transacoes_por_conta: int = 1000,
+                 dias: int = 365, latencia: float = 0.0, limite_a_cada: int = 0,
+                 contas: Optional[List[tuple]] = None, hoje: Optional[date] = None):
+        """
+        Args:
+            host, porta: Endereço (porta 0 = escolhida pelo sistema)
+            transacoes_por_conta: Transações geradas por conta
+            dias: Período coberto pelas transações (até hoje)
+            latencia: Atraso de cada resposta (segundos)
+            limite_a_cada: Responde 429 a cada N requisições (0 = nunca)
+            contas: Contas de cada Item (padrão: CONTAS_PADRAO)
+            hoje: Data mais recente das transações
+        """
+        self.transacoes_por_conta = transacoes_por_conta
+        self.dias = dias
+        self.latencia = latencia
+        self.limite_a_cada = limite_a_cada
+        self.contas_modelo = contas or CONTAS_PADRAO
+        self.hoje = hoje or date.today()
+
+        self.stats = {'requisicoes': 0, 'conexoes': 0, 'limitadas': 0, 'simultaneas_max': 0,
+                      'autenticacoes': 0}
+        self._simultaneas = 0
+        self._chaves_emitidas: List[str] = []
+        self._chaves_expiradas = set()
+        self._lock = threading.Lock()
+        self._transacoes: Dict[str, List[Dict[str, Any]]] = {}
+
+        self.server = ThreadingHTTPServer((host, porta), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, porta = self.server.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def start(self) -> 'PluggyMockServer':
+        """Sobe o servidor numa thread em segundo plano."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'PluggyMockServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Dados ----------------------------------------------------------------
+
+    def expirar_chaves(self):
+        """Passa a recusar (401) todas as apiKeys já emitidas."""
+        with self._lock:
+            self._chaves_expiradas.update(self._chaves_emitidas)
+
+    def contas(self, item_id: str) -> List[Dict[str, Any]]:
+        """Contas de um Item (ids derivados do item)."""
+        return [
+            {'id': f"{item_id}-acc{i}", 'itemId': item_id, 'name': nome, 'type': tipo,
+             'subtype': 'CREDIT_CARD' if tipo == 'CREDIT' else 'CHECKING_ACCOUNT', 'number': final}
+            for i, (nome, tipo, final) in enumerate(self.contas_modelo)
+        ]
+
+    def transacoes(self, account_id: str) -> List[Dict[str, Any]]:
+        """Transações da conta, mais recentes primeiro (geradas uma vez)."""
+        with self._lock:
+            if account_id not in self._transacoes:
+                self._transacoes[account_id] = self._gerar(account_id)
+            return self._transacoes[account_id]
+
+    def _gerar(self, account_id: str) -> List[Dict[str, Any]]:
+        rng = random.Random(account_id)
+        indice = int(account_id.rsplit('acc', 1)[-1]) if 'acc' in account_id else 0
+        _, tipo, final = self.contas_modelo[indice % len(self.contas_modelo)]
+        transacoes = []
+        for n in range(self.transacoes_por_conta):
+            dia = self.hoje - timedelta(days=rng.randrange(self.dias))
+            transacao = {
+                'id': f"{account_id}-tx{n}",
+                'accountId': account_id,
+                'date': f"{dia.isoformat()}T12:00:00.000Z",
+                'description': f"{rng.choice(_DESCRICOES)} {rng.randint(1, 999)}",
+                'amount': round(rng.uniform(-500, -1), 2),
+                'currencyCode': 'BRL',
+                'category': 'Shopping',
+                'type': 'DEBIT',
+            }
+            if tipo == 'CREDIT':
+                transacao['creditCardMetadata'] = {'cardNumber': f"****{final}"}
+            transacoes.append(transacao)
+        transacoes.sort(key=lambda t: t['date'], reverse=True)
+        return transacoes
+
+    # HTTP -----------------------------------------------------------------
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def setup(self):
+                super().setup()
+                with mock._lock:
+                    mock.stats['conexoes'] += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                mock._responder(self, 'GET')
+
+            def do_POST(self):
+                tamanho = int(self.headers.get('Content-Length') or 0)
+                if tamanho:
+                    self.rfile.read(tamanho)
+                mock._responder(self, 'POST')
+
+        return Handler
+
+    def _responder(self, handler: BaseHTTPRequestHandler, metodo: str):
+        with self._lock:
+            self.stats['requisicoes'] += 1
+            self._simultaneas += 1
+            self.stats['simultaneas_max'] = max(self.stats['simultaneas_max'], self._simultaneas)
+            limitar = self.limite_a_cada and self.stats['requisicoes'] % self.limite_a_cada == 0
+            if limitar:
+                self.stats['limitadas'] += 1
+        try:
+            if self.latencia:
+                time.sleep(self.latencia)
+            if limitar:
+                self._enviar(handler, 429, {'message': 'Too Many Requests'}, {'Retry-After': '0'})
+                return
+            url = urlparse(handler.path)
+            if url.path != '/auth' and handler.headers.get('X-API-KEY') in self._chaves_expiradas:
+                self._enviar(handler, 401, {'message': 'Unauthorized'})
+                return
+            status, corpo = self._rota(metodo, url)
+            self._enviar(handler, status, corpo)
+        finally:
+            with self._lock:
+                self._simultaneas -= 1
+
+    def _rota(self, metodo: str, url) -> tuple:
+        params = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+        partes = [p for p in url.path.split('/') if p]
+
+        if metodo == 'POST' and partes == ['auth']:
+            with self._lock:
+                self.stats['autenticacoes'] += 1
+                api_key = f"mock-api-key-{self.stats['autenticacoes']}"
+                self._chaves_emitidas.append(api_key)
+            return 200, {'apiKey': api_key}
+        if metodo == 'GET' and partes == ['accounts']:
+            return 200, {'results': self.contas(params.get('itemId', 'item'))}
+        if metodo == 'GET' and partes == ['transactions']:
+            return 200, self._pagina(params)
+        if len(partes) == 2 and partes[0] == 'items' and metodo == 'GET':
+            return 200, {'id': partes[1], 'status': 'UPDATED'}
+        if len(partes) == 3 and partes[0] == 'items' and partes[2] == 'refresh':
+            return 200, {'id': f"exec-{partes[1]}"}
+        return 404, {'message': 'Not Found'}
+
+    def _pagina(self, params: Dict[str, str]) -> Dict[str, Any]:
+        de, ate = params.get('from', '0000-00-00'), params.get('to', '9999-99-99')
+        transacoes = [t for t in self.transacoes(params['accountId']) if de <= t['date'][:10] <= ate]
+        tamanho = int(params.get('pageSize', 500))
+        pagina = int(params.get('page', 1))
+        total_paginas = -(-len(transacoes) // tamanho)
+        return {
+            'total': len(transacoes),
+            'totalPages': total_paginas,
+            'page': pagina,
+            'results': transacoes[(pagina - 1) * tamanho:pagina * tamanho],
+        }
+
+    @staticmethod
+    def _enviar(handler: BaseHTTPRequestHandler, status: int, corpo: Dict[str, Any],
+                headers: Optional[Dict[str, str]] = None):
+        dados = json.dumps(corpo).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(dados)))
+        for nome, valor in (headers or {}).items():
+            handler.send_header(nome, valor)
+        handler.end_headers()
+        handler.wfile.write(dados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor Pluggy de teste')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--transacoes', type=int, default=3000, help='Transações por conta')
+    parser.add_argument('--latencia', type=float, default=0.05, help='Atraso por resposta (s)')
+    parser.add_argument('--limite-a-cada', type=int, default=0, help='429 a cada N requisições')
+    args = parser.parse_args()
+
+    mock = PluggyMockServer(porta=args.porta, transacoes_por_conta=args.transacoes,
+                            latencia=args.latencia, limite_a_cada=args.limite_a_cada)
+    print(f"🧪 Pluggy de teste em {mock.url} (Ctrl+C para sair)")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.server.server_close()
+        print(f"📊 {mock.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 """
 Lista todas as transações dos últimos 3 meses do Mercado Pago
 """
-import requests
+from integrations.pluggy_auth import get_pluggy_fetcher
 from datetime import datetime, timedelta
 import json
 
@@ -17,18 +17,12 @@ print("=" * 100)
 
 # Autenticar
 print("\n🔐 Autenticando...")
-auth_response = requests.post(f'{BASE_URL}/auth', json={
-    'clientId': CLIENT_ID,
-    'clientSecret': CLIENT_SECRET
-})
-api_key = auth_response.json()['apiKey']
-headers = {'X-API-KEY': api_key}
+fetcher = get_pluggy_fetcher(CLIENT_ID, CLIENT_SECRET, BASE_URL)
 print("✅ Autenticado com sucesso")
 
 # Buscar contas
 print("\n🏦 Buscando contas...")
-accounts_response = requests.get(f'{BASE_URL}/accounts?itemId={ITEM_ID}', headers=headers)
-accounts = accounts_response.json().get('results', [])
+accounts = fetcher.buscar_contas(ITEM_ID)
 print(f"✅ {len(accounts)} conta(s) encontrada(s)")
 
 # Período: últimos 3 meses
@@ -54,7 +48,6 @@ for acc in accounts:
     total_transacoes = 0
     
     while True:
-        trans_url = f'{BASE_URL}/transactions'
         params = {
             'accountId': account_id,
             'from': date_from.strftime('%Y-%m-%d'),
@@ -63,8 +56,7 @@ for acc in accounts:
             'pageSize': 500  # Máximo por página
         }
         
-        trans_response = requests.get(trans_url, headers=headers, params=params)
-        trans_data = trans_response.json()
+        trans_data = fetcher.request('GET', '/transactions', params=params)
         
         transactions = trans_data.get('results', [])
         if not transactions:
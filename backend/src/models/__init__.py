@@ -3,9 +3,10 @@ Modelos de dados para o Agente Financeiro IA
 Classes que representam as entidades do sistema
 """
 
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
 from datetime import date as Date, datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator
 from enum import Enum
 import uuid
 
@@ -62,10 +63,68 @@ class TransactionCategory(Enum):
     VIAGEM = "Viagem"
 
 
-@dataclass
+# Nomes dos meses (índice = número do mês), usados para derivar month_ref
+MESES_PT = ("", "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho",
+            "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro")
+
+_new = object.__new__
+
+
+class LazyRawData(MutableMapping):
+    """
+    raw_data lido do banco, decodificado só no primeiro acesso.
+
+    Guarda a função de decodificação e seus argumentos; quem carrega muitas
+    transações e não olha raw_data não paga o json.loads (nem a
+    descompressão). Depois de decodificado se comporta como um dict comum.
+    """
+    __slots__ = ('_decoder', '_args', '_data')
+
+    def __init__(self, decoder: Callable[..., Dict[str, Any]], *args: Any):
+        self._decoder = decoder
+        self._args = args
+        self._data: Optional[Dict[str, Any]] = None
+
+    @property
+    def loaded(self) -> bool:
+        """True se o conteúdo já foi decodificado."""
+        return self._data is not None
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self._decoder(*self._args)
+            self._decoder = self._args = None
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._load()[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self._load()[key] = value
+
+    def __delitem__(self, key: str):
+        del self._load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __repr__(self) -> str:
+        return repr(self._data) if self.loaded else "LazyRawData(<não decodificado>)"
+
+
+@dataclass(slots=True)
 class Transaction:
-    """Modelo para uma transação financeira."""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    """
+    Modelo para uma transação financeira.
+
+    Slotted (sem __dict__ por instância). Caminhos com dados já validados
+    (leitura do banco, lotes) usam from_trusted, que não passa por
+    __post_init__.
+    """
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))  # Trocado pelo id de conteúdo ao gravar
     date: Date = field(default_factory=Date.today)
     description: str = ""
     amount: float = 0.0
@@ -73,7 +132,7 @@ class Transaction:
     category: TransactionCategory = TransactionCategory.A_DEFINIR
     month_ref: str = ""
     mes_comp: str = ""  # Mês de compensação (formato: YYYY-MM) extraído do nome do arquivo
-    raw_data: Dict[str, Any] = field(default_factory=dict)
+    raw_data: Dict[str, Any] = field(default_factory=dict)  # dict ou LazyRawData (lido do banco)
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: Optional[datetime] = None
     
@@ -87,12 +146,7 @@ class Transaction:
         
         # Gera mês de referência se não fornecido
         if not self.month_ref:
-            meses_pt = {
-                1: "Janeiro", 2: "Fevereiro", 3: "Março", 4: "Abril",
-                5: "Maio", 6: "Junho", 7: "Julho", 8: "Agosto",
-                9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
-            }
-            self.month_ref = f"{meses_pt[self.date.month]} {self.date.year}"
+            self.month_ref = f"{MESES_PT[self.date.month]} {self.date.year}"
     
     @property
     def is_income(self) -> bool:
@@ -120,7 +174,7 @@ class Transaction:
             "category": self.category.value,
             "month_ref": self.month_ref,
             "mes_comp": self.mes_comp,
-            "raw_data": self.raw_data,
+            "raw_data": dict(self.raw_data),
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
@@ -142,8 +196,33 @@ class Transaction:
         
         return cls(**data)
 
+    @classmethod
+    def from_trusted(cls, id: str, date: Date, description: str, amount: float,
+                     source: TransactionSource, category: TransactionCategory,
+                     month_ref: str, mes_comp: str, raw_data: Dict[str, Any],
+                     created_at: datetime, updated_at: Optional[datetime] = None) -> 'Transaction':
+        """
+        Cria uma transação sem validação (sem __post_init__ nem defaults).
 
-@dataclass
+        Só para dados que já passaram pelas regras do modelo: linhas lidas
+        do banco, lotes montados por TransactionBatch.
+        """
+        transaction = _new(cls)
+        transaction.id = id
+        transaction.date = date
+        transaction.description = description
+        transaction.amount = amount
+        transaction.source = source
+        transaction.category = category
+        transaction.month_ref = month_ref
+        transaction.mes_comp = mes_comp
+        transaction.raw_data = raw_data
+        transaction.created_at = created_at
+        transaction.updated_at = updated_at
+        return transaction
+
+
+@dataclass(slots=True)
 class LearnedCategory:
     """Modelo para categorias aprendidas pelo sistema."""
     description: str
@@ -161,6 +240,18 @@ class LearnedCategory:
         if not 0 <= self.confidence <= 1:
             raise ValueError("Confiança deve estar entre 0 e 1")
     
+    @classmethod
+    def from_trusted(cls, description: str, category: TransactionCategory, confidence: float,
+                     learned_at: datetime, usage_count: int) -> 'LearnedCategory':
+        """Cria sem validação (linhas de categorias_aprendidas, já normalizadas)."""
+        learned = _new(cls)
+        learned.description = description
+        learned.category = category
+        learned.confidence = confidence
+        learned.learned_at = learned_at
+        learned.usage_count = usage_count
+        return learned
+    
     def to_dict(self) -> Dict[str, Any]:
         """Converte para dicionário."""
         return {
@@ -176,6 +267,7 @@ class LearnedCategory:
 class ProcessingStats:
     """Estatísticas de processamento de arquivos."""
     files_processed: int = 0
+    files_skipped: int = 0
     transactions_extracted: int = 0
     transactions_categorized: int = 0
     new_categories_learned: int = 0
@@ -215,6 +307,18 @@ class ProcessingStats:
         )
 
 
+@dataclass
+class IngestRecord:
+    """Registro de um arquivo de extrato já importado (ledger de ingestão)."""
+    path: str
+    size: int
+    mtime: float
+    content_hash: str
+    processor: str = ""
+    rows: int = 0
+    ingested_at: datetime = field(default_factory=datetime.now)
+
+
 @dataclass
 class CardMapping:
     """Mapeamento de finais de cartão para tipos."""
@@ -272,4 +376,7 @@ def get_card_source(final_cartao: str, bank: str) -> TransactionSource:
     # Retorna virtual como padrão se não encontrar
     return (TransactionSource.ITAU_MASTER_VIRTUAL 
             if bank.lower() == "itau" 
-            else TransactionSource.LATAM_VISA_VIRTUAL)
\ No newline at end of file
+            else TransactionSource.LATAM_VISA_VIRTUAL)
+
+# Lote colunar (importado no fim: usa Transaction e os enums acima)
+from .batch import TransactionBatch
@@ -0,0 +1,220 @@
+"""
+Lote colunar de transações
+==========================
+
+TransactionBatch guarda um lote de transações em um DataFrame (uma coluna
+por campo) em vez de uma lista de Transaction: datas em datetime64, fonte e
+categoria como Categorical (um código inteiro por linha, cada texto guardado
+uma vez), meses como category. Não há uuid nem datetime.now() por linha: o
+id só existe quando o repositório grava (id de conteúdo) e created_at é um
+só para o lote.
+
+Processadores emitem lotes e os serviços (deduplicação, categorização,
+gravação, relatório) trabalham sobre as colunas. to_transactions() e
+from_transactions() fazem a ponte com o código que usa Transaction.
+"""
+
+import uuid
+from datetime import date as Date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from . import Transaction, TransactionSource, TransactionCategory, MESES_PT
+
+# Códigos dos Categorical -> enum (mesma ordem das categorias)
+_FONTES = [fonte.value for fonte in TransactionSource]
+_CATEGORIAS = [categoria.value for categoria in TransactionCategory]
+_FONTES_ENUM = np.array(list(TransactionSource), dtype=object)
+_CATEGORIAS_ENUM = np.array(list(TransactionCategory), dtype=object)
+
+_NOMES_MESES = np.array(MESES_PT, dtype=object)
+
+COLUMNS = ['id', 'date', 'description', 'amount', 'source', 'category', 'month_ref', 'mes_comp', 'raw_data']
+
+
+def _categorical(valores, categorias: List[str]) -> pd.Categorical:
+    """Categorical com categorias fixas (valores desconhecidos são erro)."""
+    codigos = pd.Index(categorias).get_indexer(valores)
+    if (codigos < 0).any():
+        invalidos = sorted({str(v) for v, c in zip(valores, codigos) if c < 0})
+        raise ValueError(f"Valores inválidos: {invalidos}")
+    return pd.Categorical.from_codes(codigos, categories=categorias)
+
+
+def _por_linha(valor: Any, n: int) -> Any:
+    """Repete um valor escalar para n linhas (sequências passam direto)."""
+    if isinstance(valor, (str, TransactionSource, TransactionCategory)) or valor is None:
+        return [valor] * n
+    return list(valor)
+
+
+def _coluna(valores: Iterable) -> Union[np.ndarray, list]:
+    """Arrays/Séries passam sem cópia para lista; demais iteráveis viram lista."""
+    if isinstance(valores, (pd.Series, pd.Index, np.ndarray)):
+        return np.asarray(valores)
+    return list(valores)
+
+
+def _texto_enum(valores: Sequence) -> List[str]:
+    """Enums viram o seu .value (textos passam direto)."""
+    return [v.value if isinstance(v, (TransactionSource, TransactionCategory)) else v for v in valores]
+
+
+class TransactionBatch:
+    """Lote colunar de transações (ver docstring do módulo)."""
+
+    def __init__(self, frame: pd.DataFrame, created_at: Optional[datetime] = None):
+        self.frame = frame
+        self.created_at = created_at or datetime.now()
+
+    @classmethod
+    def from_columns(cls, dates: Iterable, descriptions: Iterable[str], amounts: Iterable[float],
+                     raw_data: Optional[Iterable[Dict[str, Any]]] = None,
+                     source: Union[TransactionSource, Iterable] = TransactionSource.PIX,
+                     category: Union[TransactionCategory, Iterable] = TransactionCategory.A_DEFINIR,
+                     month_ref: Union[str, Iterable[str]] = "",
+                     mes_comp: Union[str, Iterable[str]] = "",
+                     ids: Optional[Iterable[Optional[str]]] = None) -> 'TransactionBatch':
+        """
+        Monta um lote a partir de colunas alinhadas.
+
+        Aplica as mesmas regras do Transaction.__post_init__: descrição não
+        vazia e sem espaços nas pontas, month_ref derivado da data quando
+        vazio. source/category/month_ref/mes_comp aceitam um valor para o
+        lote inteiro ou um por linha.
+
+        Raises:
+            ValueError: Se alguma descrição estiver vazia ou fonte/categoria for inválida
+        """
+        descricoes = pd.Series(_coluna(descriptions), dtype=object)
+        n = len(descricoes)
+        if n:
+            descricoes = descricoes.str.strip()
+            if (descricoes.isna() | (descricoes == "")).any():
+                raise ValueError("Descrição não pode estar vazia")
+
+        datas = pd.to_datetime(pd.Series(_coluna(dates))).dt.normalize().astype('datetime64[s]')
+
+        meses = pd.Series(_por_linha(month_ref, n), dtype=object)
+        sem_mes = (meses.isna() | (meses == "")).to_numpy()
+        if sem_mes.any():
+            derivados = _NOMES_MESES[datas.dt.month.to_numpy()[sem_mes]] + " " + datas.dt.year.to_numpy()[sem_mes].astype(str).astype(object)
+            meses[sem_mes] = derivados
+
+        frame = pd.DataFrame({
+            'id': pd.Series(_por_linha(ids, n), dtype=object),
+            'date': datas,
+            'description': descricoes,
+            'amount': pd.Series(_coluna(amounts), dtype=float),
+            'source': _categorical(_texto_enum(_por_linha(source, n)), _FONTES),
+            'category': _categorical(_texto_enum(_por_linha(category, n)), _CATEGORIAS),
+            'month_ref': meses.astype('category'),
+            'mes_comp': pd.Series(_por_linha(mes_comp, n), dtype=object).fillna("").astype('category'),
+            'raw_data': pd.Series(_por_linha(raw_data, n), dtype=object),
+        })
+        return cls(frame)
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Transaction]) -> 'TransactionBatch':
+        """Converte uma lista de Transaction (mantém ids e raw_data)."""
+        transactions = list(transactions)
+        lote = cls.from_columns(
+            dates=[t.date for t in transactions],
+            descriptions=[t.description for t in transactions],
+            amounts=[t.amount for t in transactions],
+            raw_data=[t.raw_data for t in transactions],
+            source=[t.source for t in transactions],
+            category=[t.category for t in transactions],
+            month_ref=[t.month_ref for t in transactions],
+            mes_comp=[t.mes_comp for t in transactions],
+            ids=[t.id for t in transactions],
+        )
+        if transactions:
+            lote.created_at = min(t.created_at for t in transactions)
+        return lote
+
+    @classmethod
+    def empty(cls) -> 'TransactionBatch':
+        """Lote sem linhas."""
+        return cls.from_columns([], [], [])
+
+    @classmethod
+    def concat(cls, batches: Iterable['TransactionBatch']) -> 'TransactionBatch':
+        """Junta lotes na ordem dada."""
+        batches = [b for b in batches if b is not None]
+        if not batches:
+            return cls.empty()
+        frame = pd.concat([b.frame for b in batches], ignore_index=True)
+        # category de meses diferentes viram object no concat
+        for coluna in ('month_ref', 'mes_comp'):
+            frame[coluna] = frame[coluna].astype(object).astype('category')
+        return cls(frame, created_at=min(b.created_at for b in batches))
+
+    def select(self, mask) -> 'TransactionBatch':
+        """Novo lote só com as linhas selecionadas (máscara booleana ou posições)."""
+        mask = np.asarray(mask)
+        if mask.dtype == bool:
+            frame = self.frame.loc[mask]
+        else:
+            frame = self.frame.iloc[mask]
+        return TransactionBatch(frame.reset_index(drop=True), created_at=self.created_at)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        return iter(self.to_transactions())
+
+    def __repr__(self) -> str:
+        return f"TransactionBatch({len(self)} transações)"
+
+    # Colunas já convertidas ------------------------------------------------
+
+    def dates(self) -> List[Date]:
+        """Datas como datetime.date."""
+        return self.frame['date'].dt.date.tolist()
+
+    def date_iso(self) -> List[str]:
+        """Datas no formato ISO (AAAA-MM-DD)."""
+        return self.frame['date'].dt.strftime('%Y-%m-%d').tolist()
+
+    def sources(self) -> np.ndarray:
+        """TransactionSource de cada linha."""
+        return _FONTES_ENUM[self.frame['source'].cat.codes.to_numpy()]
+
+    def categories(self) -> np.ndarray:
+        """TransactionCategory de cada linha."""
+        return _CATEGORIAS_ENUM[self.frame['category'].cat.codes.to_numpy()]
+
+    def set_categories(self, mask, category: Union[TransactionCategory, Sequence]):
+        """Atualiza a categoria das linhas selecionadas."""
+        valores = category.value if isinstance(category, TransactionCategory) else _texto_enum(category)
+        self.frame.loc[np.asarray(mask), 'category'] = valores
+
+    def memory_usage(self) -> int:
+        """Memória ocupada pelo lote (bytes, incluindo textos e raw_data)."""
+        return int(self.frame.memory_usage(deep=True).sum())
+
+    def to_transactions(self) -> List[Transaction]:
+        """
+        Converte para lista de Transaction.
+
+        Usa Transaction.from_trusted (os dados já foram validados na
+        montagem do lote). Linhas sem id recebem um uuid4.
+        """
+        frame = self.frame
+        trusted = Transaction.from_trusted
+        uuid4 = uuid.uuid4
+        created_at = self.created_at
+
+        return [
+            trusted(id_ or str(uuid4()), data, descricao, valor, fonte, categoria, month_ref, mes_comp,
+                    raw if raw is not None else {}, created_at)
+            for id_, data, descricao, valor, fonte, categoria, month_ref, mes_comp, raw in zip(
+                frame['id'].tolist(), self.dates(), frame['description'].tolist(), frame['amount'].tolist(),
+                self.sources(), self.categories(), frame['month_ref'].tolist(), frame['mes_comp'].tolist(),
+                frame['raw_data'].tolist(),
+            )
+        ]
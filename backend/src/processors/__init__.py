@@ -6,6 +6,7 @@ from .base import BaseProcessor
 from .pix import PixProcessor
 from .cards import ItauProcessor, LatamProcessor, CardProcessor
 from .cards_v2 import CardStatementV2Processor
+from .excel_cache import WorkbookCache
 
 __all__ = [
     'BaseProcessor',
@@ -13,5 +14,6 @@ __all__ = [
     'ItauProcessor',
     'LatamProcessor',
     'CardProcessor',
-    'CardStatementV2Processor'
+    'CardStatementV2Processor',
+    'WorkbookCache'
 ]
\ No newline at end of file
@@ -4,14 +4,25 @@ Classe base para processadores de extratos financeiros
 
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import logging
 
-from models import Transaction, ProcessingStats
+from models import Transaction, TransactionBatch, ProcessingStats
 
 logger = logging.getLogger(__name__)
 
+# Padrões de descrição ignorados (pagamentos de fatura)
+SKIP_PATTERNS = [
+    "PAGAMENTO EFETUADO",
+    "ITAU BLACK",
+    "ITAU VISA",
+]
+
+# Transações em moedas estrangeiras são ignoradas (com aviso)
+FOREIGN_CURRENCIES = ["USD", "$", "€", "EURO", "CHF", "GBP", "SWITZERLAND"]
+
 
 class BaseProcessor(ABC):
     """Classe base para todos os processadores de extratos."""
@@ -46,6 +57,22 @@ class BaseProcessor(ABC):
         """
         pass
     
+    def process_file_batch(self, file_path: Path) -> TransactionBatch:
+        """
+        Processa um arquivo e retorna as transações em lote colunar.
+        
+        Padrão: converte o resultado de process_file. Processadores que já
+        montam as colunas sobrescrevem este método (e process_file passa a
+        converter o lote).
+        
+        Args:
+            file_path: Caminho para o arquivo
+            
+        Returns:
+            Lote de transações extraídas
+        """
+        return TransactionBatch.from_transactions(self.process_file(file_path))
+    
     def validate_file(self, file_path: Path) -> bool:
         """
         Valida se o arquivo existe e pode ser lido.
@@ -112,26 +139,55 @@ class BaseProcessor(ABC):
         
         desc_upper = description.upper()
         
-        # Lista de padrões para ignorar
-        skip_patterns = [
-            "PAGAMENTO EFETUADO",
-            "ITAU BLACK",
-            "ITAU VISA",
-        ]
-        
-        for pattern in skip_patterns:
+        # Padrões para ignorar
+        for pattern in SKIP_PATTERNS:
             if pattern in desc_upper:
                 return True
         
         # Ignora transações em moedas estrangeiras
-        foreign_currencies = ["USD", "$", "€", "EURO", "CHF", "GBP", "SWITZERLAND"]
-        for currency in foreign_currencies:
+        for currency in FOREIGN_CURRENCIES:
             if currency in desc_upper:
                 self.stats.add_warning(f"Transação em moeda estrangeira ignorada: {description}")
                 return True
         
         return False
     
+    def should_skip_transactions(self, descriptions: pd.Series, amounts) -> np.ndarray:
+        """
+        Versão vetorizada de should_skip_transaction para uma coluna inteira.
+        
+        Aplica as mesmas regras, na mesma ordem, e registra os mesmos avisos
+        de moeda estrangeira (na ordem das linhas).
+        
+        Args:
+            descriptions: Série de descrições (str)
+            amounts: Valores correspondentes (array/Série numérica, NaN = inválido)
+            
+        Returns:
+            Máscara booleana (True = ignorar)
+        """
+        descriptions = pd.Series(descriptions, dtype=object).reset_index(drop=True)
+        amounts = pd.to_numeric(pd.Series(amounts).reset_index(drop=True), errors="coerce")
+        
+        desc_upper = descriptions.fillna("").astype(str).str.upper()
+        empty = (descriptions.isna() | (descriptions.fillna("").astype(str) == "")).to_numpy()
+        invalid_amount = (amounts.isna() | (amounts == 0)).to_numpy()
+        
+        pattern = np.zeros(len(descriptions), dtype=bool)
+        for trecho in SKIP_PATTERNS:
+            pattern |= desc_upper.str.contains(trecho, regex=False).to_numpy()
+        
+        currency = np.zeros(len(descriptions), dtype=bool)
+        for moeda in FOREIGN_CURRENCIES:
+            currency |= desc_upper.str.contains(moeda, regex=False).to_numpy()
+        
+        skip_before_currency = empty | invalid_amount | pattern
+        warned = currency & ~skip_before_currency
+        for pos in np.flatnonzero(warned):
+            self.stats.add_warning(f"Transação em moeda estrangeira ignorada: {descriptions.iat[pos]}")
+        
+        return skip_before_currency | currency
+    
     def extract_month_reference(self, file_path: Path) -> str:
         """
         Extrai referência do mês a partir do nome do arquivo.
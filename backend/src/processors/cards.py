@@ -3,13 +3,15 @@ Processador para extratos de cartões (arquivos Excel)
 """
 
 from typing import List, Optional
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import logging
 
 from .base import BaseProcessor
-from models import Transaction, TransactionSource, TransactionCategory, get_card_source
+from .excel_cache import workbook_cache, frame_with_header
+from models import Transaction, TransactionBatch, TransactionSource, TransactionCategory, get_card_source
 
 logger = logging.getLogger(__name__)
 
@@ -46,11 +48,23 @@ class CardProcessor(BaseProcessor):
         Returns:
             Lista de transações do cartão
         """
+        return self.process_file_batch(file_path).to_transactions()
+    
+    def process_file_batch(self, file_path: Path) -> TransactionBatch:
+        """
+        Processa arquivo de extrato de cartão em lote colunar.
+        
+        Args:
+            file_path: Caminho do arquivo Excel
+            
+        Returns:
+            Lote de transações do cartão
+        """
         if not self.validate_file(file_path):
-            return []
+            return TransactionBatch.empty()
         
         self.log_processing_start(file_path)
-        transactions = []
+        batch = TransactionBatch.empty()
         month_ref = self.extract_month_reference(file_path)
         
         # Extrai mes_comp do nome do arquivo (formato: 202512_Itau.xls -> 2025-12)
@@ -63,42 +77,25 @@ class CardProcessor(BaseProcessor):
             mes_comp = f"{ano}-{mes}"
         
         try:
-            # Lê arquivo Excel
-            df = pd.read_excel(file_path)
+            # Lê arquivo Excel (reaproveita a leitura feita na detecção de formato)
+            df = frame_with_header(workbook_cache.read(file_path))
             
             # DEBUG: Mostrar totais do arquivo
             logger.info(f"🔍 DEBUG {file_path.name}: {len(df)} linhas lidas do Excel")
             
             # Processa transações por seção de cartão
-            transactions = self._extract_transactions_by_card(df, month_ref, file_path, mes_comp)
-            
-            # DEBUG: Mostrar quantas transações foram extraídas
-            if month_ref == 'Dezembro 2025':
-                total_value = sum(abs(t.amount) for t in transactions)
-                
-                # Contar por source
-                from collections import Counter
-                source_counts = Counter([t.source.value for t in transactions])
-                source_values = {}
-                for source_name in source_counts.keys():
-                    source_txs = [t for t in transactions if t.source.value == source_name]
-                    source_values[source_name] = sum(abs(t.amount) for t in source_txs)
-                
-                logger.info(f"🔍 DEBUG {file_path.name} - Dezembro 2025 TOTAL: {len(transactions)} transacoes = R$ {total_value:,.2f}")
-                logger.info(f"🔍 DEBUG {file_path.name} - Distribuição por source:")
-                for source_name, count in source_counts.items():
-                    logger.info(f"   {source_name}: {count} transacoes = R$ {source_values[source_name]:,.2f}")
+            batch = self._extract_batch_by_card(df, month_ref, file_path, mes_comp)
             
             self.stats.files_processed += 1
-            self.stats.transactions_extracted += len(transactions)
-            self.log_processing_end(len(transactions))
+            self.stats.transactions_extracted += len(batch)
+            self.log_processing_end(len(batch))
             
         except Exception as e:
             error_msg = f"Erro ao processar {file_path}: {e}"
             self.stats.add_error(error_msg)
             logger.error(f"❌ [{self.source_name}] {error_msg}")
         
-        return transactions
+        return batch
     
     def _extract_card_final(self, df: pd.DataFrame) -> Optional[str]:
         """
@@ -132,91 +129,114 @@ class CardProcessor(BaseProcessor):
         Returns:
             Lista de transações
         """
-        transactions = []
-        current_card_final = None
-        current_source = None
-        ultima_data = None
-        aguardando_valor_real = False
+        return self._extract_batch_by_card(df, month_ref, file_path, mes_comp).to_transactions()
+    
+    def _extract_batch_by_card(self, df: pd.DataFrame, month_ref: str, file_path: Path, mes_comp: str = "") -> TransactionBatch:
+        """
+        Extrai transações agrupadas por cartão, em lote colunar.
         
-        for i, row in df.iterrows():
-            col_a = str(row.iloc[0]).strip()
-            col_b = str(row.iloc[1]).strip()
-            col_d = row.iloc[3] if len(row) > 3 else None
-            valor = pd.to_numeric(col_d, errors="coerce") if col_d is not None else None
-            
-            # Verifica se é linha de final do cartão
-            if "FINAL" in col_a.upper():
-                final = ''.join(filter(str.isdigit, col_a))
-                if len(final) >= 4:
-                    current_card_final = final[-4:]
-                    current_source = get_card_source(current_card_final, self.bank_name)
-                continue
-            
-            # Ignora linhas vazias ou inválidas
-            if not col_b or col_b.strip().upper() in ["NAN", ""]:
-                continue
-            
-            # Se não temos um cartão atual, usa virtual como padrão
-            if current_source is None:
-                current_source = (TransactionSource.ITAU_MASTER_VIRTUAL 
-                                if self.bank_name.lower() == "itau" 
-                                else TransactionSource.LATAM_VISA_VIRTUAL)
-                # DEBUG: Avisar quando usa source default
-                if month_ref == 'Dezembro 2025':
-                    logger.debug(f"🔍 Usando source default para {self.bank_name}: {current_source.value}")
-            
-            # Verifica se deve pular esta transação
-            if self.should_skip_transaction(col_b, valor if valor is not None else 0):
-                continue
+        Args:
+            df: DataFrame do Excel
+            month_ref: Referência do mês
+            file_path: Caminho do arquivo original
+            mes_comp: Mês de compensação (formato YYYY-MM)
             
-            # Processa data
+        Returns:
+            Lote de transações
+        """
+        # Mesmos valores que df.iterrows() entregaria (linha convertida para o tipo comum)
+        values = df.values
+        n_rows = len(values)
+        if n_rows == 0:
+            return TransactionBatch.empty()
+        
+        # Célula None é tratada como vazia (NaN), como vem do read_excel
+        col_a = pd.Series(["nan" if v is None else str(v).strip() for v in values[:, 0]], dtype=object)
+        col_b = pd.Series(["nan" if v is None else str(v).strip() for v in values[:, 1]], dtype=object)
+        
+        # Seções de cartão: linha "FINAL xxxx" vale para as linhas seguintes
+        is_final = col_a.str.upper().str.contains("FINAL", regex=False).to_numpy()
+        finais = pd.Series([None] * n_rows, dtype=object)
+        for pos in np.flatnonzero(is_final):
+            final = ''.join(filter(str.isdigit, col_a.iat[pos]))
+            if len(final) >= 4:
+                finais.iat[pos] = final[-4:]
+        card_finals = finais.ffill()
+        
+        # Sem valor (menos de 4 colunas) tudo seria ignorado
+        if values.shape[1] <= 3:
+            return TransactionBatch.empty()
+        valores = pd.to_numeric(pd.Series(values[:, 3], dtype=object), errors="coerce").to_numpy(dtype=float)
+        
+        # Linhas candidatas: não são marcador de cartão, têm descrição e passam nas regras de skip
+        has_desc = ((col_b != "") & (col_b.str.upper() != "NAN")).to_numpy()
+        candidates = ~is_final & has_desc
+        skip = np.ones(n_rows, dtype=bool)
+        if candidates.any():
+            skip[candidates] = self.should_skip_transactions(col_b[candidates], valores[candidates])
+        candidates &= ~skip
+        
+        # Datas: mesma conversão escalar do parser original, uma vez por texto distinto
+        parsed = {}
+        for texto in col_a[candidates].unique():
             try:
-                data = pd.to_datetime(col_a, dayfirst=True, errors="coerce")
-                if pd.notnull(data):
-                    data = data.date()
-                else:
-                    data = None
-                
-                # Tratamento especial para conversões de moeda
-                if "dólar de conversão" in col_b.lower():
-                    ultima_data = data
-                    aguardando_valor_real = True
-                    continue
-                    
-            except:
-                data = None
-            
-            # Usa última data se necessário
-            if pd.isnull(data) and pd.notnull(valor):
-                if aguardando_valor_real:
-                    data = ultima_data
-                    aguardando_valor_real = False
-                else:
-                    continue
-            elif pd.isnull(data):
-                continue
-            
-            # Cria transação se tem valor válido e data válida
-            if pd.notnull(valor) and valor != 0 and data is not None:
-                transaction = Transaction(
-                    date=data,
-                    description=col_b.strip(),
-                    amount=float(valor),
-                    source=current_source,
-                    category=TransactionCategory.A_DEFINIR,
-                    month_ref=month_ref,
-                    mes_comp=mes_comp,
-                    raw_data={
-                        "original_description": col_b,
-                        "file_source": str(file_path),
-                        "bank": self.bank_name,
-                        "card_final": current_card_final
-                    }
-                )
-                
-                transactions.append(transaction)
+                data = pd.to_datetime(texto, dayfirst=True, errors="coerce")
+                parsed[texto] = (True, data.date() if pd.notnull(data) else None)
+            except Exception:
+                parsed[texto] = (False, None)
+        datas = [None] * n_rows
+        parse_ok = np.zeros(n_rows, dtype=bool)
+        for pos in np.flatnonzero(candidates):
+            parse_ok[pos], datas[pos] = parsed[col_a.iat[pos]]
+        sem_data = np.array([d is None for d in datas])
         
-        return transactions
+        # "Dólar de conversão": guarda a data para a próxima linha sem data.
+        # Uma linha sem data usa a data guardada só se o evento anterior
+        # (entre conversões e linhas sem data) foi uma conversão.
+        is_conversao = candidates & parse_ok & col_b.str.lower().str.contains(
+            "dólar de conversão", regex=False
+        ).to_numpy()
+        is_sem_data = candidates & ~is_conversao & sem_data
+        eventos = np.flatnonzero(is_conversao | is_sem_data)
+        anterior_conversao = np.zeros(len(eventos), dtype=bool)
+        anterior_conversao[1:] = is_conversao[eventos[:-1]]
+        for evento, pos in enumerate(eventos):
+            if is_sem_data[pos] and anterior_conversao[evento]:
+                datas[pos] = datas[eventos[evento - 1]]
+        
+        emitir = candidates & ~is_conversao & np.array([d is not None for d in datas])
+        
+        default_source = (TransactionSource.ITAU_MASTER_VIRTUAL
+                          if self.bank_name.lower() == "itau"
+                          else TransactionSource.LATAM_VISA_VIRTUAL)
+        sources = {}
+        
+        posicoes = np.flatnonzero(emitir)
+        file_source = str(file_path)
+        finais_emitidos = card_finals.take(posicoes).tolist()
+        descricoes = col_b.take(posicoes).tolist()
+        for card_final in set(finais_emitidos):
+            sources[card_final] = (get_card_source(card_final, self.bank_name)
+                                   if card_final is not None else default_source)
+        
+        return TransactionBatch.from_columns(
+            dates=[datas[pos] for pos in posicoes],
+            descriptions=descricoes,
+            amounts=valores[posicoes],
+            raw_data=[
+                {
+                    "original_description": descricao,
+                    "file_source": file_source,
+                    "bank": self.bank_name,
+                    "card_final": card_final
+                }
+                for descricao, card_final in zip(descricoes, finais_emitidos)
+            ],
+            source=[sources[card_final] for card_final in finais_emitidos],
+            category=TransactionCategory.A_DEFINIR,
+            month_ref=month_ref,
+            mes_comp=mes_comp
+        )
     
     def _extract_transactions(self, df: pd.DataFrame, source: TransactionSource, 
                             month_ref: str, file_path: Path) -> List[Transaction]:
@@ -22,6 +22,7 @@ from pathlib import Path
 import pandas as pd
 
 from .base import BaseProcessor
+from .excel_cache import workbook_cache
 from models import Transaction, TransactionCategory, TransactionSource, get_card_source
 
 logger = logging.getLogger(__name__)
@@ -71,14 +72,19 @@ class CardStatementV2Processor(BaseProcessor):
             return False
         return self._find_header_row(file_path) is not None
 
-    def _find_header_row(self, file_path: Path) -> Optional[int]:
-        """Procura a linha de cabeçalho ('Titularidade' + 'Parcelamento')."""
-        try:
-            df = pd.read_excel(file_path, header=None, nrows=30)
-        except Exception:
-            return None
+    def _find_header_row(self, file_path: Path, df: Optional[pd.DataFrame] = None) -> Optional[int]:
+        """
+        Procura a linha de cabeçalho ('Titularidade' + 'Parcelamento') nas
+        primeiras 30 linhas. A planilha vem do workbook_cache, então a
+        detecção e o parse compartilham uma única leitura do arquivo.
+        """
+        if df is None:
+            try:
+                df = workbook_cache.read(file_path)
+            except Exception:
+                return None
 
-        for i in range(len(df)):
+        for i in range(min(len(df), 30)):
             valores = [str(v) for v in df.iloc[i].values if pd.notna(v)]
             if "Titularidade" in valores and "Parcelamento" in valores:
                 return i
@@ -102,8 +108,8 @@ class CardStatementV2Processor(BaseProcessor):
             mes_comp = f"{apenas_numeros[:4]}-{apenas_numeros[4:6]}"
 
         try:
-            df = pd.read_excel(file_path, header=None)
-            header_row = self._find_header_row(file_path)
+            df = workbook_cache.read(file_path)
+            header_row = self._find_header_row(file_path, df)
             if header_row is None:
                 self.stats.add_error(f"Cabeçalho não encontrado em {file_path.name}")
                 return []
@@ -0,0 +1,107 @@
+"""
+Cache de planilhas lidas
+========================
+
+Um mesmo arquivo Excel passa por vários processadores numa execução: a
+detecção do formato novo (CardStatementV2Processor.can_process), o parse do
+formato novo ou o parse do formato antigo (CardProcessor). Cada um chamava
+pd.read_excel de novo.
+
+Aqui a planilha é lida uma única vez (sem cabeçalho, como veio do arquivo) e
+compartilhada; a chave inclui mtime e tamanho, então um arquivo alterado é
+relido automaticamente.
+
+Uso:
+    from processors.excel_cache import workbook_cache
+
+    df = workbook_cache.read(file_path)   # DataFrame header=None (não alterar!)
+"""
+
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class WorkbookCache:
+    """
+    Cache LRU de DataFrames lidos com pd.read_excel(header=None).
+
+    Os DataFrames retornados são compartilhados: quem precisar alterar deve
+    trabalhar numa cópia.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+        self.reads = 0  # leituras efetivas do disco (útil para diagnóstico)
+
+    def read(self, file_path: Union[str, Path]) -> pd.DataFrame:
+        """
+        Retorna a primeira aba da planilha, sem cabeçalho.
+
+        Args:
+            file_path: Caminho do arquivo Excel
+
+        Returns:
+            DataFrame com todas as linhas do arquivo (header=None)
+
+        Raises:
+            Exceções de pd.read_excel/os.stat (falhas não são cacheadas)
+        """
+        path = Path(file_path)
+        st = path.stat()
+        key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+
+        df = self._entries.get(key)
+        if df is not None:
+            self._entries.move_to_end(key)
+            return df
+
+        df = pd.read_excel(path, header=None)
+        self.reads += 1
+        logger.debug(f"📖 Planilha lida: {path.name} ({len(df)} linhas)")
+
+        self._entries[key] = df
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return df
+
+    def clear(self):
+        """Libera as planilhas em cache (ex.: ao final de uma execução)."""
+        self._entries.clear()
+
+
+def frame_with_header(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Equivalente a pd.read_excel(header=0) a partir do DataFrame sem cabeçalho.
+
+    A primeira linha vira nome das colunas e os tipos são reinferidos
+    (colunas só numéricas voltam a ser float, como no read_excel).
+
+    Args:
+        raw: DataFrame lido com header=None
+
+    Returns:
+        Novo DataFrame (o original não é alterado)
+    """
+    if raw.empty:
+        return raw.copy()
+    df = raw.iloc[1:].reset_index(drop=True)
+    df.columns = [f"Unnamed: {i}" if pd.isna(c) else c for i, c in enumerate(raw.iloc[0])]
+    df = df.infer_objects()
+
+    # Coluna vazia abaixo do cabeçalho: read_excel devolve float (NaN)
+    for pos in range(df.shape[1]):
+        col = df.iloc[:, pos]
+        if col.dtype != "float64" and col.isna().all():
+            df.isetitem(pos, col.astype("float64"))
+    return df
+
+
+# Cache compartilhado pelos processadores do processo
+workbook_cache = WorkbookCache()
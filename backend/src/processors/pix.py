@@ -9,7 +9,7 @@ from datetime import datetime
 import logging
 
 from .base import BaseProcessor
-from models import Transaction, TransactionSource, TransactionCategory
+from models import Transaction, TransactionBatch, TransactionSource, TransactionCategory
 
 logger = logging.getLogger(__name__)
 
@@ -45,11 +45,23 @@ class PixProcessor(BaseProcessor):
         Returns:
             Lista de transações PIX
         """
+        return self.process_file_batch(file_path).to_transactions()
+    
+    def process_file_batch(self, file_path: Path) -> TransactionBatch:
+        """
+        Processa arquivo de extrato PIX em lote colunar.
+        
+        Args:
+            file_path: Caminho do arquivo TXT
+            
+        Returns:
+            Lote de transações PIX
+        """
         if not self.validate_file(file_path):
-            return []
+            return TransactionBatch.empty()
         
         self.log_processing_start(file_path)
-        transactions = []
+        batch = TransactionBatch.empty()
         month_ref = self.extract_month_reference(file_path)
         
         try:
@@ -77,35 +89,36 @@ class PixProcessor(BaseProcessor):
                 "ITAU BLACK|ITAU VISA", na=False
             )]
             
-            for _, row in df.iterrows():
-                if self.should_skip_transaction(row["Descricao"], row["Valor"]):
-                    continue
-                
-                transaction = Transaction(
-                    date=row["Data"].date(),
-                    description=row["Descricao"].strip(),
-                    amount=row["Valor"],
-                    source=TransactionSource.PIX,
-                    category=TransactionCategory.A_DEFINIR,
-                    month_ref=month_ref,
-                    raw_data={
-                        "original_description": row["Descricao"],
-                        "file_source": str(file_path)
-                    }
-                )
-                
-                transactions.append(transaction)
+            # Regras de skip em lote (descrição só com espaços também é ignorada)
+            skip = self.should_skip_transactions(df["Descricao"], df["Valor"].to_numpy())
+            skip |= (df["Descricao"].fillna("").astype(str).str.strip() == "").to_numpy()
+            df = df[~skip]
+
+            file_source = str(file_path)
+            descricoes = df["Descricao"].tolist()
+            batch = TransactionBatch.from_columns(
+                dates=df["Data"].dt.normalize(),
+                descriptions=descricoes,
+                amounts=df["Valor"].to_numpy(),
+                raw_data=[
+                    {"original_description": descricao, "file_source": file_source}
+                    for descricao in descricoes
+                ],
+                source=TransactionSource.PIX,
+                category=TransactionCategory.A_DEFINIR,
+                month_ref=month_ref
+            )
             
             self.stats.files_processed += 1
-            self.stats.transactions_extracted += len(transactions)
-            self.log_processing_end(len(transactions))
+            self.stats.transactions_extracted += len(batch)
+            self.log_processing_end(len(batch))
             
         except Exception as e:
             error_msg = f"Erro ao processar {file_path}: {e}"
             self.stats.add_error(error_msg)
             logger.error(f"❌ [{self.source_name}] {error_msg}")
         
-        return transactions
+        return batch
     
     def _detect_transaction_type(self, description: str) -> TransactionCategory:
         """
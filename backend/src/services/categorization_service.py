@@ -3,11 +3,16 @@ Serviço de categorização automática de transações
 """
 
 import logging
-from typing import List, Dict, Optional
+from collections import Counter
+from typing import List, Dict, Optional, Tuple, Union
 from pathlib import Path
 
-from models import Transaction, TransactionCategory, LearnedCategory
+import numpy as np
+import pandas as pd
+
+from models import Transaction, TransactionBatch, TransactionCategory, LearnedCategory
 from database import CategoryRepository
+from utils import LearnedPatternIndex
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +23,14 @@ class CategorizationService:
     def __init__(self, category_repository: CategoryRepository):
         self.category_repo = category_repository
         self._category_cache = None
+        self._learning_index = None
+        self._learning_index_source = None
         self._load_categories()
     
     def _load_categories(self):
         """Carrega categorias do banco para cache."""
         self._category_cache = self.category_repo.get_category_mapping()
+        self._learning_index = None
         logger.info(f"📚 {len(self._category_cache)} categorias carregadas para cache")
     
     def categorize_transaction(self, transaction: Transaction) -> TransactionCategory:
@@ -35,23 +43,38 @@ class CategorizationService:
         Returns:
             Categoria determinada para a transação
         """
+        category, learned_key = self._categorize_description(transaction.description)
+        if learned_key is not None:
+            # Atualiza contador de uso
+            self.category_repo.update_usage_count(learned_key)
+        return category
+    
+    def _categorize_description(self, description: str) -> Tuple[TransactionCategory, Optional[str]]:
+        """
+        Categoriza uma descrição sem efeitos colaterais.
+        
+        Args:
+            description: Descrição da transação
+            
+        Returns:
+            Tupla (categoria, chave aprendida usada ou None) - a chave é a
+            descrição cujo contador de uso deve ser incrementado
+        """
         # Limpa descrição removendo data PIX se presente
-        desc = self._clean_pix_description(transaction.description)
+        desc = self._clean_pix_description(description)
         
         # Aplica regras básicas originais
         category = self._categorize_by_original_rules(desc)
         if category != TransactionCategory.A_DEFINIR:
-            return category
+            return category, None
         
         # Busca no aprendizado (banco)
         learned_category = self._categorize_by_learning(desc)
         if learned_category:
-            # Atualiza contador de uso
-            self.category_repo.update_usage_count(desc.upper().strip())
-            return learned_category
+            return learned_category, desc.upper().strip()
         
         # Se não encontrou, retorna categoria padrão
-        return TransactionCategory.A_DEFINIR
+        return TransactionCategory.A_DEFINIR, None
     
     def _clean_pix_description(self, description: str) -> str:
         """
@@ -101,16 +124,20 @@ class CategorizationService:
         
         return TransactionCategory.A_DEFINIR
     
-    def categorize_transactions(self, transactions: List[Transaction]) -> List[Transaction]:
+    def categorize_transactions(self, transactions: Union[List[Transaction], TransactionBatch]
+                                ) -> Union[List[Transaction], TransactionBatch]:
         """
         Categoriza uma lista de transações.
         
         Args:
-            transactions: Lista de transações
+            transactions: Lista de transações (ou lote, ver categorize_batch)
             
         Returns:
             Lista de transações com categorias atualizadas
         """
+        if isinstance(transactions, TransactionBatch):
+            return self.categorize_batch(transactions)
+        
         categorized_count = 0
         
         for transaction in transactions:
@@ -126,6 +153,45 @@ class CategorizationService:
         logger.info(f"🏷️ {categorized_count}/{len(transactions)} transações categorizadas automaticamente")
         return transactions
     
+    def categorize_batch(self, batch: TransactionBatch) -> TransactionBatch:
+        """
+        Categoriza um lote colunar.
+        
+        Mesmo resultado de categorize_transactions, mas cada descrição
+        distinta é categorizada uma vez só e os contadores de uso são
+        gravados juntos no fim.
+        
+        Args:
+            batch: Lote de transações (alterado no lugar)
+            
+        Returns:
+            O próprio lote, com categorias atualizadas
+        """
+        if not len(batch):
+            logger.info("🏷️ 0/0 transações categorizadas automaticamente")
+            return batch
+        
+        codigos, descricoes = pd.factorize(batch.frame['description'])
+        resultados = [self._categorize_description(descricao) for descricao in descricoes]
+        categorias = np.array([categoria.value for categoria, _ in resultados], dtype=object)[codigos]
+        
+        # Uso de categoria aprendida: um incremento por transação
+        ocorrencias = np.bincount(codigos, minlength=len(descricoes))
+        usos = Counter()
+        for (_, learned_key), n in zip(resultados, ocorrencias):
+            if learned_key is not None:
+                usos[learned_key] += int(n)
+        self.category_repo.update_usage_counts(usos)
+        
+        novas = categorias != TransactionCategory.A_DEFINIR.value
+        a_definir = (batch.frame['category'] == TransactionCategory.A_DEFINIR.value).to_numpy()
+        categorized_count = int((novas & a_definir).sum())
+        if novas.any():
+            batch.set_categories(novas, categorias[novas])
+        
+        logger.info(f"🏷️ {categorized_count}/{len(batch)} transações categorizadas automaticamente")
+        return batch
+    
     def _categorize_by_learning(self, description: str) -> Optional[TransactionCategory]:
         """
         Categorização baseada em aprendizado de máquina.
@@ -141,21 +207,22 @@ class CategorizationService:
         
         desc_normalized = description.upper().strip()
         
-        # Busca exata
-        if desc_normalized in self._category_cache:
-            return self._category_cache[desc_normalized]
-        
-        # Busca por substring (mais flexível)
-        for learned_desc, category in self._category_cache.items():
-            # Verifica se a descrição aprendida está contida na atual
-            if learned_desc in desc_normalized:
-                return category
-            
-            # Verifica se a descrição atual está contida na aprendida
-            if desc_normalized in learned_desc:
-                return category
+        # Exata, depois maior aprendida contida na descrição, depois menor
+        # aprendida que contém a descrição (ver utils.pattern_index)
+        return self._get_learning_index().match(desc_normalized)
+    
+    def _get_learning_index(self) -> LearnedPatternIndex:
+        """
+        Retorna o índice de busca do cache, remontando se o cache mudou.
         
-        return None
+        A remontagem é preguiçosa: learn_category só invalida o índice, então
+        aprender várias categorias seguidas custa uma única reconstrução.
+        """
+        if self._learning_index is None or self._learning_index_source is not self._category_cache:
+            self._learning_index = LearnedPatternIndex(self._category_cache)
+            self._learning_index_source = self._category_cache
+            logger.debug(f"🔎 Índice de aprendizado montado ({len(self._learning_index)} padrões)")
+        return self._learning_index
     
     def learn_category(self, description: str, category: TransactionCategory, 
                       confidence: float = 1.0) -> bool:
@@ -187,6 +254,7 @@ class CategorizationService:
             if self._category_cache is None:
                 self._category_cache = {}
             self._category_cache[description.upper().strip()] = category
+            self._learning_index = None
             logger.info(f"🧠 Nova categoria aprendida: {description} -> {category.value}")
         
         return success
@@ -3,24 +3,54 @@ Serviço de processamento de arquivos de extratos
 """
 
 import logging
-from typing import List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import time
 from datetime import datetime, timedelta
 
-from models import Transaction, ProcessingStats
+from models import Transaction, TransactionBatch, ProcessingStats, IngestRecord
 from processors import BaseProcessor, PixProcessor, ItauProcessor, LatamProcessor, CardStatementV2Processor
+from processors.excel_cache import workbook_cache
 
 logger = logging.getLogger(__name__)
 
 
+def _process_file_worker(data_directory: Path,
+                         file_path: Path) -> Tuple[TransactionBatch, ProcessingStats, Optional[str]]:
+    """
+    Processa um arquivo em um processo do pool.
+    
+    Cada chamada usa um serviço novo, então as estatísticas retornadas
+    são exatamente as do arquivo processado.
+    
+    Args:
+        data_directory: Diretório de dados do serviço pai
+        file_path: Caminho do arquivo
+        
+    Returns:
+        Tupla (lote extraído, estatísticas do arquivo, nome do processador)
+    """
+    service = FileProcessingService(data_directory)
+    batch, processor_name = service._process_file(file_path)
+    return batch, service.global_stats, processor_name
+
+
 class FileProcessingService:
     """Serviço responsável pelo processamento de arquivos de extratos."""
     
-    def __init__(self, data_directory: Path):
+    def __init__(self, data_directory: Path, max_workers: int = 1, ledger=None):
         self.data_directory = Path(data_directory)
         self.planilhas_dir = self.data_directory / "planilhas"
         
+        # Processos para ler arquivos em paralelo (1 = sequencial, padrão)
+        self.max_workers = max_workers
+        
+        # Ledger de ingestão (IngestLedgerRepository): se informado, arquivos
+        # sem alteração desde a última importação são pulados
+        self.ledger = ledger
+        self.pending_ingest: List[IngestRecord] = []
+        
         # Inicializa processadores
         # IMPORTANTE: os processadores do formato NOVO (CardStatementV2Processor)
         # vêm ANTES dos antigos (ItauProcessor/LatamProcessor) propositalmente.
@@ -133,6 +163,18 @@ class FileProcessingService:
         Returns:
             Lista de transações extraídas
         """
+        return self._process_file(file_path)[0].to_transactions()
+    
+    def _process_file(self, file_path: Path) -> Tuple[TransactionBatch, Optional[str]]:
+        """
+        Processa um arquivo e informa qual processador foi usado.
+        
+        Args:
+            file_path: Caminho do arquivo
+            
+        Returns:
+            Tupla (lote extraído, nome do processador ou None)
+        """
         logger.info(f"🔄 Processando arquivo: {file_path.name}")
         
         # Encontra processador adequado
@@ -141,61 +183,109 @@ class FileProcessingService:
             error_msg = f"Nenhum processador encontrado para: {file_path.name}"
             logger.error(f"❌ {error_msg}")
             self.global_stats.add_error(error_msg)
-            return []
+            return TransactionBatch.empty(), None
         
-        # Processa arquivo
+        processor_name = processor.__class__.__name__
+        
+        # Processa arquivo (estatísticas do processador zeradas: só as deste arquivo)
+        processor.stats = ProcessingStats()
         try:
-            transactions = processor.process_file(file_path)
+            batch = processor.process_file_batch(file_path)
             
             # Atualiza estatísticas globais
-            processor_stats = processor.get_stats()
-            self.global_stats.files_processed += processor_stats.files_processed
-            self.global_stats.transactions_extracted += processor_stats.transactions_extracted
-            self.global_stats.errors.extend(processor_stats.errors)
-            self.global_stats.warnings.extend(processor_stats.warnings)
+            self._merge_stats(processor.get_stats())
             
-            return transactions
+            return batch, processor_name
             
         except Exception as e:
             error_msg = f"Erro inesperado ao processar {file_path.name}: {e}"
             logger.error(f"❌ {error_msg}")
             self.global_stats.add_error(error_msg)
-            return []
+            return TransactionBatch.empty(), processor_name
+    
+    def _merge_stats(self, stats: ProcessingStats):
+        """Soma estatísticas de um processador/worker às estatísticas globais."""
+        self.global_stats.files_processed += stats.files_processed
+        self.global_stats.transactions_extracted += stats.transactions_extracted
+        self.global_stats.errors.extend(stats.errors)
+        self.global_stats.warnings.extend(stats.warnings)
     
-    def process_all_files(self, months_back: int = 12) -> List[Transaction]:
+    def process_all_files(self, months_back: int = 12,
+                          max_workers: Optional[int] = None,
+                          skip_unchanged: bool = True) -> List[Transaction]:
         """
         Processa todos os arquivos encontrados.
         
+        Mesmo que process_all_files_batch, convertido para lista de Transaction.
+        
+        Returns:
+            Lista consolidada de todas as transações
+        """
+        return self.process_all_files_batch(months_back, max_workers, skip_unchanged).to_transactions()
+    
+    def process_all_files_batch(self, months_back: int = 12,
+                                max_workers: Optional[int] = None,
+                                skip_unchanged: bool = True) -> TransactionBatch:
+        """
+        Processa todos os arquivos encontrados, em lote colunar.
+        
+        Com max_workers > 1 os arquivos são lidos em paralelo por um pool de
+        processos; o resultado é consolidado na mesma ordem do modo sequencial.
+        
+        Com ledger configurado, arquivos sem alteração desde a última importação
+        são pulados (ver _filter_unchanged) e os alterados ficam em self.pending_ingest, para serem
+        registrados junto com as transações (TransactionRepository.save_transactions).
+        
         Args:
             months_back: Quantos meses para trás buscar
+            max_workers: Processos em paralelo (padrão: self.max_workers)
+            skip_unchanged: Se False, lê todos os arquivos (os alterados
+                ainda vão para pending_ingest)
             
         Returns:
-            Lista consolidada de todas as transações
+            Lote consolidado de todas as transações
         """
         start_time = time.time()
         logger.info("🚀 Iniciando processamento de todos os arquivos")
         
         # Reseta estatísticas
         self.global_stats = ProcessingStats()
+        self.pending_ingest = []
         
         # Busca arquivos
         arquivos = self.find_recent_files(months_back)
         if not arquivos:
             logger.warning("⚠️ Nenhum arquivo encontrado para processar")
-            return []
+            return TransactionBatch.empty()
+        
+        # Pula arquivos já importados e sem alteração
+        fingerprints: Dict[Path, IngestRecord] = {}
+        if self.ledger is not None:
+            arquivos, fingerprints = self._filter_unchanged(arquivos, skip_unchanged)
+        
+        workers = max_workers if max_workers is not None else self.max_workers
         
         # Processa cada arquivo
-        todas_transacoes = []
+        lotes = []
+        if workers and workers > 1 and len(arquivos) > 1:
+            resultados = self._process_files_parallel(arquivos, workers)
+        else:
+            resultados = self._process_files_sequential(arquivos)
         
-        for chave, arquivo_path in arquivos.items():
-            logger.info(f"🔄 Processando {chave}: {arquivo_path.name}")
+        for arquivo_path, transacoes, processor_name, sem_erros in resultados:
+            self._log_file_result(arquivo_path, transacoes)
+            if len(transacoes):
+                lotes.append(transacoes)
             
-            transacoes = self.process_file(arquivo_path)
-            if transacoes:
-                todas_transacoes.extend(transacoes)
-                logger.info(f"✅ {len(transacoes)} transações extraídas de {arquivo_path.name}")
-            else:
-                logger.warning(f"⚠️ Nenhuma transação extraída de {arquivo_path.name}")
+            # Só registra no ledger arquivos lidos sem erro (senão tenta de novo)
+            record = fingerprints.get(arquivo_path)
+            if record is not None and processor_name and sem_erros:
+                record.processor = processor_name
+                record.rows = len(transacoes)
+                self.pending_ingest.append(record)
+        
+        # Planilhas já processadas não serão relidas nesta execução
+        workbook_cache.clear()
         
         # Finaliza estatísticas
         self.global_stats.processing_time_seconds = time.time() - start_time
@@ -203,7 +293,121 @@ class FileProcessingService:
         logger.info(f"🎉 Processamento concluído!")
         logger.info(self.global_stats.summary())
         
-        return todas_transacoes
+        return TransactionBatch.concat(lotes)
+    
+    def _filter_unchanged(self, arquivos: Dict[str, Path],
+                          skip_unchanged: bool = True) -> Tuple[Dict[str, Path], Dict[Path, IngestRecord]]:
+        """
+        Separa os arquivos sem alteração segundo o ledger.
+        
+        Só os arquivos alterados (ou novos) recebem impressão digital, ou seja,
+        só eles têm as linhas substituídas na gravação. Os sem alteração são
+        pulados, exceto quando um arquivo alterado já tem linhas no banco:
+        linhas compartilhadas entre extratos sobrepostos ficam com o arquivo_id
+        de um só deles, então todos são relidos para que as linhas que outro
+        arquivo ainda contém continuem no lote (e não sejam removidas).
+        
+        Args:
+            arquivos: Dicionário chave -> caminho (de find_recent_files)
+            skip_unchanged: Se False, lê todos os arquivos (ex.: relatório completo)
+            
+        Returns:
+            Tupla (arquivos a processar, impressão digital dos alterados)
+        """
+        fingerprints = {}
+        pulados = []
+        
+        for chave, arquivo_path in arquivos.items():
+            try:
+                sem_alteracao, record = self.ledger.check_file(arquivo_path)
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao consultar ledger para {arquivo_path.name}: {e}")
+                continue
+            
+            if sem_alteracao:
+                pulados.append(chave)
+            else:
+                fingerprints[arquivo_path] = record
+        
+        if not skip_unchanged or not pulados:
+            return arquivos, fingerprints
+        
+        reimportados = [p for p in fingerprints if self.ledger.has_rows(p)]
+        if reimportados:
+            logger.info(
+                f"📒 {len(reimportados)} arquivos alterados já importados: "
+                f"relendo também os {len(pulados)} sem alteração"
+            )
+            return arquivos, fingerprints
+        
+        for chave in pulados:
+            logger.info(f"⏭️ {arquivos[chave].name} sem alteração desde a última importação")
+        self.global_stats.files_skipped += len(pulados)
+        pulados = set(pulados)
+        a_processar = {chave: caminho for chave, caminho in arquivos.items() if chave not in pulados}
+        logger.info(
+            f"📒 {len(pulados)} arquivos pulados (ledger), "
+            f"{len(a_processar)} a processar"
+        )
+        
+        return a_processar, fingerprints
+    
+    def _process_files_sequential(self, arquivos: Dict[str, Path]):
+        """
+        Processa os arquivos um a um.
+        
+        Yields:
+            Tupla (caminho, lote, nome do processador, sem_erros)
+        """
+        for chave, arquivo_path in arquivos.items():
+            logger.info(f"🔄 Processando {chave}: {arquivo_path.name}")
+            
+            erros_antes = len(self.global_stats.errors)
+            transacoes, processor_name = self._process_file(arquivo_path)
+            yield arquivo_path, transacoes, processor_name, len(self.global_stats.errors) == erros_antes
+    
+    def _process_files_parallel(self, arquivos: Dict[str, Path], workers: int):
+        """
+        Processa os arquivos em um pool de processos.
+        
+        Os resultados são consolidados na ordem de `arquivos` (e não na ordem
+        de término), então a saída é idêntica à do modo sequencial.
+        
+        Args:
+            arquivos: Dicionário chave -> caminho (de find_recent_files)
+            workers: Número de processos
+            
+        Yields:
+            Tupla (caminho, lote, nome do processador, sem_erros)
+        """
+        workers = min(workers, len(arquivos))
+        logger.info(f"⚡ Processando {len(arquivos)} arquivos em paralelo ({workers} processos)")
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                (chave, arquivo_path,
+                 executor.submit(_process_file_worker, self.data_directory, arquivo_path))
+                for chave, arquivo_path in arquivos.items()
+            ]
+            
+            for chave, arquivo_path, future in futures:
+                try:
+                    transacoes, stats, processor_name = future.result()
+                except Exception as e:
+                    error_msg = f"Erro inesperado ao processar {arquivo_path.name}: {e}"
+                    logger.error(f"❌ {error_msg}")
+                    self.global_stats.add_error(error_msg)
+                    continue
+                
+                self._merge_stats(stats)
+                yield arquivo_path, transacoes, processor_name, not stats.has_errors
+    
+    def _log_file_result(self, arquivo_path: Path, transacoes: TransactionBatch):
+        """Loga o resultado da extração de um arquivo."""
+        if len(transacoes):
+            logger.info(f"✅ {len(transacoes)} transações extraídas de {arquivo_path.name}")
+        else:
+            logger.warning(f"⚠️ Nenhuma transação extraída de {arquivo_path.name}")
     
     def _find_processor(self, file_path: Path) -> Optional[BaseProcessor]:
         """
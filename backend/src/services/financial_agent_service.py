@@ -3,13 +3,16 @@ Serviço principal que orquestra todo o processamento
 """
 
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from pathlib import Path
 import time
-from datetime import datetime
+from datetime import date, datetime
 
-from models import Transaction, ProcessingStats
-from database import TransactionRepository, CategoryRepository
+import numpy as np
+import pandas as pd
+
+from models import Transaction, TransactionBatch, ProcessingStats
+from database import TransactionRepository, CategoryRepository, IngestLedgerRepository
 from services.file_processing_service import FileProcessingService
 from services.categorization_service import CategorizationService
 from services.report_service import ReportService
@@ -17,6 +20,10 @@ from services.openfinance_loader import OpenFinanceLoader
 
 logger = logging.getLogger(__name__)
 
+# Fim do período em que o Open Finance é a fonte dos dados: depois disso
+# valem as faturas/extratos (no ciclo 19-18, competência até novembro 2025)
+OPENFINANCE_DATA_LIMITE = date(2025, 11, 18)
+
 
 class FinancialAgentService:
     """
@@ -36,8 +43,20 @@ class FinancialAgentService:
         self.transaction_repo = TransactionRepository(db_path, enable_deduplication=enable_dedup)
         self.category_repo = CategoryRepository(db_path)
         
+        # Ledger de ingestão: pula arquivos já importados e sem alteração em
+        # execuções sem Excel (desabilitável via config['skip_unchanged_files'])
+        self.ingest_ledger = (
+            IngestLedgerRepository(db_path)
+            if self.config.get('skip_unchanged_files', True) else None
+        )
+        
         # Inicializa serviços
-        self.file_service = FileProcessingService(self.data_directory)
+        # Leitura paralela dos extratos é opt-in via config['file_workers']
+        self.file_service = FileProcessingService(
+            self.data_directory,
+            max_workers=self.config.get('file_workers', 1),
+            ledger=self.ingest_ledger
+        )
         self.categorization_service = CategorizationService(self.category_repo)
         self.report_service = ReportService(self.data_directory)
         self.openfinance_loader = OpenFinanceLoader(db_path)
@@ -74,7 +93,7 @@ class FinancialAgentService:
         
         # Reseta estatísticas
         self.session_stats = ProcessingStats()
-        all_transactions = []
+        lotes = []
         openfinance_count = 0
         
         try:
@@ -86,43 +105,23 @@ class FinancialAgentService:
             openfinance_max_date = None
             if load_openfinance:
                 logger.info("🏬 Etapa 1: Carregando transações do Open Finance")
-                openfinance_transactions = self.openfinance_loader.load_transactions()
+                # Janela aplicada no SQL: só a data limite (ciclo 19-18: até
+                # 18/11 a competência é no máximo novembro). Sem filtro por
+                # mes_key, linhas com mes_comp fora do padrão continuam entrando
+                limite_data = self._openfinance_window()
+                logger.info(f"🔒 Janela Open Finance: até {limite_data.strftime('%d/%m/%Y')}")
+                openfinance_batch = self.openfinance_loader.load_batch(date_to=limite_data)
                 
-                if openfinance_transactions:
-                    openfinance_count = len(openfinance_transactions)
-                    
-                    # FILTRAR Open Finance: EXCLUIR mes_comp = dezembro 2025
-                    from datetime import datetime, date
-                    limite_data = date(2025, 11, 18)
-                    openfinance_filtered = []
-                    removed_by_date = 0
-                    removed_by_mescomp = 0
-                    
-                    for t in openfinance_transactions:
-                        # Excluir se data > 18/11/2025
-                        if t.date > limite_data:
-                            removed_by_date += 1
-                            continue
-                        # Excluir se mes_comp = dezembro 2025
-                        if hasattr(t, 'mes_comp') and t.mes_comp and '2025-12' in str(t.mes_comp):
-                            removed_by_mescomp += 1
-                            continue
-                        openfinance_filtered.append(t)
-                    
-                    if removed_by_date > 0:
-                        logger.info(f"🚫 {removed_by_date} transações do Open Finance removidas (após 18/11/2025)")
-                    if removed_by_mescomp > 0:
-                        logger.info(f"🚫 {removed_by_mescomp} transações do Open Finance removidas (mes_comp dezembro 2025)")
-                    
-                    all_transactions.extend(openfinance_filtered)
-                    openfinance_count = len(openfinance_filtered)
+                if len(openfinance_batch):
+                    lotes.append(openfinance_batch)
+                    openfinance_count = len(openfinance_batch)
                     logger.info(f"✅ {openfinance_count} transações carregadas do Open Finance")
                     
                     # Mostra range de datas do Open Finance
                     min_date, max_date = self.openfinance_loader.get_date_range()
                     if min_date and max_date:
-                        # LIMITE FIXO: Usar apenas até 18/11/2025 para evitar ambiguidade com cartões
-                        openfinance_max_date = "2025-11-18"
+                        # Excel só complementa depois da data limite (ambiguidade com cartões)
+                        openfinance_max_date = limite_data.isoformat()
                         logger.info(f"📅 Período Open Finance: {min_date} a {max_date}")
                         logger.info(f"🔒 Data limite ajustada para: {openfinance_max_date}")
                 else:
@@ -130,36 +129,48 @@ class FinancialAgentService:
             
             # 3. Processa arquivos Excel
             logger.info("📂 Etapa 2: Processamento de arquivos Excel")
-            excel_transactions = self.file_service.process_all_files(months_back)
+            # Arquivos só são pulados pelo ledger quando o resultado vai só para
+            # o banco: o Excel consolidado precisa das linhas de todos os arquivos
+            excel_transactions = self.file_service.process_all_files_batch(
+                months_back, skip_unchanged=save_to_database and not generate_excel
+            )
             
-            if excel_transactions:
+            if len(excel_transactions):
                 # Filtra Excel: só aceita transações APÓS última data do Open Finance
                 # IMPORTANTE: Para CARTÕES, sempre incluir (devido ao mes_comp)
                 if openfinance_max_date:
-                    from datetime import datetime
-                    max_date_obj = datetime.fromisoformat(openfinance_max_date).date()
+                    max_date_obj = pd.Timestamp(openfinance_max_date)
                     
-                    filtered_excel = []
-                    for t in excel_transactions:
-                        # Cartões: SEMPRE incluir (dedup usa mes_comp)
-                        if 'Master' in t.source.value or 'Visa' in t.source.value:
-                            filtered_excel.append(t)
-                        # PIX/Extrato: Filtrar por data
-                        elif t.date > max_date_obj:
-                            filtered_excel.append(t)
+                    # Cartões: SEMPRE incluir (dedup usa mes_comp)
+                    # PIX/Extrato: Filtrar por data
+                    manter = (self._card_mask(excel_transactions)
+                              | (excel_transactions.frame['date'] > max_date_obj).to_numpy())
                     
-                    excel_filtered_count = len(excel_transactions) - len(filtered_excel)
+                    excel_filtered_count = int((~manter).sum())
                     if excel_filtered_count > 0:
                         logger.info(
                             f"🚫 {excel_filtered_count} transações do Excel filtradas "
                             f"(período coberto pelo Open Finance)"
                         )
-                    excel_transactions = filtered_excel
+                        excel_transactions = excel_transactions.select(manter)
                 
-                all_transactions.extend(excel_transactions)
+                lotes.append(excel_transactions)
                 logger.info(f"✅ {len(excel_transactions)} transações extraídas do Excel")
             
-            if not all_transactions:
+            all_transactions = TransactionBatch.concat(lotes)
+            if not len(all_transactions):
+                files_skipped = self.file_service.get_processing_stats().files_skipped
+                if files_skipped:
+                    logger.info(f"✅ Nada novo: {files_skipped} arquivos sem alteração desde a última importação")
+                    self.session_stats.files_skipped = files_skipped
+                    self.session_stats.processing_time_seconds = time.time() - start_time
+                    return {
+                        "success": True,
+                        "summary": {"files_skipped": files_skipped},
+                        "stats": self.session_stats,
+                        "excel_path": None,
+                        "transactions_count": 0
+                    }
                 logger.warning("⚠️ Nenhuma transação encontrada")
                 return {"success": False, "error": "Nenhuma transação encontrada"}
             
@@ -173,21 +184,9 @@ class FinancialAgentService:
             logger.info("🔍 Etapa 2.5: Removendo duplicatas in-memory")
             original_count = len(all_transactions)
             
-            # DEBUG: Contar Dezembro 2025 Master ANTES da deduplicação in-memory
-            debug_dez_master_before = [t for t in all_transactions if t.month_ref == 'Dezembro 2025' and 'Master' in t.source.value]
-            if debug_dez_master_before:
-                total_before = sum(abs(t.amount) for t in debug_dez_master_before)
-                logger.info(f"🔍 DEBUG: Dezembro 2025 Master ANTES dedup in-memory: {len(debug_dez_master_before)} transacoes = R$ {total_before:,.2f}")
-            
             all_transactions = self._deduplicate_in_memory(all_transactions)
             duplicates_removed = original_count - len(all_transactions)
             
-            # DEBUG: Contar Dezembro 2025 Master DEPOIS da deduplicação in-memory
-            debug_dez_master_after = [t for t in all_transactions if t.month_ref == 'Dezembro 2025' and 'Master' in t.source.value]
-            if debug_dez_master_after:
-                total_after = sum(abs(t.amount) for t in debug_dez_master_after)
-                logger.info(f"🔍 DEBUG: Dezembro 2025 Master DEPOIS dedup in-memory: {len(debug_dez_master_after)} transacoes = R$ {total_after:,.2f}")
-            
             if duplicates_removed > 0:
                 logger.info(
                     f"✅ {duplicates_removed} duplicatas removidas in-memory "
@@ -200,8 +199,9 @@ class FinancialAgentService:
                 all_transactions
             )
             
-            categorized_count = sum(1 for t in categorized_transactions 
-                                  if t.category.value != "A definir")
+            categorized_count = int(
+                (categorized_transactions.frame['category'] != "A definir").sum()
+            )
             self.session_stats.transactions_categorized = categorized_count
             logger.info(f"✅ {categorized_count}/{len(all_transactions)} transações categorizadas")
             
@@ -211,7 +211,8 @@ class FinancialAgentService:
                 logger.info("💾 Etapa 4: Salvando no banco de dados (com deduplicação)")
                 saved_count = self.transaction_repo.save_transactions(
                     categorized_transactions,
-                    skip_duplicates=True  # Força verificação de duplicatas
+                    skip_duplicates=True,  # Força verificação de duplicatas
+                    ingested_files=self.file_service.pending_ingest
                 )
                 logger.info(f"✅ {saved_count} transações salvas no banco")
                 
@@ -425,13 +426,34 @@ class FinancialAgentService:
         """Valida se o ambiente está configurado corretamente."""
         return self.file_service.validate_data_directory()
     
-    def _generate_session_summary(self, transactions: List[Transaction], 
+    def _openfinance_window(self) -> date:
+        """
+        Última data dos dados do Open Finance usados no processamento.
+        
+        Returns:
+            Data limite, configurável por config['openfinance_date_to']
+        """
+        limite_data = self.config.get('openfinance_date_to', OPENFINANCE_DATA_LIMITE)
+        if isinstance(limite_data, str):
+            limite_data = date.fromisoformat(limite_data)
+        return limite_data
+    
+    def _card_mask(self, batch: TransactionBatch) -> np.ndarray:
+        """Máscara das transações de cartão (fontes Master/Visa)."""
+        fontes = batch.frame['source']
+        cartoes = [f for f in fontes.cat.categories if 'Master' in f or 'Visa' in f]
+        return fontes.isin(cartoes).to_numpy()
+    
+    def _generate_session_summary(self, transactions: Union[List[Transaction], TransactionBatch], 
                                  excel_path: Optional[Path], 
                                  saved_count: int) -> Dict[str, Any]:
         """Gera resumo da sessão de processamento."""
-        if not transactions:
+        if not len(transactions):
             return {}
         
+        if isinstance(transactions, TransactionBatch):
+            return self._generate_batch_summary(transactions, excel_path, saved_count)
+        
         # Estatísticas básicas
         total_income = sum(t.amount for t in transactions if t.amount > 0)
         total_expenses = sum(t.amount for t in transactions if t.amount < 0)
@@ -473,6 +495,43 @@ class FinancialAgentService:
             }
         }
     
+    def _generate_batch_summary(self, batch: TransactionBatch,
+                                excel_path: Optional[Path],
+                                saved_count: int) -> Dict[str, Any]:
+        """Resumo da sessão calculado sobre as colunas do lote."""
+        frame = batch.frame
+        valores = frame['amount']
+        total_income = float(valores[valores > 0].sum())
+        total_expenses = float(valores[valores < 0].sum())
+        
+        # Contagens na ordem de primeira ocorrência (como no resumo por lista)
+        by_source = {k: int(v) for k, v in frame['source'].astype(object).value_counts(sort=False).items()}
+        by_category = {k: int(v) for k, v in frame['category'].astype(object).value_counts(sort=False).items()}
+        
+        return {
+            "processing_date": datetime.now().isoformat(),
+            "transactions": {
+                "total": len(batch),
+                "categorized": int((frame['category'] != "A definir").sum()),
+                "saved_to_db": saved_count
+            },
+            "financial": {
+                "total_income": total_income,
+                "total_expenses": total_expenses,
+                "net_balance": total_income + total_expenses
+            },
+            "by_source": by_source,
+            "by_category": by_category,
+            "files": {
+                "excel_generated": excel_path is not None,
+                "excel_path": str(excel_path) if excel_path else None
+            },
+            "period": {
+                "start": frame['date'].min().date().isoformat(),
+                "end": frame['date'].max().date().isoformat()
+            }
+        }
+    
     def get_system_status(self) -> Dict[str, Any]:
         """
         Retorna status geral do sistema.
@@ -511,42 +570,46 @@ class FinancialAgentService:
             logger.error(f"❌ Erro ao obter status: {e}")
             return {"error": str(e)}
     
-    def _deduplicate_in_memory(self, transactions: List[Transaction]) -> List[Transaction]:
+    def _deduplicate_in_memory(self, transactions: Union[List[Transaction], TransactionBatch]
+                               ) -> Union[List[Transaction], TransactionBatch]:
         """
         Remove duplicatas in-memory usando mesma lógica do DeduplicationHelper.
         Prioriza transações do Open Finance sobre Excel quando há duplicatas.
         
         Args:
-            transactions: Lista de transações com possíveis duplicatas
+            transactions: Lista (ou lote) de transações com possíveis duplicatas
             
         Returns:
             Lista deduplicated com transações únicas
         """
         from utils import DeduplicationHelper
         
+        if isinstance(transactions, TransactionBatch):
+            return self._deduplicate_batch(transactions)
+        
+        # Índice ordenado: chave -> posição (slot) em `slots`. Uma substituição
+        # esvazia o slot antigo e ocupa um novo no final, mantendo a mesma
+        # ordem de saída do antigo remove() + append(), mas em O(1).
         seen_keys = {}
-        unique_transactions = []
+        slots = []
         duplicates_found = 0
+        generate_dedup_key = DeduplicationHelper.generate_dedup_key
         
         for transaction in transactions:
             # Gera chave de deduplicação incluindo mes_comp (crítico para cartões)
             # Cartões com mesma data/valor mas mes_comp diferente NÃO são duplicatas
             mes_comp_str = transaction.mes_comp if hasattr(transaction, 'mes_comp') and transaction.mes_comp else ""
-            dedup_key = DeduplicationHelper.generate_dedup_key(
+            dedup_key = generate_dedup_key(
                 data=transaction.date.isoformat(),
                 descricao=transaction.description,
                 valor=transaction.amount,
                 fonte=transaction.source.value
             ) + f"_mescomp_{mes_comp_str}"
             
-            # # DEBUG: Mostrar mes_comp para transações Master de dezembro
-            # if 'Master' in transaction.source.value and transaction.date.month == 12 and transaction.date.year == 2025:
-            #     origem = "OF" if (transaction.id and transaction.id.startswith("openfinance-")) else "Excel"
-            #     logger.info(f"🔍 DEBUG dedup [{origem}] {transaction.date} {transaction.description[:30]} = R$ {transaction.amount:.2f} | mes_comp={mes_comp_str}")
-            
-            if dedup_key in seen_keys:
+            slot = seen_keys.get(dedup_key)
+            if slot is not None:
                 duplicates_found += 1
-                existing = seen_keys[dedup_key]
+                existing = slots[slot]
                 
                 # Prioriza Open Finance sobre Excel
                 # (transações do Open Finance têm id começando com "openfinance-")
@@ -554,11 +617,10 @@ class FinancialAgentService:
                     # Substitui Excel por Open Finance
                     if not (existing.id and existing.id.startswith("openfinance-")):
                         logger.debug(f"🔄 Substituindo Excel por Open Finance: {dedup_key}")
-                        # Remove a transação Excel da lista
-                        unique_transactions.remove(existing)
-                        # Adiciona a do Open Finance
-                        unique_transactions.append(transaction)
-                        seen_keys[dedup_key] = transaction
+                        # Esvazia o slot da transação Excel e adiciona a do Open Finance no final
+                        slots[slot] = None
+                        seen_keys[dedup_key] = len(slots)
+                        slots.append(transaction)
                     else:
                         # Ambas são do Open Finance, ignora a duplicata
                         logger.debug(f"⏭️ Duplicata Open Finance ignorada: {dedup_key}")
@@ -567,10 +629,60 @@ class FinancialAgentService:
                     logger.debug(f"⏭️ Duplicata Excel ignorada: {dedup_key}")
             else:
                 # Primeira vez vendo essa transação
-                seen_keys[dedup_key] = transaction
-                unique_transactions.append(transaction)
+                seen_keys[dedup_key] = len(slots)
+                slots.append(transaction)
+        
+        unique_transactions = [t for t in slots if t is not None]
         
         if duplicates_found > 0:
             logger.info(f"🧹 {duplicates_found} duplicatas removidas in-memory")
         
-        return unique_transactions
\ No newline at end of file
+        return unique_transactions
+    
+    def _deduplicate_batch(self, batch: TransactionBatch) -> TransactionBatch:
+        """
+        Versão colunar de _deduplicate_in_memory (mesmo resultado, mesma ordem).
+        
+        Em cada grupo de chave fica a primeira transação do Open Finance, ou a
+        primeira do grupo se não houver nenhuma; a saída segue a posição da
+        transação mantida (que é a ordem do algoritmo por lista).
+        
+        Args:
+            batch: Lote com possíveis duplicatas
+            
+        Returns:
+            Novo lote só com as transações únicas
+        """
+        from utils import DeduplicationHelper
+        
+        frame = batch.frame
+        n = len(frame)
+        if n == 0:
+            return batch
+        
+        # Mesmas partes de generate_dedup_key, normalizadas uma vez por valor distinto
+        normalize = DeduplicationHelper.normalize_description_for_dedup
+        codigos, descricoes = pd.factorize(frame['description'])
+        desc_norm = np.array([normalize(d) for d in descricoes], dtype=object)[codigos]
+        codigos, valores = pd.factorize(frame['amount'])
+        valor_norm = np.array([f"{float(v):.2f}" for v in valores], dtype=object)[codigos]
+        fonte_norm = frame['source'].astype(object).str.upper().str.strip()
+        
+        chaves = pd.DataFrame({
+            'data': frame['date'], 'descricao': desc_norm, 'valor': valor_norm,
+            'fonte': fonte_norm, 'mes_comp': frame['mes_comp'].astype(object),
+        })
+        grupos = chaves.groupby(list(chaves.columns), sort=False, dropna=False).ngroup().to_numpy()
+        
+        # Prioriza Open Finance (id começando com "openfinance-")
+        open_finance = pd.Series(frame['id'], dtype=object).str.startswith("openfinance-", na=False).to_numpy()
+        ordem = np.lexsort((np.arange(n), ~open_finance, grupos))
+        primeiro = np.ones(n, dtype=bool)
+        primeiro[1:] = grupos[ordem][1:] != grupos[ordem][:-1]
+        mantidas = np.sort(ordem[primeiro])
+        
+        duplicates_found = n - len(mantidas)
+        if duplicates_found > 0:
+            logger.info(f"🧹 {duplicates_found} duplicatas removidas in-memory")
+            return batch.select(mantidas)
+        return batch
@@ -15,14 +15,19 @@ Versão: 1.0
 
 import sqlite3
 import logging
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
 
-from models import Transaction, TransactionSource, TransactionCategory
+from models import Transaction, TransactionBatch, TransactionSource, TransactionCategory
+from database.connection import get_connection
+from database.month_key import month_key_sql, ensure_month_key
 
 logger = logging.getLogger(__name__)
 
+# Linhas por fetchmany na leitura de transacoes_openfinance
+CHUNK_SIZE = 2000
+
 
 class OpenFinanceLoader:
     """
@@ -47,6 +52,7 @@ class OpenFinanceLoader:
             'loaded': 0,
             'errors': 0
         }
+        self._indices_ok = False
     
     def check_table_exists(self) -> bool:
         """
@@ -56,7 +62,7 @@ class OpenFinanceLoader:
             True se existe, False caso contrário
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT name FROM sqlite_master 
@@ -83,82 +89,152 @@ class OpenFinanceLoader:
     
     def load_transactions(self, 
                          only_validated: bool = True,
-                         mes_comp_filter: Optional[str] = None) -> List[Transaction]:
+                         mes_comp_filter: Optional[str] = None,
+                         date_from: Optional[date] = None,
+                         date_to: Optional[date] = None,
+                         mes_key_from: Optional[int] = None,
+                         mes_key_to: Optional[int] = None) -> List[Transaction]:
         """
         Carrega transações do Open Finance convertidas para Transaction.
         
         Args:
             only_validated: Se True, carrega apenas registros validados (padrão)
             mes_comp_filter: Filtro opcional por mês competência (ex: '202511')
+            date_from, date_to: Janela de datas (inclusive), aplicada no SQL
+            mes_key_from, mes_key_to: Janela de competência AAAAMM (inclusive), aplicada no SQL
             
         Returns:
             Lista de objetos Transaction
         """
-        transactions = []
+        return list(self.iter_transactions(
+            mes_comp_filter=mes_comp_filter, date_from=date_from, date_to=date_to,
+            mes_key_from=mes_key_from, mes_key_to=mes_key_to,
+        ))
+    
+    def load_batch(self, chunk_size: int = CHUNK_SIZE, **janela) -> TransactionBatch:
+        """
+        Carrega a janela pedida como um TransactionBatch.
         
+        Cada bloco lido do banco vira um lote colunar antes do próximo ser
+        lido: só um bloco de objetos Transaction existe por vez.
+        
+        Args:
+            chunk_size: Linhas por fetchmany
+            **janela: Mesmos filtros de iter_transactions
+        """
+        lotes = []
+        bloco = []
+        for transaction in self.iter_transactions(chunk_size=chunk_size, **janela):
+            bloco.append(transaction)
+            if len(bloco) >= chunk_size:
+                lotes.append(TransactionBatch.from_transactions(bloco))
+                bloco = []
+        if bloco:
+            lotes.append(TransactionBatch.from_transactions(bloco))
+        return TransactionBatch.concat(lotes)
+    
+    def iter_transactions(self,
+                          mes_comp_filter: Optional[str] = None,
+                          date_from: Optional[date] = None,
+                          date_to: Optional[date] = None,
+                          mes_key_from: Optional[int] = None,
+                          mes_key_to: Optional[int] = None,
+                          chunk_size: int = CHUNK_SIZE) -> Iterator[Transaction]:
+        """
+        Lê transações do Open Finance em blocos (fetchmany), sob demanda.
+        
+        Os filtros vão para o WHERE (data e mes_key são indexados): linhas
+        fora da janela nem saem do banco.
+        
+        Args:
+            mes_comp_filter: Mês competência exato (como gravado)
+            date_from, date_to: Janela de datas (inclusive)
+            mes_key_from, mes_key_to: Janela de competência AAAAMM (inclusive);
+                linhas com mes_comp fora do padrão (mes_key NULL) ficam de fora
+            chunk_size: Linhas por fetchmany
+            
+        Yields:
+            Transaction de cada linha, em ordem de data
+        """
         # Verifica se tabela existe
         if not self.check_table_exists():
             logger.warning("⚠️  Nenhum dado do Open Finance disponível")
-            return transactions
+            return
+        
+        condicoes = []
+        params = []
+        if mes_comp_filter:
+            condicoes.append("mes_comp = ?")
+            params.append(mes_comp_filter)
+        for coluna, operador, valor in (('data', '>=', date_from), ('data', '<=', date_to)):
+            if valor is not None:
+                condicoes.append(f"{coluna} {operador} ?")
+                params.append(valor.isoformat() if isinstance(valor, date) else str(valor))
+        for operador, valor in (('>=', mes_key_from), ('<=', mes_key_to)):
+            if valor is not None:
+                condicoes.append(f"mes_key {operador} ?")
+                params.append(int(valor))
+        if condicoes:
+            self._ensure_window_indexes()
         
+        query = """
+            SELECT 
+                provider_id,
+                data,
+                descricao,
+                valor,
+                categoria,
+                fonte,
+                mes_comp,
+                metadata_json
+            FROM transacoes_openfinance
+        """
+        if condicoes:
+            query += " WHERE " + " AND ".join(condicoes)
+        query += " ORDER BY data"
+        
+        filtros = ", ".join(f"{c} {p!r}" for c, p in zip(condicoes, params))
+        logger.info("📥 Carregando transações do Open Finance" + (f" ({filtros})" if filtros else ""))
+        
+        carregadas = 0
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Monta query
-                query = """
-                    SELECT 
-                        provider_id,
-                        data,
-                        descricao,
-                        valor,
-                        categoria,
-                        fonte,
-                        mes_comp,
-                        metadata_json
-                    FROM transacoes_openfinance
-                    WHERE 1=1
-                """
-                
-                params = []
-                
-                # Filtro por mês competência se especificado
-                if mes_comp_filter:
-                    query += " AND mes_comp = ?"
-                    params.append(mes_comp_filter)
-                
-                # Ordena por data
-                query += " ORDER BY data"
-                
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-                
-                logger.info(
-                    f"📥 Carregando {len(rows)} transações do Open Finance"
-                    + (f" (mês: {mes_comp_filter})" if mes_comp_filter else "")
-                )
-                
-                # Converte cada row para Transaction
+            cursor = get_connection(self.db_path).execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
                 for row in rows:
-                    try:
-                        transaction = self._row_to_transaction(row)
-                        if transaction:
-                            transactions.append(transaction)
-                            self.stats['loaded'] += 1
-                    except Exception as e:
+                    transaction = self._row_to_transaction(row)
+                    if transaction is None:
                         self.stats['errors'] += 1
-                        logger.warning(f"⚠️  Erro ao converter transação: {e}")
                         continue
-                
-                logger.info(
-                    f"✅ {self.stats['loaded']} transações carregadas do Open Finance "
-                    f"({self.stats['errors']} erros)"
-                )
-                
-        except Exception as e:
+                    self.stats['loaded'] += 1
+                    carregadas += 1
+                    yield transaction
+        except sqlite3.Error as e:
             logger.error(f"❌ Erro ao carregar transações do Open Finance: {e}")
+            return
         
-        return transactions
+        logger.info(
+            f"✅ {carregadas} transações carregadas do Open Finance "
+            f"({self.stats['errors']} erros)"
+        )
+    
+    def _ensure_window_indexes(self):
+        """
+        Garante mes_key e índice em data para os filtros de janela (uma vez).
+        
+        idx_data já é o nome do índice de lancamentos(Data); em bancos com as
+        duas tabelas o CREATE INDEX IF NOT EXISTS idx_data da sincronização
+        não criava nada para transacoes_openfinance.
+        """
+        if self._indices_ok:
+            return
+        with get_connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            ensure_month_key(cursor, 'transacoes_openfinance', 'mes_comp')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_openfinance_data ON transacoes_openfinance(data)")
+        self._indices_ok = True
     
     def _row_to_transaction(self, row: tuple) -> Optional[Transaction]:
         """
@@ -242,12 +318,14 @@ class OpenFinanceLoader:
             return months
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT DISTINCT mes_comp 
+                # Ordem cronológica (mes_comp pode vir como 'Dezembro 2025' ou '202512')
+                cursor.execute(f"""
+                    SELECT mes_comp 
                     FROM transacoes_openfinance 
-                    ORDER BY mes_comp
+                    GROUP BY mes_comp
+                    ORDER BY {month_key_sql('mes_comp')}, mes_comp
                 """)
                 
                 months = [row[0] for row in cursor.fetchall() if row[0]]
@@ -269,7 +347,7 @@ class OpenFinanceLoader:
             return None, None
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT MIN(data), MAX(data) 
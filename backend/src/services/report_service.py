@@ -3,12 +3,12 @@ Serviço de geração de relatórios e exportação
 """
 
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
 from pathlib import Path
 import pandas as pd
 from datetime import datetime, date
 
-from models import Transaction, TransactionCategory, TransactionSource
+from models import Transaction, TransactionBatch, TransactionCategory, TransactionSource
 
 logger = logging.getLogger(__name__)
 
@@ -20,19 +20,19 @@ class ReportService:
         self.data_directory = Path(data_directory)
         self.planilhas_dir = self.data_directory / "planilhas"
     
-    def generate_consolidated_excel(self, transactions: List[Transaction], 
+    def generate_consolidated_excel(self, transactions: Union[List[Transaction], TransactionBatch], 
                                   filename: str = "consolidado_temp.xlsx") -> Optional[Path]:
         """
         Gera planilha Excel consolidada (mantém compatibilidade com versão original).
         
         Args:
-            transactions: Lista de transações para consolidar
+            transactions: Lista (ou lote colunar) de transações para consolidar
             filename: Nome do arquivo Excel a ser gerado
             
         Returns:
             Caminho do arquivo gerado ou None se erro
         """
-        if not transactions:
+        if not len(transactions):
             logger.warning("⚠️ Nenhuma transação para gerar Excel")
             return None
         
@@ -40,18 +40,30 @@ class ReportService:
         
         try:
             # Converte transações para DataFrame
-            df_data = []
-            for transaction in transactions:
-                df_data.append({
-                    "Data": transaction.date,
-                    "Descricao": transaction.description,
-                    "Fonte": transaction.source.value,
-                    "Valor": transaction.amount,
-                    "Categoria": transaction.category.value,
-                    "MesComp": transaction.month_ref
+            if isinstance(transactions, TransactionBatch):
+                # Colunas do lote direto (categorias como texto: ordenação alfabética)
+                frame = transactions.frame
+                df = pd.DataFrame({
+                    "Data": transactions.dates(),
+                    "Descricao": frame["description"].to_numpy(),
+                    "Fonte": frame["source"].astype(object).to_numpy(),
+                    "Valor": frame["amount"].to_numpy(),
+                    "Categoria": frame["category"].astype(object).to_numpy(),
+                    "MesComp": frame["month_ref"].astype(object).to_numpy()
                 })
-            
-            df = pd.DataFrame(df_data)
+            else:
+                df_data = []
+                for transaction in transactions:
+                    df_data.append({
+                        "Data": transaction.date,
+                        "Descricao": transaction.description,
+                        "Fonte": transaction.source.value,
+                        "Valor": transaction.amount,
+                        "Categoria": transaction.category.value,
+                        "MesComp": transaction.month_ref
+                    })
+                
+                df = pd.DataFrame(df_data)
             
             # Ordena por MesComp, Fonte (desc) e Data conforme solicitado
             df = df.sort_values(["MesComp", "Fonte", "Data"], ascending=[True, False, True])
@@ -7,18 +7,26 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
-import requests
+import os
+import argparse
 from datetime import datetime, timedelta, date as Date
 import json
 import sqlite3
 from models import get_card_source, Transaction, TransactionSource, TransactionCategory
-from database import CategoryRepository
+from database import CategoryRepository, month_key, ensure_month_key
 from services.categorization_service import CategorizationService
+from database.openfinance_writer import OpenFinanceWriter
+from database.openfinance_sync_state import OpenFinanceSyncStateRepository
+from integrations.pluggy_auth import get_pluggy_fetcher, close_pluggy_fetchers
 
 # Configurações Pluggy
 CLIENT_ID = '0774411c-feca-44dc-83df-b5ab7a1735a6'
 CLIENT_SECRET = '3bd7389d-72d6-419a-804a-146e3e0eaacf'
-BASE_URL = 'https://api.pluggy.ai'
+# PLUGGY_BASE_URL aponta para outro servidor (ex.: integrations/pluggy_mock.py)
+BASE_URL = os.environ.get('PLUGGY_BASE_URL', 'https://api.pluggy.ai')
+
+# Requisições simultâneas ao Pluggy (contas e páginas em paralelo)
+MAX_CONEXOES = 4
 
 # Contas conectadas
 ITAU_ITEM_ID = '60cbf151-aaed-45c7-afac-f2aab15e6299'
@@ -31,6 +39,10 @@ class OpenFinanceSync:
     def __init__(self):
         self.api_key = None
         self.headers = None
+        self.fetcher = None
+        self.writer = OpenFinanceWriter(DB_PATH)
+        self.sync_state = None
+        self.completo = False
         
         # Inicializar CategoryRepository e CategorizationService
         self.category_repository = CategoryRepository(DB_PATH)
@@ -48,13 +60,15 @@ class OpenFinanceSync:
     def autenticar(self):
         """Autenticar no Pluggy"""
         print("🔐 Autenticando no Pluggy...")
-        auth_response = requests.post(f'{BASE_URL}/auth', json={
-            'clientId': CLIENT_ID,
-            'clientSecret': CLIENT_SECRET
-        })
-        self.api_key = auth_response.json()['apiKey']
+        # Uma sessão (conexões keep-alive) para todas as requisições; a apiKey
+        # vem do cache de token enquanto for válida (sem nova ida a /auth)
+        self.fetcher = get_pluggy_fetcher(CLIENT_ID, CLIENT_SECRET, BASE_URL, max_workers=MAX_CONEXOES)
+        self.api_key = self.fetcher.session.headers['X-API-KEY']
         self.headers = {'X-API-KEY': self.api_key}
-        print("✅ Autenticado com sucesso!")
+        if self.fetcher.stats['autenticacoes']:
+            print("✅ Autenticado com sucesso!")
+        else:
+            print("✅ Autenticado (token em cache)")
     
     def criar_tabela(self):
         """Criar tabela transacoes_openfinance se não existir"""
@@ -122,6 +136,9 @@ class OpenFinanceSync:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_categoria ON transacoes_openfinance(categoria)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_fonte ON transacoes_openfinance(fonte)")
         
+        # Chave de mês AAAAMM (indexada) para ordenar/filtrar períodos no SQL
+        ensure_month_key(cursor, 'transacoes_openfinance', 'mes_comp')
+        
         conn.commit()
         conn.close()
         
@@ -131,9 +148,8 @@ class OpenFinanceSync:
         """Forçar atualização do Item com o banco (refresh)"""
         print("   🔄 Solicitando atualização dos dados bancários...")
         try:
-            response = requests.post(
-                f'{BASE_URL}/items/{item_id}/refresh',
-                headers=self.headers
+            response = self.fetcher.session.post(
+                f'{BASE_URL}/items/{item_id}/refresh'
             )
             
             if response.status_code in [200, 201]:
@@ -152,9 +168,8 @@ class OpenFinanceSync:
                     waited += 5
                     
                     # Verificar status da execução
-                    status_response = requests.get(
-                        f'{BASE_URL}/items/{item_id}',
-                        headers=self.headers
+                    status_response = self.fetcher.session.get(
+                        f'{BASE_URL}/items/{item_id}'
                     )
                     
                     if status_response.status_code == 200:
@@ -183,47 +198,11 @@ class OpenFinanceSync:
     
     def buscar_contas(self, item_id):
         """Buscar contas de um Item"""
-        response = requests.get(
-            f'{BASE_URL}/accounts?itemId={item_id}',
-            headers=self.headers
-        )
-        return response.json().get('results', [])
+        return self.fetcher.buscar_contas(item_id)
     
     def buscar_transacoes(self, account_id, date_from, date_to):
-        """Buscar transações de uma conta"""
-        todas_transacoes = []
-        page = 1
-        
-        while True:
-            params = {
-                'accountId': account_id,
-                'from': date_from.strftime('%Y-%m-%d'),
-                'to': date_to.strftime('%Y-%m-%d'),
-                'page': page,
-                'pageSize': 500
-            }
-            
-            response = requests.get(
-                f'{BASE_URL}/transactions',
-                headers=self.headers,
-                params=params
-            )
-            
-            data = response.json()
-            results = data.get('results', [])
-            
-            if not results:
-                break
-            
-            todas_transacoes.extend(results)
-            
-            # Verificar se tem mais páginas
-            if len(results) < 500:
-                break
-            
-            page += 1
-        
-        return todas_transacoes
+        """Buscar transações de uma conta (páginas em paralelo)"""
+        return self.fetcher.buscar_transacoes(account_id, date_from, date_to)
     
     def calcular_mes_comp(self, data_transacao):
         """Calcular MesComp baseado no ciclo 19-18"""
@@ -348,6 +327,7 @@ class OpenFinanceSync:
             'pagador': None,
             'cartao_final': cartao_final,
             'mes_comp': mes_comp,
+            'mes_key': month_key(mes_comp),
             'tipo_transacao': tipo_transacao,
             'tipo_conta': tipo_conta,
             'origem_banco': origem_banco,
@@ -361,42 +341,14 @@ class OpenFinanceSync:
         }
     
     def salvar_transacao(self, transacao):
-        """Salvar transação no banco"""
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO transacoes_openfinance (
-                    provider_id, account_id, data, descricao, valor,
-                    categoria, categoria_banco, tag,
-                    fonte, pagador, cartao_final,
-                    mes_comp,
-                    tipo_transacao, tipo_conta, origem_banco,
-                    parcela_numero, parcela_total, data_compra,
-                    moeda_original, valor_moeda_original,
-                    origem_dado, metadata_json
-                ) VALUES (
-                    :provider_id, :account_id, :data, :descricao, :valor,
-                    :categoria, :categoria_banco, :tag,
-                    :fonte, :pagador, :cartao_final,
-                    :mes_comp,
-                    :tipo_transacao, :tipo_conta, :origem_banco,
-                    :parcela_numero, :parcela_total, :data_compra,
-                    :moeda_original, :valor_moeda_original,
-                    :origem_dado, :metadata_json
-                )
-            """, transacao)
-            
-            conn.commit()
-            self.stats['total_importadas'] += 1
-            
-        except sqlite3.IntegrityError:
-            # Duplicata (provider_id já existe)
-            self.stats['total_duplicadas'] += 1
-        
-        finally:
-            conn.close()
+        """Acumular transação para gravação em lote (ver salvar_pendentes)"""
+        self.writer.add(transacao)
+    
+    def salvar_pendentes(self):
+        """Gravar transações acumuladas (uma transação SQLite por conta)"""
+        self.writer.flush()
+        self.stats['total_importadas'] = self.writer.stats['inseridas']
+        self.stats['total_duplicadas'] = self.writer.stats['duplicadas']
     
     def sincronizar_item(self, item_id, nome_item):
         """Sincronizar todas as contas de um Item"""
@@ -417,24 +369,40 @@ class OpenFinanceSync:
         
         print(f"   Período: {date_from.strftime('%d/%m/%Y')} a {date_to.strftime('%d/%m/%Y')}")
         print(f"   (Aprox. {self.meses_retroativos} meses retroativos)")
-
         
-        for conta in contas:
-            account_id = conta['id']
-            account_name = conta['name']
-            
-            print(f"\n   📇 Conta: {account_name}")
-            
-            # Buscar transações
-            transacoes = self.buscar_transacoes(account_id, date_from, date_to)
-            print(f"      {len(transacoes)} transações encontradas")
-            
-            # Processar e salvar cada transação
+        # Incremental: cada conta já sincronizada busca só a partir do último
+        # ponto salvo (menos a sobreposição); --full busca o período inteiro
+        inicio_por_conta = {}
+        if not self.completo:
+            for conta in contas:
+                inicio_por_conta[conta['id']] = self.sync_state.start_date(conta['id'], date_from)
+        
+        # Contas e páginas são baixadas em paralelo; cada página é
+        # processada e salva assim que chega
+        por_conta = {conta['id']: 0 for conta in contas}
+        max_data = {}
+        for conta, transacoes in self.fetcher.iterar_transacoes(contas, date_from, date_to, inicio_por_conta):
             for trans in transacoes:
                 transacao_processada = self.processar_transacao(trans, conta)
                 self.salvar_transacao(transacao_processada)
-            
-            print(f"      ✅ Processadas")
+                if transacao_processada['data'] > max_data.get(conta['id'], ''):
+                    max_data[conta['id']] = transacao_processada['data']
+            por_conta[conta['id']] += len(transacoes)
+        self.salvar_pendentes()
+        
+        # Só depois de tudo gravado: o estado marca o que já está no banco
+        for conta in contas:
+            self.sync_state.save_state(conta['id'], item_id, date_to, max_data.get(conta['id']),
+                                       inicio_por_conta.get(conta['id'], date_from))
+        
+        for conta in contas:
+            gravadas = self.writer.por_conta[conta['id']]
+            inicio = inicio_por_conta.get(conta['id'], date_from)
+            print(f"\n   📇 Conta: {conta['name']}")
+            if inicio > date_from:
+                print(f"      Incremental a partir de {inicio.strftime('%d/%m/%Y')}")
+            print(f"      {por_conta[conta['id']]} transações encontradas")
+            print(f"      ✅ Processadas ({gravadas['inseridas']} novas, {gravadas['duplicadas']} já existentes)")
     
     def gerar_relatorio(self):
         """Gerar relatório da sincronização"""
@@ -466,13 +434,21 @@ class OpenFinanceSync:
         
         print("\n" + "="*70)
     
-    def executar(self, meses_retroativos=None, forcar_atualizacao=False):
-        """Executar sincronização completa"""
+    def executar(self, meses_retroativos=None, forcar_atualizacao=False, completo=False):
+        """
+        Executar sincronização
+        
+        Args:
+            meses_retroativos: Período em meses (None = pergunta)
+            forcar_atualizacao: Pede refresh do Item ao banco antes de buscar
+            completo: Ignora o estado salvo e busca o período inteiro de todas as contas
+        """
         print("🚀 SINCRONIZAÇÃO OPEN FINANCE")
         print("="*70)
         
         # Refresh desabilitado (403 no plano Free, auto-sync 24h pelo Pluggy)
         self.forcar_atualizacao = forcar_atualizacao
+        self.completo = completo
         
         # Definir período
         if meses_retroativos is None:
@@ -487,24 +463,37 @@ class OpenFinanceSync:
         
         print(f"🔍 Buscando transações dos últimos {self.meses_retroativos} meses...\n")
         
-        # 1. Autenticar
-        self.autenticar()
-        
-        # 2. Criar tabela
-        self.criar_tabela()
-        
-        # 3. Sincronizar Itaú
-        self.sincronizar_item(ITAU_ITEM_ID, "Itaú")
-        
-        # 4. Sincronizar Mercado Pago
-        self.sincronizar_item(MERCADOPAGO_ITEM_ID, "Mercado Pago")
-        
-        # 5. Relatório
-        self.gerar_relatorio()
+        try:
+            # 1. Autenticar
+            self.autenticar()
+            
+            # 2. Criar tabela (e a de estado da sincronização incremental)
+            self.criar_tabela()
+            self.sync_state = OpenFinanceSyncStateRepository(DB_PATH)
+            if self.completo:
+                print("🔁 Sincronização completa (--full): estado salvo ignorado")
+            
+            # 3. Sincronizar Itaú
+            self.sincronizar_item(ITAU_ITEM_ID, "Itaú")
+            
+            # 4. Sincronizar Mercado Pago
+            self.sincronizar_item(MERCADOPAGO_ITEM_ID, "Mercado Pago")
+            
+            # 5. Relatório
+            self.gerar_relatorio()
+        finally:
+            # Sessões HTTP fechadas também quando a sincronização falha
+            close_pluggy_fetchers()
         
         print("\n✅ Sincronização concluída com sucesso!")
         print(f"💾 Dados salvos em: {DB_PATH}")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sincronização Open Finance (Pluggy)')
+    parser.add_argument('--meses', type=int, help='Meses retroativos (sem isso, pergunta)')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignora o estado salvo e busca o período inteiro de todas as contas')
+    args = parser.parse_args()
+    
     sync = OpenFinanceSync()
-    sync.executar()
+    sync.executar(meses_retroativos=args.meses, completo=args.full)
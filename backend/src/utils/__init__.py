@@ -3,5 +3,6 @@ Utilitários do sistema financeiro
 """
 
 from .deduplication_helper import DeduplicationHelper
+from .pattern_index import LearnedPatternIndex
 
-__all__ = ['DeduplicationHelper']
+__all__ = ['DeduplicationHelper', 'LearnedPatternIndex']
@@ -23,10 +23,40 @@ Versão: 1.0
 
 import re
 import logging
+from functools import lru_cache
 from typing import Tuple
 
 logger = logging.getLogger(__name__)
 
+# Regexes da normalização, compiladas uma única vez
+_RE_DATA_FINAL = re.compile(r'\d{2}/\d{2}$')
+_RE_PARCELA_FINAL = re.compile(r'\d{1,2}/\d{1,2}$')
+_RE_LETRA_NUMERO_FINAL = re.compile(r'([A-Z])\d{1,2}$')
+_RE_ESPACOS = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=65536)
+def _normalize_description(description: str) -> str:
+    """Implementação memoizada de normalize_description_for_dedup."""
+    # Converte para uppercase e remove espaços extras
+    desc = description.strip().upper()
+    
+    # Remove datas/números no final (vários formatos)
+    # Formato 1: "PIX TRANSF Kamilla21/05" -> "PIX TRANSF KAMILLA"
+    # Regex: \d{2}/\d{2}$ (2 dígitos + / + 2 dígitos no final, COM ou SEM espaço)
+    desc = _RE_DATA_FINAL.sub('', desc)
+    
+    # Formato 2: Parcelas "COMPRA 2/12" ou "COMPRA2/12"
+    # Regex: \d{1,2}/\d{1,2}$ (1-2 dígitos + / + 1-2 dígitos no final)
+    desc = _RE_PARCELA_FINAL.sub('', desc)
+    
+    # Formato 3: Números grudados no final "TRANSF KENIA E28" -> "TRANSF KENIA E"
+    # Regex: [A-Z]\d{1,2}$ (letra + 1-2 dígitos no final)
+    desc = _RE_LETRA_NUMERO_FINAL.sub(r'\1', desc)
+    
+    # Remove múltiplos espaços
+    return _RE_ESPACOS.sub(' ', desc).strip()
+
 
 class DeduplicationHelper:
     """
@@ -75,26 +105,7 @@ class DeduplicationHelper:
         if not description:
             return ""
         
-        # Converte para uppercase e remove espaços extras
-        desc = description.strip().upper()
-        
-        # Remove datas/números no final (vários formatos)
-        # Formato 1: "PIX TRANSF Kamilla21/05" -> "PIX TRANSF KAMILLA"
-        # Regex: \d{2}/\d{2}$ (2 dígitos + / + 2 dígitos no final, COM ou SEM espaço)
-        desc = re.sub(r'\d{2}/\d{2}$', '', desc)
-        
-        # Formato 2: Parcelas "COMPRA 2/12" ou "COMPRA2/12"
-        # Regex: \d{1,2}/\d{1,2}$ (1-2 dígitos + / + 1-2 dígitos no final)
-        desc = re.sub(r'\d{1,2}/\d{1,2}$', '', desc)
-        
-        # Formato 3: Números grudados no final "TRANSF KENIA E28" -> "TRANSF KENIA E"
-        # Regex: [A-Z]\d{1,2}$ (letra + 1-2 dígitos no final)
-        desc = re.sub(r'([A-Z])\d{1,2}$', r'\1', desc)
-        
-        # Remove múltiplos espaços
-        desc = re.sub(r'\s+', ' ', desc).strip()
-        
-        return desc
+        return _normalize_description(description)
     
     @staticmethod
     def generate_dedup_key(data: str, descricao: str, valor: float, fonte: str) -> str:
@@ -0,0 +1,157 @@
+"""
+Índice de padrões aprendidos para categorização
+===============================================
+
+Substitui a varredura linear do dicionário de categorias aprendidas
+(descrição -> categoria) por um índice montado uma única vez:
+
+- Busca direta: autômato Aho-Corasick com todas as descrições aprendidas;
+  uma única passada pela descrição encontra as descrições aprendidas
+  contidas nela.
+- Busca reversa: índice de trigramas das descrições aprendidas, para achar
+  as que CONTÊM a descrição consultada sem testar uma a uma.
+
+Prioridade (determinística, não depende da ordem do dicionário):
+1. Igualdade exata
+2. Maior descrição aprendida contida na descrição (empate: a que começa antes)
+3. Menor descrição aprendida que contém a descrição (empate: ordem alfabética)
+
+Uso:
+    from utils import LearnedPatternIndex
+
+    index = LearnedPatternIndex({"UBER": cat_transporte, "IFOOD": cat_lanche})
+    index.match("UBER TRIP SAO PAULO")  # -> cat_transporte
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tamanho do n-grama do índice reverso
+_GRAM = 3
+
+
+class LearnedPatternIndex:
+    """
+    Índice imutável sobre um mapeamento descrição aprendida -> valor.
+
+    As chaves devem estar normalizadas (maiúsculas, sem espaços nas pontas),
+    como em CategoryRepository.get_category_mapping().
+    """
+
+    def __init__(self, mapping: Dict[str, Any]):
+        self._mapping = dict(mapping)
+        self._keys: List[str] = [k for k in self._mapping if k]
+        self._build_automaton()
+        self._build_grams()
+
+    def __len__(self) -> int:
+        return len(self._mapping)
+
+    def _build_automaton(self):
+        """Monta a trie com links de falha (Aho-Corasick)."""
+        goto: List[Dict[str, int]] = [{}]
+        depth: List[int] = [0]
+        terminal: List[Optional[str]] = [None]
+
+        for key in self._keys:
+            node = 0
+            for ch in key:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    depth.append(depth[node] + 1)
+                    terminal.append(None)
+                node = nxt
+            terminal[node] = key
+
+        # BFS: link de falha e maior chave que é sufixo do nó
+        fail = [0] * len(goto)
+        best: List[Optional[str]] = list(terminal)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                f = goto[f].get(ch, 0) if node else 0
+                fail[child] = f if f != child else 0
+                if best[child] is None:
+                    best[child] = best[fail[child]]
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._best = best
+
+    def _build_grams(self):
+        """Monta o índice reverso de trigramas -> posições em self._keys."""
+        grams: Dict[str, List[int]] = {}
+        for pos, key in enumerate(self._keys):
+            for gram in {key[i:i + _GRAM] for i in range(len(key) - _GRAM + 1)}:
+                grams.setdefault(gram, []).append(pos)
+        self._grams = grams
+
+    def longest_contained(self, text: str) -> Optional[str]:
+        """Retorna a maior chave contida em text (empate: a que começa antes)."""
+        goto, fail, best = self._goto, self._fail, self._best
+        node = 0
+        found = None
+        found_len = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            key = best[node]
+            if key is not None and len(key) > found_len:
+                found = key
+                found_len = len(key)
+        return found
+
+    def shortest_containing(self, text: str) -> Optional[str]:
+        """Retorna a menor chave que contém text (empate: ordem alfabética)."""
+        keys = self._keys
+        if len(text) < _GRAM:
+            candidates = keys
+        else:
+            postings = []
+            for i in range(len(text) - _GRAM + 1):
+                posting = self._grams.get(text[i:i + _GRAM])
+                if posting is None:
+                    return None
+                postings.append(posting)
+            candidates = (keys[pos] for pos in min(postings, key=len))
+
+        found = None
+        for key in candidates:
+            if text in key and (found is None or (len(key), key) < (len(found), found)):
+                found = key
+        return found
+
+    def match(self, text: str) -> Optional[Any]:
+        """
+        Busca o valor associado a text seguindo a prioridade do módulo.
+
+        Args:
+            text: Descrição já normalizada
+
+        Returns:
+            Valor da chave escolhida ou None
+        """
+        if not self._mapping:
+            return None
+
+        if text in self._mapping:
+            return self._mapping[text]
+
+        key = self.longest_contained(text)
+        if key is None:
+            key = self.shortest_containing(text)
+
+        return self._mapping[key] if key is not None else None
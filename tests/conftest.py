@@ -25,6 +25,9 @@ def temp_dir():
     import time
     with tempfile.TemporaryDirectory() as tmpdir:
         yield tmpdir
+        # Fecha conexões reutilizáveis do pool antes de remover o diretório
+        from database.connection import close_all_connections
+        close_all_connections()
         # Windows SQLite Cleanup Issue Workaround
         # Force garbage collection and wait briefly for file handles to close
         gc.collect()
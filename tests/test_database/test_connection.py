@@ -0,0 +1,103 @@
+"""
+Testes para o gerenciamento de conexões compartilhadas
+======================================================
+
+Testa reutilização por thread e aplicação do perfil de PRAGMAs.
+"""
+
+import gc
+import os
+import sqlite3
+import threading
+
+import pytest
+
+try:
+    from database.connection import ConnectionProvider, PragmaProfile
+except ImportError:
+    pytest.skip("Módulos ainda não disponíveis", allow_module_level=True)
+
+
+class TestConnectionProvider:
+    """Testes do pool de conexões por thread."""
+    
+    @pytest.fixture
+    def provider(self):
+        """Cria provider isolado (não interfere no provider padrão)."""
+        provider = ConnectionProvider()
+        yield provider
+        provider.close_all()
+    
+    def test_reuses_connection_in_same_thread(self, provider, test_db_path):
+        """Testa que a mesma thread recebe sempre a mesma conexão."""
+        assert provider.get_connection(test_db_path) is provider.get_connection(test_db_path)
+    
+    def test_different_threads_get_different_connections(self, provider, test_db_path):
+        """Testa que cada thread tem sua própria conexão."""
+        principal = provider.get_connection(test_db_path)
+        outras = []
+        
+        thread = threading.Thread(target=lambda: outras.append(provider.get_connection(test_db_path)))
+        thread.start()
+        thread.join()
+        
+        assert outras and outras[0] is not principal
+
+    def test_thread_connections_closed_on_thread_exit(self, provider, test_db_path):
+        """Testa que a conexão de uma thread é fechada quando ela termina."""
+        outras = []
+
+        thread = threading.Thread(target=lambda: outras.append(provider.get_connection(test_db_path)))
+        thread.start()
+        thread.join()
+        del thread
+        gc.collect()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            outras[0].execute("SELECT 1")
+        assert provider.get_connection(test_db_path).execute("SELECT 1").fetchone() == (1,)
+
+    def test_shared_connection_is_one_per_process(self, provider, test_db_path):
+        """Testa que a conexão compartilhada é a mesma em todas as threads e fecha no close_all."""
+        compartilhada = provider.get_shared_connection(test_db_path, "versao")
+        outras = []
+
+        thread = threading.Thread(
+            target=lambda: outras.append(provider.get_shared_connection(test_db_path, "versao"))
+        )
+        thread.start()
+        thread.join()
+
+        assert outras[0] is compartilhada
+        assert compartilhada is not provider.get_connection(test_db_path)
+
+        provider.close_all()
+        with pytest.raises(sqlite3.ProgrammingError):
+            compartilhada.execute("SELECT 1")
+    
+    def test_applies_pragma_profile(self, test_db_path):
+        """Testa que o perfil de PRAGMAs é aplicado na conexão nova."""
+        provider = ConnectionProvider(PragmaProfile(busy_timeout=1234, synchronous="FULL"))
+        try:
+            conn = provider.get_connection(test_db_path)
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        finally:
+            provider.close_all()
+    
+    @pytest.mark.skipif(os.name == "nt", reason="Windows não remove arquivo com conexão aberta")
+    def test_reopens_when_database_file_is_recreated(self, provider, test_db_path):
+        """Testa que a conexão é reaberta se o arquivo do banco for recriado."""
+        antiga = provider.get_connection(test_db_path)
+        antiga.execute("CREATE TABLE t (x INTEGER)")
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(test_db_path + sufixo):
+                os.remove(test_db_path + sufixo)
+        
+        nova = provider.get_connection(test_db_path)
+        tabelas = nova.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+        
+        assert nova is not antiga
+        assert tabelas == []
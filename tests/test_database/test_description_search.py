@@ -0,0 +1,119 @@
+"""
+Testes para a busca textual nas descrições
+==========================================
+
+Testa o índice lancamentos_fts (sincronia pelos triggers), a busca por
+trecho/prefixo do repositório e a criação do índice em bancos existentes.
+"""
+
+import pytest
+import sqlite3
+from datetime import date
+
+try:
+    from database.transaction_repository import TransactionRepository
+    from database.description_search import search_condition, exclusion_condition
+    from models import Transaction, TransactionSource
+except ImportError:
+    pytest.skip("Módulos ainda não disponíveis", allow_module_level=True)
+
+
+def criar_transacao(descricao, dia=5):
+    """Helper para criar transação de teste."""
+    return Transaction(date=date(2025, 10, dia), description=descricao, amount=-10.0,
+                       source=TransactionSource.PIX)
+
+
+def descricoes(transacoes):
+    return sorted(t.description for t in transacoes)
+
+
+@pytest.fixture
+def repository(test_db_path):
+    repo = TransactionRepository(test_db_path)
+    if not repo.search_enabled:
+        pytest.skip("SQLite sem FTS5/trigram")
+    return repo
+
+
+class TestDescriptionSearch:
+    """Testes da busca por descrição."""
+
+    def test_substring_and_prefix_search(self, repository):
+        """Trecho em qualquer posição (sem diferenciar maiúsculas) e prefixo."""
+        repository.save_transactions([
+            criar_transacao("UBER TRIP SAO PAULO"),
+            criar_transacao("PAG*UBER EATS", dia=6),
+            criar_transacao("IFOOD *RESTAURANTE", dia=7),
+        ])
+
+        assert descricoes(repository.search_transactions("uber")) == ["PAG*UBER EATS", "UBER TRIP SAO PAULO"]
+        assert descricoes(repository.search_transactions("UBER", prefix=True)) == ["UBER TRIP SAO PAULO"]
+        assert descricoes(repository.search_transactions("*re")) == ["IFOOD *RESTAURANTE"]
+        # Trechos curtos (abaixo de um trigrama) usam LIKE
+        assert descricoes(repository.search_transactions("if")) == ["IFOOD *RESTAURANTE"]
+        assert [t.description for t in repository.search_transactions("a", limit=1)] == ["IFOOD *RESTAURANTE"]
+        assert repository.search_transactions("   ") == []
+
+    def test_index_follows_updates_and_deletes(self, repository, test_db_path):
+        """Triggers mantêm o índice igual à tabela."""
+        transacao = criar_transacao("NETFLIX.COM")
+        repository.save_transactions([transacao])
+
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("UPDATE lancamentos SET Descricao = 'SPOTIFY BRASIL' WHERE id = ?", (transacao.id,))
+        conn.commit()
+        conn.close()
+
+        assert repository.search_transactions("netflix") == []
+        assert descricoes(repository.search_transactions("spotify")) == ["SPOTIFY BRASIL"]
+
+        repository.delete_transaction(transacao.id)
+        assert repository.search_transactions("spotify") == []
+
+        # integrity-check falha (DatabaseError) se o índice divergir da tabela
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("INSERT INTO lancamentos_fts(lancamentos_fts) VALUES ('integrity-check')")
+        conn.close()
+
+    def test_existing_database_is_indexed(self, test_db_path):
+        """Banco sem o índice é indexado na abertura."""
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("""
+            CREATE TABLE lancamentos (
+                Data TEXT NOT NULL, Descricao TEXT NOT NULL, Valor REAL NOT NULL,
+                Fonte TEXT NOT NULL, Categoria TEXT NOT NULL, MesComp TEXT NOT NULL,
+                id TEXT, raw_data TEXT, created_at TEXT, updated_at TEXT
+            )
+        """)
+        conn.execute("""
+            INSERT INTO lancamentos VALUES ('2025-10-05', 'DROGASIL 123', -30.0, 'PIX', 'A definir',
+                                            '202510', 'x', NULL, '2025-10-06T10:00:00', NULL)
+        """)
+        conn.commit()
+        conn.close()
+
+        repository = TransactionRepository(test_db_path)
+        if not repository.search_enabled:
+            pytest.skip("SQLite sem FTS5/trigram")
+
+        assert descricoes(repository.search_transactions("GASIL")) == ["DROGASIL 123"]
+
+    def test_conditions_match_like(self, repository, test_db_path):
+        """Condições geradas equivalem a LIKE (inclusive com curingas no termo)."""
+        repository.save_transactions([
+            criar_transacao("DESCONTO 50% LOJA"),
+            criar_transacao("PGTO FATURA ITAU", dia=6),
+            criar_transacao("MERCADO 50", dia=7),
+        ])
+        conn = sqlite3.connect(test_db_path)
+
+        def contar(condicao, params=()):
+            return conn.execute(f"SELECT COUNT(*) FROM lancamentos WHERE {condicao}", params).fetchone()[0]
+
+        for termo in ("50%", "0%", "%"):
+            for use_index in (True, False):
+                assert contar(*search_condition(termo, use_index=use_index)) == 1
+        assert contar(exclusion_condition(("PGTO FATURA", "ITAU VISA"))) == 2
+        assert exclusion_condition(("PIX", "OK")) is None
+        conn.close()
@@ -0,0 +1,103 @@
+"""
+Testes para a chave canônica de mês (mes_key)
+=============================================
+
+Testa a conversão dos formatos de MesComp para AAAAMM, a equivalência entre
+a versão Python e a expressão SQL e a migração/triggers em lancamentos.
+"""
+
+import pytest
+import sqlite3
+from datetime import date
+
+try:
+    from database.month_key import (
+        month_key, month_key_label, month_key_shift, month_key_sql, ensure_month_key
+    )
+    from database.transaction_repository import TransactionRepository
+    from models import Transaction, TransactionSource
+except ImportError:
+    pytest.skip("Módulos ainda não disponíveis", allow_module_level=True)
+
+
+VALORES = [
+    "Dezembro 2025", "Março 2024", "MARÇO 2024", "marco 2023", "  Janeiro   2026",
+    "2025-12", "202511", "2025-13", "202500", "Dezembro2025", "Foo 2025",
+    "2025", "", None,
+]
+
+
+class TestMonthKey:
+    """Testes da conversão de mês."""
+
+    def test_formats(self):
+        """Os três formatos caem na mesma chave; inválidos viram None."""
+        assert month_key("Dezembro 2025") == 202512
+        assert month_key("2025-12") == 202512
+        assert month_key("202512") == 202512
+        assert month_key("MARÇO 2024") == 202403
+        assert month_key("2025-13") is None
+        assert month_key("Foo 2025") is None
+        assert month_key(None) is None
+
+    def test_sql_matches_python(self):
+        """month_key_sql() dá o mesmo resultado que month_key()."""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (mes TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(v,) for v in VALORES])
+        resultado = [row[0] for row in conn.execute(f"SELECT {month_key_sql('mes')} FROM t ORDER BY rowid")]
+        conn.close()
+
+        assert resultado == [month_key(v) for v in VALORES]
+
+    def test_label_and_shift(self):
+        """Nome de exibição e aritmética de meses."""
+        assert month_key_label(202403) == "Março 2024"
+        assert month_key_shift(202601, -1) == 202512
+        assert month_key_shift(202512, -11) == 202501
+        assert month_key_shift(202511, 2) == 202601
+
+
+class TestMonthKeyColumn:
+    """Testes da coluna mes_key em lancamentos."""
+
+    def test_repository_writes_and_backfills(self, test_db_path):
+        """Gravação preenche mes_key; banco antigo é preenchido na migração."""
+        repository = TransactionRepository(test_db_path)
+        repository.save_transactions([
+            Transaction(date=date(2025, 12, 5), description="PADARIA", amount=10.0,
+                        source=TransactionSource.PIX, month_ref="Dezembro 2025"),
+        ], skip_duplicates=False)
+
+        conn = sqlite3.connect(test_db_path)
+        assert conn.execute("SELECT mes_key FROM lancamentos").fetchall() == [(202512,)]
+
+        # Simula banco anterior à coluna: remove triggers/índices e zera a coluna
+        conn.execute("DROP TRIGGER trg_lancamentos_mes_key_insert")
+        conn.execute("DROP TRIGGER trg_lancamentos_mes_key_update")
+        conn.execute("DROP INDEX idx_meskey_fonte_data")
+        conn.execute("DROP INDEX idx_lancamentos_mes_key")
+        conn.execute("ALTER TABLE lancamentos DROP COLUMN mes_key")
+        conn.commit()
+        conn.close()
+
+        TransactionRepository(test_db_path)
+
+        conn = sqlite3.connect(test_db_path)
+        assert conn.execute("SELECT mes_key FROM lancamentos").fetchall() == [(202512,)]
+        conn.close()
+
+    def test_triggers_cover_external_writes(self):
+        """Inserções sem mes_key e mudanças de MesComp são recalculadas."""
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE lancamentos (Descricao TEXT, MesComp TEXT)")
+        ensure_month_key(conn.cursor(), "lancamentos", "MesComp")
+
+        conn.execute("INSERT INTO lancamentos (Descricao, MesComp) VALUES ('A', '2025-11')")
+        conn.execute("INSERT INTO lancamentos (Descricao, MesComp) VALUES ('B', 'Outubro 2025')")
+        conn.execute("UPDATE lancamentos SET MesComp = 'Janeiro 2026' WHERE Descricao = 'B'")
+
+        assert conn.execute("SELECT Descricao, mes_key FROM lancamentos ORDER BY mes_key").fetchall() == [
+            ("A", 202511), ("B", 202601)
+        ]
+        conn.close()
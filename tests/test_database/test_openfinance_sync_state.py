@@ -0,0 +1,48 @@
+"""
+Testes para o estado da sincronização Open Finance
+==================================================
+"""
+
+import pytest
+from datetime import datetime
+
+try:
+    from database.openfinance_sync_state import OpenFinanceSyncStateRepository
+except ImportError:
+    pytest.skip("Módulos ainda não disponíveis", allow_module_level=True)
+
+
+DOZE_MESES = datetime(2024, 11, 5)
+
+
+class TestOpenFinanceSyncState:
+    """Testes do OpenFinanceSyncStateRepository."""
+
+    @pytest.fixture
+    def repository(self, test_db_path):
+        return OpenFinanceSyncStateRepository(test_db_path)
+
+    def test_unknown_account_fetches_whole_period(self, repository):
+        """Conta sem estado busca desde o início do período pedido."""
+        assert repository.get_state("conta") is None
+        assert repository.start_date("conta", DOZE_MESES) == DOZE_MESES
+
+    def test_next_sync_starts_before_watermark(self, repository):
+        """Depois de sincronizar, a busca começa no menor marco menos a sobreposição."""
+        repository.save_state("conta", "item", datetime(2025, 10, 31, 8, 0), "2025-10-28", DOZE_MESES)
+
+        assert repository.start_date("conta", DOZE_MESES) == datetime(2025, 10, 21)
+        assert repository.start_date("conta", DOZE_MESES, sobreposicao_dias=0) == datetime(2025, 10, 28)
+        # Período maior que o já coberto: busca completa
+        assert repository.start_date("conta", datetime(2024, 1, 1)) == datetime(2024, 1, 1)
+
+    def test_partial_sync_keeps_watermark_and_coverage(self, repository):
+        """Busca incremental sem transações não recua max_data nem encolhe a cobertura."""
+        repository.save_state("conta", "item", datetime(2025, 10, 31), "2025-10-28", DOZE_MESES)
+        repository.save_state("conta", "item", datetime(2025, 11, 2), None, datetime(2025, 10, 21))
+
+        assert repository.get_state("conta") == {
+            'ultima_sincronizacao': "2025-11-02T00:00:00",
+            'max_data': "2025-10-28",
+            'cobertura_inicio': "2024-11-05",
+        }
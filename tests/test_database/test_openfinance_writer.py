@@ -0,0 +1,65 @@
+"""
+Testes para o gravador em lote de transacoes_openfinance
+========================================================
+"""
+
+import pytest
+import sqlite3
+
+try:
+    from database.openfinance_writer import OpenFinanceWriter, COLUNAS_OPENFINANCE
+except ImportError:
+    pytest.skip("Módulos ainda não disponíveis", allow_module_level=True)
+
+
+def criar_tabela(db_path):
+    conn = sqlite3.connect(db_path)
+    colunas = ", ".join(c for c in COLUNAS_OPENFINANCE if c != 'provider_id')
+    conn.execute(f"""
+        CREATE TABLE transacoes_openfinance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            provider_id TEXT UNIQUE NOT NULL,
+            {colunas}
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def transacao(provider_id, account_id="conta-1", descricao="UBER TRIP"):
+    dados = dict.fromkeys(COLUNAS_OPENFINANCE)
+    dados.update(provider_id=provider_id, account_id=account_id, data="2025-10-05",
+                 descricao=descricao, valor=-20.0, mes_comp="Outubro 2025", mes_key=202510)
+    return dados
+
+
+class TestOpenFinanceWriter:
+    """Testes do OpenFinanceWriter."""
+
+    def test_counts_inserted_and_duplicates(self, test_db_path):
+        """Duplicatas (no banco ou no mesmo lote) são contadas, não gravadas."""
+        criar_tabela(test_db_path)
+        writer = OpenFinanceWriter(test_db_path)
+        writer.add_many([transacao("a"), transacao("b"), transacao("c", account_id="conta-2")])
+        assert writer.flush() == (3, 0)
+
+        writer.add_many([transacao("a", descricao="OUTRA"), transacao("d"), transacao("d")])
+        assert writer.flush() == (1, 2)
+        assert writer.flush() == (0, 0)
+
+        assert writer.stats == {'inseridas': 4, 'duplicadas': 2}
+        assert writer.por_conta["conta-1"] == {'inseridas': 3, 'duplicadas': 2}
+
+        conn = sqlite3.connect(test_db_path)
+        linhas = conn.execute("SELECT provider_id, descricao FROM transacoes_openfinance ORDER BY provider_id").fetchall()
+        conn.close()
+        assert linhas == [("a", "UBER TRIP"), ("b", "UBER TRIP"), ("c", "UBER TRIP"), ("d", "UBER TRIP")]
+
+    def test_flushes_when_batch_is_full(self, test_db_path):
+        """O lote é gravado sozinho ao atingir batch_size (e no fim do with)."""
+        criar_tabela(test_db_path)
+        with OpenFinanceWriter(test_db_path, batch_size=2) as writer:
+            writer.add_many([transacao("a"), transacao("b"), transacao("c")])
+            assert writer.stats['inseridas'] == 2
+
+        assert writer.stats['inseridas'] == 3
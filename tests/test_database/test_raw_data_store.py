@@ -0,0 +1,115 @@
+"""
+Testes para o armazenamento compacto de raw_data
+================================================
+
+Testa a codificação (arquivo em arquivos_origem, JSON compacto, zlib), a
+decodificação sob demanda e a migração de bancos com ArquivoOrigem.
+"""
+
+import json
+import pytest
+import sqlite3
+from datetime import date
+
+try:
+    from database.raw_data_store import encode_raw_data, decode_raw_data
+    from database.transaction_repository import TransactionRepository
+    from models import Transaction, TransactionSource, LazyRawData
+except ImportError:
+    pytest.skip("Módulos ainda não disponíveis", allow_module_level=True)
+
+
+ARQUIVO = "dados/planilhas/202510_Itau.xls"
+
+
+def raw_cartao(descricao="UBER TRIP"):
+    """raw_data no formato gravado pelos processadores de cartão."""
+    return {"original_description": descricao, "file_source": ARQUIVO,
+            "bank": "Itaú", "card_final": "1234"}
+
+
+class TestRawDataCodec:
+    """Testes de encode/decode."""
+
+    def test_roundtrip_drops_file_fields(self):
+        """Campos do arquivo não são gravados e voltam na leitura."""
+        gravado = encode_raw_data(raw_cartao(), "UBER TRIP", banco_arquivo="Itaú")
+
+        assert json.loads(gravado) == {"card_final": "1234"}
+        assert decode_raw_data(gravado, "UBER TRIP", ARQUIVO, "Itaú") == raw_cartao()
+
+    def test_compressed_and_legacy_values(self):
+        """BLOB zlib, NULL e texto que não é JSON são lidos."""
+        raw = {"origin": "openfinance", "detalhe": "x" * 200}
+        gravado = encode_raw_data(raw, "PIX", compress=True)
+
+        assert isinstance(gravado, bytes)
+        assert decode_raw_data(gravado, "PIX") == raw
+        assert encode_raw_data({}, "PIX") is None
+        assert decode_raw_data(None, "PIX") == {}
+        assert decode_raw_data("origem: fatura.txt", "PIX") == {"raw": "origem: fatura.txt"}
+
+    def test_lazy_wrapper_decodes_once_on_access(self):
+        """LazyRawData só chama o decodificador quando é lido."""
+        chamadas = []
+
+        def decoder(valor):
+            chamadas.append(valor)
+            return {"a": valor}
+
+        raw = LazyRawData(decoder, 1)
+        assert not raw.loaded and chamadas == []
+
+        raw["b"] = 2
+        assert raw == {"a": 1, "b": 2}
+        assert chamadas == [1]
+
+
+class TestRawDataStorage:
+    """Testes da gravação e migração em lancamentos."""
+
+    def test_repository_roundtrip(self, test_db_path):
+        """Transação gravada volta com o mesmo raw_data (decodificado sob demanda)."""
+        repository = TransactionRepository(test_db_path, compress_raw_data=True)
+        repository.save_transactions([
+            Transaction(date=date(2025, 10, 5), description="UBER TRIP", amount=-20.0,
+                        source=TransactionSource.ITAU_MASTER_FISICO, raw_data=raw_cartao()),
+        ])
+
+        lida = repository.get_transactions_by_period(date(2025, 10, 1), date(2025, 10, 31))[0]
+
+        assert isinstance(lida.raw_data, LazyRawData) and not lida.raw_data.loaded
+        assert lida.raw_data == raw_cartao()
+
+    def test_existing_database_is_migrated(self, test_db_path):
+        """ArquivoOrigem vira arquivo_id e raw_data é compactado sem perder conteúdo."""
+        raw = raw_cartao()
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("""
+            CREATE TABLE lancamentos (
+                Data TEXT NOT NULL, Descricao TEXT NOT NULL, Valor REAL NOT NULL,
+                Fonte TEXT NOT NULL, Categoria TEXT NOT NULL, MesComp TEXT NOT NULL,
+                id TEXT, raw_data TEXT, created_at TEXT, updated_at TEXT, ArquivoOrigem TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX idx_arquivo_origem ON lancamentos(ArquivoOrigem)")
+        conn.execute("""
+            INSERT INTO lancamentos VALUES ('2025-10-05', 'UBER TRIP', -20.0, 'Master Físico',
+                                            'A definir', 'Outubro 2025', 'x', ?, '2025-10-06T10:00:00', NULL, ?)
+        """, (json.dumps(raw), ARQUIVO))
+        conn.commit()
+        conn.close()
+
+        repository = TransactionRepository(test_db_path)
+
+        conn = sqlite3.connect(test_db_path)
+        colunas = {row[1] for row in conn.execute("PRAGMA table_info(lancamentos)")}
+        gravado = conn.execute(
+            "SELECT l.raw_data, a.caminho, a.banco FROM lancamentos l JOIN arquivos_origem a ON a.id = l.arquivo_id"
+        ).fetchone()
+        conn.close()
+
+        assert "ArquivoOrigem" not in colunas
+        assert gravado == ('{"card_final":"1234"}', ARQUIVO, "Itaú")
+        lida = repository.get_transactions_by_period(date(2025, 10, 1), date(2025, 10, 31))[0]
+        assert lida.raw_data == raw
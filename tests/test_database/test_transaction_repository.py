@@ -88,3 +88,179 @@ class TestTransactionRepository:
         
         assert db_count == 3
 
+    
+    def test_save_transactions_skips_existing_duplicates(self, repository, test_db_path):
+        """Testa que o lote ignora transações já existentes no banco."""
+        repository.save_transactions([
+            create_test_transaction(descricao="TX1"),
+            create_test_transaction(descricao="TX2"),
+        ])
+        
+        # Reimportação: TX1 com caixa/espaços diferentes e valor dentro da tolerância
+        count = repository.save_transactions([
+            create_test_transaction(descricao="  tx1 ", valor=-100.001),
+            create_test_transaction(descricao="TX3"),
+        ])
+        
+        assert count == 1
+        assert repository.get_deduplication_stats()['duplicates_skipped'] == 1
+        
+        conn = sqlite3.connect(test_db_path)
+        descricoes = sorted(r[0] for r in conn.execute("SELECT Descricao FROM lancamentos"))
+        conn.close()
+        
+        assert descricoes == ["TX1", "TX2", "TX3"]
+    
+    def test_save_transactions_respects_mes_comp_rule(self, repository):
+        """Testa que parcelas com mês de compensação diferente não são duplicatas."""
+        existente = create_test_transaction(descricao="PARCELA")
+        existente.month_ref = "2025-10"
+        repository.save_transactions([existente])
+        
+        mesmo_mes = create_test_transaction(descricao="PARCELA")
+        mesmo_mes.mes_comp = "2025-10"
+        outro_mes = create_test_transaction(descricao="PARCELA")
+        outro_mes.mes_comp = "2025-11"
+        
+        assert repository.check_duplicate(mesmo_mes) is True
+        assert repository.check_duplicate(outro_mes) is False
+        assert repository.save_transactions([mesmo_mes, outro_mes]) == 1
+
+    def test_duplicate_lookup_uses_dedup_index(self, repository, test_db_path):
+        """Testa que a busca de duplicatas é um seek no índice composto."""
+        conn = sqlite3.connect(test_db_path)
+        plano = " ".join(row[3] for row in conn.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT Descricao, MesComp FROM lancamentos
+            WHERE Data = :data
+              AND valor_centavos IN (CAST(ROUND(:valor * 100) AS INTEGER) - 1,
+                                     CAST(ROUND(:valor * 100) AS INTEGER),
+                                     CAST(ROUND(:valor * 100) AS INTEGER) + 1)
+              AND ABS(Valor - :valor) < 0.01
+              AND fonte_norm = UPPER(:fonte) AND desc_norm = UPPER(TRIM(:descricao))
+        """, {"data": "2025-10-15", "valor": -100.0, "fonte": "PIX", "descricao": "TESTE"}))
+        conn.close()
+
+        assert "idx_lancamentos_dedup" in plano
+        assert "valor_centavos=?" in plano and "desc_norm=?" in plano
+
+    def test_save_transactions_duplicate_rules(self, repository, test_db_path):
+        """Testa tolerância de 0.01, mês vazio e skip_duplicates=False."""
+        existente = create_test_transaction(descricao="LOJA")
+        existente.mes_comp = "2025-09"
+        repository.save_transactions([existente])
+
+        # Arredondamento diferente (mesmos centavos vizinhos) e sem mês de compensação
+        assert repository.save_transactions([create_test_transaction(descricao="LOJA", valor=-100.005)]) == 0
+        assert repository.check_duplicate(create_test_transaction(descricao="LOJA", valor=-99.995)) is True
+        assert repository.save_transactions([create_test_transaction(descricao="LOJA", valor=-100.02)]) == 1
+
+        # Sem deduplicação, só o id de conteúdo evita a duplicata
+        sem_mes = create_test_transaction(descricao="LOJA", valor=-100.005)
+        assert repository.save_transactions([sem_mes], skip_duplicates=False) == 1
+
+        conn = sqlite3.connect(test_db_path)
+        total = conn.execute("SELECT COUNT(*) FROM lancamentos").fetchone()[0]
+        conn.close()
+
+        assert total == 3
+
+    def test_save_transaction_identical_purchases(self, repository, test_db_path):
+        """Testa que duas compras iguais salvas uma a uma viram duas linhas."""
+        primeira = create_test_transaction(descricao="CAFE")
+        segunda = create_test_transaction(descricao="CAFE")
+
+        assert repository.save_transaction(primeira) is True
+        assert repository.save_transaction(segunda) is True
+        assert primeira.id != segunda.id
+
+        # Regravar a mesma transação atualiza a linha dela
+        assert repository.save_transaction(primeira) is True
+
+        conn = sqlite3.connect(test_db_path)
+        ids = [r[0] for r in conn.execute("SELECT id FROM lancamentos ORDER BY rowid")]
+        conn.close()
+
+        assert ids == [primeira.id, segunda.id]
+
+    def test_dedup_columns_backfilled_on_existing_database(self, test_db_path):
+        """Testa que bancos antigos ganham as colunas preenchidas."""
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("""
+            CREATE TABLE lancamentos (
+                Data TEXT NOT NULL, Descricao TEXT NOT NULL, Valor REAL NOT NULL,
+                Fonte TEXT NOT NULL, Categoria TEXT NOT NULL, MesComp TEXT NOT NULL
+            )
+        """)
+        conn.execute(
+            "INSERT INTO lancamentos VALUES ('2025-10-15', ' teste ', -100.004, 'PIX', 'A definir', '202510')"
+        )
+        conn.commit()
+        conn.close()
+
+        repository = TransactionRepository(test_db_path)
+
+        conn = sqlite3.connect(test_db_path)
+        linha = conn.execute("SELECT valor_centavos, fonte_norm, desc_norm FROM lancamentos").fetchone()
+        conn.close()
+
+        assert linha == (-10000, "PIX", "TESTE")
+        assert repository.check_duplicate(create_test_transaction()) is True
+
+    def test_reimport_keeps_ids_and_categories(self, repository, test_db_path):
+        """Testa que reimportar gera os mesmos ids e não duplica nem perde categoria."""
+        primeira = [create_test_transaction(descricao="TX1"), create_test_transaction(descricao="TX1")]
+        assert repository.save_transactions(primeira) == 2
+        assert primeira[0].id != primeira[1].id  # Mesma compra duas vezes no dia
+        repository.update_transaction_category(primeira[0].id, TransactionCategory.MERCADO)
+
+        segunda = [create_test_transaction(descricao="TX1"), create_test_transaction(descricao="TX1")]
+        assert repository.save_transactions(segunda) == 0
+        assert [t.id for t in segunda] == [t.id for t in primeira]
+        assert repository.save_transaction(segunda[0]) is True
+
+        conn = sqlite3.connect(test_db_path)
+        linhas = conn.execute("SELECT id, Categoria FROM lancamentos ORDER BY rowid").fetchall()
+        conn.close()
+
+        assert linhas == [(primeira[0].id, "Mercado"), (primeira[1].id, "A definir")]
+
+    def test_content_ids_migrated_on_existing_database(self, test_db_path):
+        """Testa que ids antigos viram ids de conteúdo e inserções sem id são preenchidas."""
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("""
+            CREATE TABLE lancamentos (
+                Data TEXT NOT NULL, Descricao TEXT NOT NULL, Valor REAL NOT NULL,
+                Fonte TEXT NOT NULL, Categoria TEXT NOT NULL, MesComp TEXT NOT NULL,
+                id TEXT, raw_data TEXT, created_at TEXT, updated_at TEXT
+            )
+        """)
+        conn.executemany("""
+            INSERT INTO lancamentos (Data, Descricao, Valor, Fonte, Categoria, MesComp, id)
+            VALUES ('2025-10-15', 'TESTE', -100.0, 'PIX', 'A definir', '202510', ?)
+        """, [("uuid-antigo",), (None,)])
+        conn.commit()
+        conn.close()
+
+        repository = TransactionRepository(test_db_path)
+        esperados = [create_test_transaction(), create_test_transaction(), create_test_transaction()]
+        assert repository.save_transactions(esperados, skip_duplicates=False) == 1
+
+        # Script externo grava sem id: recebe a próxima ocorrência na abertura seguinte
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("""
+            INSERT INTO lancamentos (Data, Descricao, Valor, Fonte, Categoria, MesComp)
+            VALUES ('2025-10-15', 'TESTE', -100.0, 'PIX', 'A definir', '202510')
+        """)
+        conn.commit()
+        conn.close()
+        TransactionRepository(test_db_path)
+        esperados.append(create_test_transaction())
+        TransactionRepository(test_db_path).save_transactions(esperados, skip_duplicates=False)
+
+        conn = sqlite3.connect(test_db_path)
+        ids = [row[0] for row in conn.execute("SELECT id FROM lancamentos ORDER BY rowid")]
+        conn.close()
+
+        assert ids == [t.id for t in esperados]
+        assert len(set(ids)) == 4
@@ -0,0 +1,124 @@
+"""
+Testes do cache de token e dos clientes compartilhados do Pluggy
+================================================================
+
+Usa o servidor Pluggy de teste (integrations/pluggy_mock.py) na máquina
+local.
+"""
+
+import os
+import stat
+import pytest
+from datetime import datetime, timedelta
+
+try:
+    import requests
+    from integrations import pluggy_auth
+    from integrations.pluggy_auth import PluggyTokenCache, get_pluggy_fetcher, close_pluggy_fetchers
+    from integrations.pluggy_mock import PluggyMockServer
+except ImportError:
+    pytest.skip("requests não instalado", allow_module_level=True)
+
+
+CREDENCIAL = ('id', 'segredo')
+
+
+@pytest.fixture
+def mock():
+    with PluggyMockServer(transacoes_por_conta=10) as servidor:
+        yield servidor
+    close_pluggy_fetchers()
+
+
+class TestPluggyTokenCache:
+    """Testes do PluggyTokenCache."""
+
+    def test_token_expires_with_margin(self):
+        """A chave vale até a validade menos a margem; invalidate descarta."""
+        cache = PluggyTokenCache(validade=timedelta(hours=2), margem=timedelta(minutes=10))
+        assert cache.get('http://api', *CREDENCIAL) is None
+
+        cache.set('http://api', *CREDENCIAL, 'chave')
+        assert cache.get('http://api/', *CREDENCIAL) == 'chave'
+        assert cache.get('http://api', 'id', 'outro-segredo') is None
+
+        cache.set('http://api', *CREDENCIAL, 'velha', emitido_em=datetime.now() - timedelta(minutes=115))
+        assert cache.get('http://api', *CREDENCIAL) is None
+
+        cache.set('http://api', *CREDENCIAL, 'chave')
+        cache.invalidate('http://api', *CREDENCIAL)
+        assert cache.get('http://api', *CREDENCIAL) is None
+
+    def test_disk_cache_survives_new_instance(self, tmp_path):
+        """O arquivo guarda a chave (não a credencial), legível só pelo dono."""
+        caminho = tmp_path / 'cache' / 'pluggy_token.json'
+        caminho.parent.mkdir(mode=0o700)
+        # Temporário largado por uma gravação interrompida, com permissão aberta
+        temporario = caminho.with_name(caminho.name + '.tmp')
+        temporario.write_text('{}', encoding='utf-8')
+        temporario.chmod(0o644)
+
+        PluggyTokenCache(caminho).set('http://api', *CREDENCIAL, 'chave')
+
+        assert PluggyTokenCache(caminho).get('http://api', *CREDENCIAL) == 'chave'
+        assert 'segredo' not in caminho.read_text(encoding='utf-8')
+        if os.name == 'posix':
+            assert stat.S_IMODE(caminho.stat().st_mode) == 0o600
+
+        novo = tmp_path / 'novo' / 'pluggy_token.json'
+        PluggyTokenCache(novo).set('http://api', *CREDENCIAL, 'chave')
+        if os.name == 'posix':
+            assert stat.S_IMODE(novo.parent.stat().st_mode) == 0o700
+
+        caminho.write_text('{quebrado', encoding='utf-8')
+        assert PluggyTokenCache(caminho).get('http://api', *CREDENCIAL) is None
+
+    def test_default_cache_writes_to_disk_only_when_configured(self, tmp_path, monkeypatch):
+        """Sem PLUGGY_TOKEN_CACHE o cache padrão fica só em memória."""
+        monkeypatch.setattr(pluggy_auth, '_cache_padrao', None)
+        monkeypatch.delenv(pluggy_auth.TOKEN_CACHE_ENV, raising=False)
+        assert pluggy_auth.default_token_cache().cache_path is None
+
+        caminho = tmp_path / 'pluggy_token.json'
+        monkeypatch.setattr(pluggy_auth, '_cache_padrao', None)
+        monkeypatch.setenv(pluggy_auth.TOKEN_CACHE_ENV, str(caminho))
+        assert pluggy_auth.default_token_cache().cache_path == caminho
+
+
+class TestSharedFetcher:
+    """Testes do get_pluggy_fetcher contra o servidor de teste."""
+
+    def test_reuses_fetcher_and_cached_token(self, mock, tmp_path):
+        """Mesma instância para a mesma credencial; /auth só uma vez, mesmo entre execuções."""
+        caminho = tmp_path / 'pluggy_token.json'
+        cache = PluggyTokenCache(caminho)
+
+        primeiro = get_pluggy_fetcher(*CREDENCIAL, base_url=mock.url, cache=cache)
+        segundo = get_pluggy_fetcher(*CREDENCIAL, base_url=mock.url, cache=cache)
+        assert primeiro is segundo
+        primeiro.buscar_contas('item')
+        segundo.buscar_contas('outro')
+
+        # Nova "execução": outro processo lê a chave do arquivo
+        close_pluggy_fetchers()
+        terceiro = get_pluggy_fetcher(*CREDENCIAL, base_url=mock.url, cache=PluggyTokenCache(caminho))
+        assert terceiro is not primeiro
+        assert len(terceiro.buscar_contas('item')) == 3
+
+        assert mock.stats['autenticacoes'] == 1
+        assert mock.stats['conexoes'] == 2
+
+    def test_expired_key_is_renewed_once(self, mock):
+        """401 troca a chave (e o cache) e repete a requisição; sem credenciais, levanta."""
+        cache = PluggyTokenCache()
+        fetcher = get_pluggy_fetcher(*CREDENCIAL, base_url=mock.url, cache=cache)
+        mock.expirar_chaves()
+
+        assert len(fetcher.buscar_contas('item')) == 3
+        assert mock.stats['autenticacoes'] == 2
+        assert cache.get(mock.url, *CREDENCIAL) == 'mock-api-key-2'
+
+        mock.expirar_chaves()
+        fetcher._credenciais = None
+        with pytest.raises(requests.HTTPError):
+            fetcher.buscar_contas('item')
@@ -0,0 +1,69 @@
+"""
+Testes da busca concorrente no Pluggy
+=====================================
+
+Usa o servidor Pluggy de teste (integrations/pluggy_mock.py) na máquina
+local: páginas em paralelo, conexões reutilizadas e repetição em 429.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+try:
+    import requests
+    from integrations.pluggy_fetch import PluggyFetcher
+    from integrations.pluggy_mock import PluggyMockServer
+except ImportError:
+    pytest.skip("requests não instalado", allow_module_level=True)
+
+
+PERIODO = (datetime.now() - timedelta(days=400), datetime.now())
+
+
+@pytest.fixture
+def mock():
+    with PluggyMockServer(transacoes_por_conta=120) as servidor:
+        yield servidor
+
+
+def ids_esperados(mock, contas):
+    return sorted(t['id'] for conta in contas for t in mock.transacoes(conta['id']))
+
+
+class TestPluggyFetcher:
+    """Testes do PluggyFetcher contra o servidor de teste."""
+
+    def test_fetches_all_pages_with_pooled_connections(self):
+        """Todas as páginas de todas as contas, sem abrir uma conexão por requisição."""
+        # Latência garante que as requisições paralelas se sobreponham no servidor
+        with PluggyMockServer(transacoes_por_conta=120, latencia=0.05) as mock, \
+                PluggyFetcher(mock.url, max_workers=3, page_size=25) as fetcher:
+            fetcher.autenticar('id', 'segredo')
+            contas = fetcher.buscar_contas('item') + fetcher.buscar_contas('outro')
+            recebidas = [(conta['id'], t) for conta, pagina in fetcher.iterar_transacoes(contas, *PERIODO)
+                         for t in pagina]
+
+        assert all(t['accountId'] == conta for conta, t in recebidas)
+        assert sorted(t['id'] for _, t in recebidas) == ids_esperados(mock, contas)
+        assert mock.stats['requisicoes'] == 3 + len(contas) * 5
+        assert mock.stats['conexoes'] <= 3
+        assert mock.stats['simultaneas_max'] > 1
+
+    def test_retries_rate_limited_requests(self, mock):
+        """429 é repetido (Retry-After) sem perder páginas."""
+        mock.limite_a_cada = 3
+        with PluggyFetcher(mock.url, api_key='chave', max_workers=2, page_size=25,
+                           backoff_inicial=0) as fetcher:
+            transacoes = fetcher.buscar_transacoes('item-acc0', *PERIODO)
+
+        assert sorted(t['id'] for t in transacoes) == ids_esperados(mock, [{'id': 'item-acc0'}])
+        assert mock.stats['limitadas'] > 0
+        assert fetcher.stats['repeticoes'] == mock.stats['limitadas']
+
+    def test_client_errors_are_not_retried(self, mock):
+        """Erro 4xx (exceto 429) é levantado na primeira resposta."""
+        with PluggyFetcher(mock.url, backoff_inicial=0) as fetcher:
+            with pytest.raises(requests.HTTPError):
+                fetcher.request('GET', '/inexistente')
+
+        assert mock.stats['requisicoes'] == 1
@@ -11,7 +11,7 @@ from datetime import date
 try:
     from services.categorization_service import CategorizationService
     from database.category_repository import CategoryRepository
-    from models import Transaction, TransactionSource, TransactionCategory
+    from models import Transaction, TransactionBatch, TransactionSource, TransactionCategory
 except ImportError:
     pytest.skip("Módulos ainda não disponíveis", allow_module_level=True)
 
@@ -80,3 +80,48 @@ class TestCategorizationService:
         results = [categorization_service.categorize_transaction(tx).value for _ in range(5)]
         
         assert len(set(results)) == 1  # Todos os resultados devem ser iguais
+
+
+class TestLearningIndex:
+    """Testes da busca por categorias aprendidas."""
+    
+    @pytest.fixture
+    def service(self, initialized_db):
+        """Serviço com cache de aprendizado controlado."""
+        service = CategorizationService(CategoryRepository(initialized_db))
+        service._category_cache = {
+            "UBER": TransactionCategory.TRANSPORTE,
+            "UBER EATS": TransactionCategory.LANCHE,
+            "DROGASIL LOJA 123": TransactionCategory.FARMACIA,
+        }
+        return service
+    
+    def test_longest_learned_description_wins(self, service):
+        """Descrição aprendida mais longa contida na descrição tem prioridade."""
+        assert service._categorize_by_learning("UBER EATS PEDIDO 42") == TransactionCategory.LANCHE
+        assert service._categorize_by_learning("UBER TRIP") == TransactionCategory.TRANSPORTE
+    
+    def test_description_contained_in_learned(self, service):
+        """Descrição contida numa descrição aprendida também casa."""
+        assert service._categorize_by_learning("drogasil") == TransactionCategory.FARMACIA
+        assert service._categorize_by_learning("PADARIA") is None
+    
+    def test_learn_category_updates_index(self, service):
+        """Categorias aprendidas passam a valer na busca seguinte."""
+        assert service._categorize_by_learning("PADARIA REAL") is None
+        service.learn_category("PADARIA REAL", TransactionCategory.PADARIA)
+        assert service._categorize_by_learning("PADARIA REAL CENTRO") == TransactionCategory.PADARIA
+    
+    def test_categorize_batch_matches_list(self, service):
+        """Lote colunar recebe as mesmas categorias e conta o uso por transação."""
+        service.learn_category("UBER", TransactionCategory.TRANSPORTE)
+        descricoes = ["UBER", "UBER EATS PEDIDO 42", "SISPAG PIX ACME", "PADARIA", "UBER"]
+        transactions = [create_test_transaction_with_description(d) for d in descricoes]
+        batch = TransactionBatch.from_transactions(transactions)
+        
+        service.categorize_batch(batch)
+        
+        esperado = [service.categorize_transaction(t) for t in transactions]
+        assert list(batch.categories()) == esperado
+        uso = {c.description: c.usage_count for c in service.category_repo.get_all_categories()}
+        assert uso["UBER"] == 1 + 2 + 2  # criação + lote + categorize_transaction acima
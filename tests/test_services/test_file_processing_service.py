@@ -251,3 +251,33 @@ class TestFileProcessingService:
         # Estatísticas iniciam em zero
         assert initial_count == 0
         assert service.global_stats.files_processed == 0
+    
+    def test_process_all_files_parallel_matches_sequential(self, service):
+        """Testa que o modo paralelo produz o mesmo resultado do sequencial."""
+        import pandas as pd
+        
+        hoje = datetime.today()
+        mes, ano = hoje.month, hoje.year
+        if hoje.day >= 19:
+            mes += 1
+            if mes > 12:
+                mes, ano = 1, ano + 1
+        
+        for banco, final in [("Itau", "4059"), ("Latam", "6259")]:
+            linhas = [[f"final {final}", None, None, None]]
+            linhas += [[f"{dia:02d}/{mes:02d}/{ano}", f"LOJA {banco} {dia}", None, -10.0 * dia]
+                       for dia in range(1, 6)]
+            pd.DataFrame(linhas, columns=["data", "lancamento", "x", "valor"]).to_excel(
+                service.planilhas_dir / f"{ano}{mes:02d}_{banco}.xlsx", index=False
+            )
+        
+        sequencial = service.process_all_files(months_back=1)
+        stats_sequencial = service.get_processing_stats()
+        paralelo = service.process_all_files(months_back=1, max_workers=2)
+        stats_paralelo = service.get_processing_stats()
+        
+        chave = lambda t: (t.date, t.description, t.amount, t.source, t.mes_comp)
+        assert len(sequencial) == 10
+        assert [chave(t) for t in paralelo] == [chave(t) for t in sequencial]
+        assert stats_paralelo.files_processed == stats_sequencial.files_processed == 2
+        assert stats_paralelo.transactions_extracted == stats_sequencial.transactions_extracted == 10
@@ -0,0 +1,97 @@
+"""
+Testes para o OpenFinanceLoader
+===============================
+"""
+
+import pytest
+import sqlite3
+from datetime import date
+
+try:
+    from database.openfinance_writer import COLUNAS_OPENFINANCE
+    from services.openfinance_loader import OpenFinanceLoader
+    from models import TransactionSource
+except ImportError:
+    pytest.skip("Módulos ainda não disponíveis", allow_module_level=True)
+
+
+LINHAS = [
+    # provider_id, data, valor, fonte, mes_comp, mes_key
+    ("a", "2025-09-25", -10.0, "Master Físico", "Outubro 2025", 202510),
+    ("b", "2025-10-20", 50.0, "PIX", "Novembro 2025", 202511),
+    ("c", "2025-11-17", -30.0, "Master Físico", "Novembro 2025", 202511),
+    ("d", "2025-11-19", -40.0, "Master Físico", "Dezembro 2025", 202512),
+    ("e", "2025-12-02", -5.0, "PIX", "Dezembro 2025", 202512),
+]
+
+
+@pytest.fixture
+def loader(test_db_path):
+    conn = sqlite3.connect(test_db_path)
+    colunas = ", ".join(c for c in COLUNAS_OPENFINANCE if c != 'provider_id')
+    conn.execute(f"""
+        CREATE TABLE transacoes_openfinance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            provider_id TEXT UNIQUE NOT NULL,
+            {colunas}
+        )
+    """)
+    conn.executemany("""
+        INSERT INTO transacoes_openfinance (provider_id, data, descricao, valor, categoria, fonte, mes_comp, mes_key)
+        VALUES (?, ?, 'COMPRA', ?, 'A definir', ?, ?, ?)
+    """, LINHAS)
+    conn.commit()
+    conn.close()
+    return OpenFinanceLoader(test_db_path)
+
+
+class TestOpenFinanceLoader:
+    """Testes do OpenFinanceLoader."""
+
+    def test_window_is_applied_in_sql(self, loader):
+        """date_to e mes_key_to cortam a janela; sem filtros vem tudo, em ordem de data."""
+        todas = loader.load_transactions()
+        assert [t.id for t in todas] == [f"openfinance-{p[0]}" for p in LINHAS]
+
+        janela = loader.load_transactions(date_to=date(2025, 11, 18), mes_key_to=202511)
+        assert [t.id for t in janela] == ["openfinance-a", "openfinance-b", "openfinance-c"]
+
+        assert [t.id for t in loader.load_transactions(date_from=date(2025, 11, 1), mes_key_from=202512)] == \
+            ["openfinance-d", "openfinance-e"]
+
+    def test_iter_transactions_streams_in_chunks(self, loader):
+        """iter_transactions entrega sob demanda, com qualquer tamanho de bloco."""
+        iterador = loader.iter_transactions(chunk_size=2)
+        primeira = next(iterador)
+        assert primeira.id == "openfinance-a"
+        assert len(list(iterador)) == len(LINHAS) - 1
+
+    def test_load_batch_matches_transactions(self, loader):
+        """load_batch tem as mesmas linhas (com o sinal do PIX invertido)."""
+        lote = loader.load_batch(chunk_size=2, mes_key_to=202511)
+        transacoes = loader.load_transactions(mes_key_to=202511)
+
+        assert len(lote) == 3
+        assert lote.frame['id'].tolist() == [t.id for t in transacoes]
+        assert lote.frame['amount'].tolist() == [t.amount for t in transacoes] == [-10.0, -50.0, -30.0]
+        assert transacoes[1].source == TransactionSource.PIX
+
+    def test_missing_table_yields_nothing(self, test_db_path):
+        """Sem a tabela do Open Finance o carregamento fica vazio."""
+        loader = OpenFinanceLoader(test_db_path)
+        assert loader.load_transactions() == []
+        assert len(loader.load_batch()) == 0
+
+    def test_unparsed_competence_stays_in_date_window(self, loader, test_db_path):
+        """Linha com mes_comp fora do padrão (mes_key NULL) entra pela janela de datas."""
+        conn = sqlite3.connect(test_db_path)
+        conn.execute("""
+            INSERT INTO transacoes_openfinance (provider_id, data, descricao, valor, categoria, fonte, mes_comp)
+            VALUES ('x', '2025-11-10', 'COMPRA', -7.0, 'A definir', 'Master Físico', 'sem competência')
+        """)
+        conn.commit()
+        conn.close()
+
+        janela = [t.id for t in loader.load_transactions(date_to=date(2025, 11, 18))]
+        assert janela == ["openfinance-a", "openfinance-b", "openfinance-x", "openfinance-c"]
+        assert "openfinance-x" not in [t.id for t in loader.load_transactions(mes_key_to=202511)]